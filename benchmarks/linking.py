@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Compare import time and per-call cost of differently linked extensions
+
+Each build is a directory holding a compiled _faest_cffi module, e.g. the
+source tree (default profile, loading the bundled libfaest.so.1) and a
+directory built with FAEST_BUILD_PROFILE=static:
+
+    mkdir -p /tmp/static
+    (cd /tmp/static && FAEST_BUILD_PROFILE=static python /path/to/pyfaest/faest_build.py)
+
+A shared build must stay where it was built, since it finds libfaest
+through its rpath.
+
+For every build it reports, from fresh subprocesses:
+  - import: time to import _faest_cffi (dynamic loading and relocation of
+            the module and libfaest) and then the faest package
+  - calls:  median time per native call, from call overhead alone (verify
+            rejecting a truncated signature) up to a full sign and verify
+
+Usage:
+    python benchmarks/linking.py shared=. static=/tmp/static
+                                 [--param-set 128f] [--imports 50] [--runs 2001]
+
+Without builds, the extension in the source tree is measured.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+# Calls per sample for operations too short for one timer reading
+INNER = {'reject': 1000, 'validate': 100, 'keygen': 100}
+
+
+def _measure_import() -> dict:
+    start = time.perf_counter_ns()
+    import _faest_cffi  # noqa: F401
+    loaded = time.perf_counter_ns()
+    import faest
+    done = time.perf_counter_ns()
+    return {'extension_ns': loaded - start, 'package_ns': done - loaded,
+            'build_profile': faest.backend_info()['build_profile']}
+
+
+def _measure_calls(param_set: str, runs: int) -> dict:
+    import faest
+    from faest.core import ffi
+
+    params = faest.PARAMETER_SETS[param_set]
+    pk = ffi.new('uint8_t[]', params['pk_size'])
+    sk = ffi.new('uint8_t[]', params['sk_size'])
+    signature = ffi.new('uint8_t[]', params['sig_size'])
+    sig_len = ffi.new('size_t*')
+    message = b'\x5a' * 32
+    params['keygen'](pk, sk)
+
+    def sign():
+        sig_len[0] = params['sig_size']
+        return params['sign'](sk, message, len(message), signature, sig_len)
+
+    sign()
+    operations = {
+        'reject': lambda: params['verify'](pk, message, len(message), signature, 0),
+        'validate': lambda: params['validate'](pk, sk),
+        'keygen': lambda: params['keygen'](ffi.new('uint8_t[]', params['pk_size']),
+                                           ffi.new('uint8_t[]', params['sk_size'])),
+        'sign': sign,
+        'verify': lambda: params['verify'](pk, message, len(message), signature, sig_len[0]),
+    }
+    result = {}
+    for name, call in operations.items():
+        inner = INNER.get(name, 1)
+        # Full operations take milliseconds; a few dozen samples suffice
+        samples = runs if inner > 1 else max(5, runs // 100)
+        for _ in range(3):
+            call()
+        times = []
+        for _ in range(samples):
+            start = time.perf_counter_ns()
+            for _ in range(inner):
+                call()
+            times.append((time.perf_counter_ns() - start) / inner)
+        result[name] = statistics.median(times)
+    return result
+
+
+def _worker(argv) -> None:
+    """Measure one build (in a subprocess with the build first on sys.path)"""
+    build, mode = argv[0], argv[1]
+    sys.path[:0] = [build, ROOT]
+    if mode == 'import':
+        print(json.dumps(_measure_import()))
+    else:
+        print(json.dumps(_measure_calls(argv[2], int(argv[3]))))
+
+
+def _spawn(build: str, *args) -> dict:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', build,
+                          *map(str, args)], check=True, capture_output=True, text=True, env=env)
+    return json.loads(out.stdout)
+
+
+def measure_build(build: str, param_set: str, imports: int, runs: int) -> dict:
+    """
+    Measure one build directory.
+
+    Returns:
+        {'build_profile', 'extension_ns', 'package_ns', 'calls': {op: ns}},
+        with import times as medians over `imports` fresh processes
+    """
+    samples = [_spawn(build, 'import') for _ in range(imports)]
+    return {
+        'build_profile': samples[0]['build_profile'],
+        'extension_ns': statistics.median(s['extension_ns'] for s in samples),
+        'package_ns': statistics.median(s['package_ns'] for s in samples),
+        'calls': _spawn(build, 'calls', param_set, runs),
+    }
+
+
+def _format_ns(value: float) -> str:
+    for unit, scale in (('ms', 1e6), ('us', 1e3)):
+        if value >= scale:
+            return f"{value / scale:.2f} {unit}"
+    return f"{value:.0f} ns"
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == '--worker':
+        _worker(argv[1:])
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('builds', nargs='*', metavar='NAME=DIR',
+                        help="build directories to compare (default: the source tree)")
+    parser.add_argument('--param-set', default='128f')
+    parser.add_argument('--imports', type=int, default=50,
+                        help="fresh processes per import measurement (default: 50)")
+    parser.add_argument('--runs', type=int, default=2001,
+                        help="samples per short call (default: 2001)")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    builds = []
+    for spec in args.builds or [f'source={ROOT}']:
+        name, sep, path = spec.partition('=')
+        if not sep:
+            name, path = os.path.basename(os.path.normpath(spec)), spec
+        builds.append((name, os.path.abspath(path)))
+
+    results = {name: measure_build(path, args.param_set, args.imports, args.runs)
+               for name, path in builds}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    names = [name for name, _ in builds]
+    first = results[names[0]]
+    rows = [('import _faest_cffi', lambda r: r['extension_ns']),
+            ('import faest', lambda r: r['package_ns'])]
+    rows += [(f"{op} ({args.param_set})", lambda r, op=op: r['calls'][op])
+             for op in first['calls']]
+
+    print(f"Python {sys.version.split()[0]}; ratios relative to '{names[0]}'")
+    print(f"{'':<20}" + ''.join(f"{name + ' (' + results[name]['build_profile'] + ')':>24}"
+                                for name in names))
+    for label, value in rows:
+        cells = []
+        for name in names:
+            cell = _format_ns(value(results[name]))
+            if name != names[0]:
+                cell += f" {value(results[name]) / value(first):5.2f}x"
+            cells.append(f"{cell:>24}")
+        print(f"{label:<20}" + ''.join(cells))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Measure the memory footprint of FAEST keys, signatures and operations
+
+For each parameter set, creates N distinct objects of each kind and reports
+the cost per object:
+  - heap: Python allocations traced by tracemalloc (including the list slot)
+  - rss:  growth of the process resident set size
+
+Kinds: public_key, private_key, keypair (PublicKey + PrivateKey + Keypair)
+and signature (a list of signature bytes).
+
+It also reports the peak extra memory of one sign() and one verify() call
+on large messages (the message itself is excluded).
+
+Every measurement runs in a fresh subprocess, so RSS figures are not
+disturbed by earlier allocations. Operation RSS peaks are sampled from a
+background thread while the call runs.
+
+Heap cost per object is tracked in baseline.json (per Python minor
+version). --check fails when it grows by more than --tolerance, so changes to
+faest/core.py that add per-object overhead are caught before release.
+
+Usage:
+    python benchmarks/memory/footprint.py [--counts 1000,10000,100000]
+                                          [--param-set 128f] [--message-sizes 1M,64M]
+    python benchmarks/memory/footprint.py --check
+    python benchmarks/memory/footprint.py --update-baseline
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+import faest  # noqa: E402
+from faest import Keypair, PrivateKey, PublicKey, sign, verify  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+KINDS = ('public_key', 'private_key', 'keypair', 'signature')
+# Number of objects measured for the baseline
+BASELINE_COUNT = 10000
+
+
+def _python_version() -> str:
+    return f"{sys.version_info.major}.{sys.version_info.minor}"
+
+
+def _rss() -> int:
+    """Current resident set size in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        # No /proc (macOS): fall back to the peak, which only grows
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _parse_size(text: str) -> int:
+    units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+    text = text.strip().upper()
+    if text and text[-1] in units:
+        return int(text[:-1]) * units[text[-1]]
+    return int(text)
+
+
+def _factory(kind: str, param_set: str, count: int):
+    """Return a function creating object i of a kind from distinct bytes"""
+    params = faest.PARAMETER_SETS[param_set]
+    pk_size, sk_size, sig_size = params['pk_size'], params['sk_size'], params['sig_size']
+    if kind == 'signature':
+        blob = os.urandom(count * sig_size)
+        return lambda i: blob[i * sig_size:(i + 1) * sig_size]
+    blob = os.urandom(count * (pk_size + sk_size))
+    pk = lambda i: PublicKey(blob[i * pk_size:(i + 1) * pk_size], param_set)  # noqa: E731
+    base = count * pk_size
+    sk = lambda i: PrivateKey(blob[base + i * sk_size:base + (i + 1) * sk_size],  # noqa: E731
+                              param_set)
+    if kind == 'public_key':
+        return pk
+    if kind == 'private_key':
+        return sk
+    return lambda i: Keypair(pk(i), sk(i))
+
+
+def measure_objects(kind: str, param_set: str, count: int, rss: bool = True) -> dict:
+    """
+    Measure the memory cost of `count` objects of one kind.
+
+    Returns:
+        {'heap_per_object': bytes, 'rss_per_object': bytes or None}
+    """
+    make = _factory(kind, param_set, count)
+    rss_per_object = None
+    if rss:
+        before = _rss()
+        objects = [make(i) for i in range(count)]
+        rss_per_object = (_rss() - before) / count
+        del objects
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [make(i) for i in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    heap = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del objects
+    return {'heap_per_object': heap / count, 'rss_per_object': rss_per_object}
+
+
+class _RssSampler:
+    """Track the highest RSS seen while a native call runs (it releases the GIL)"""
+
+    def __init__(self, interval: float = 0.0005):
+        self._interval = interval
+        self._done = threading.Event()
+        self.peak = 0
+
+    def _run(self) -> None:
+        while not self._done.wait(self._interval):
+            self.peak = max(self.peak, _rss())
+
+    def __enter__(self) -> '_RssSampler':
+        self.peak = _rss()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._done.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss())
+
+
+def measure_operations(param_set: str, message_size: int) -> dict:
+    """
+    Measure the peak extra memory of sign() and verify() on one message.
+
+    Returns:
+        {'sign_heap_peak', 'sign_rss_peak', 'verify_heap_peak', 'verify_rss_peak'}
+        in bytes
+    """
+    keypair = Keypair.generate(param_set)
+    message = os.urandom(message_size)
+    signature = sign(b"warm-up", keypair.private_key)
+    verify(b"warm-up", signature, keypair.public_key)
+
+    result = {}
+    for op, call in (('sign', lambda: sign(message, keypair.private_key)),
+                     ('verify', lambda: verify(message, signature, keypair.public_key))):
+        before = _rss()
+        with _RssSampler() as sampler:
+            output = call()
+        tracemalloc.start()
+        call()
+        _, heap_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if op == 'sign':
+            signature = output
+        result[f'{op}_heap_peak'] = heap_peak
+        result[f'{op}_rss_peak'] = max(0, sampler.peak - before)
+    return result
+
+
+def _worker(argv) -> None:
+    """Run one measurement and print it as JSON (in a subprocess)"""
+    if argv[0] == 'objects':
+        kind, param_set, count = argv[1], argv[2], int(argv[3])
+        print(json.dumps(measure_objects(kind, param_set, count)))
+    else:
+        param_set, size = argv[1], int(argv[2])
+        print(json.dumps(measure_operations(param_set, size)))
+
+
+def _spawn(*args) -> dict:
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', *map(str, args)],
+                         check=True, capture_output=True, text=True)
+    return json.loads(out.stdout)
+
+
+def _format_bytes(value) -> str:
+    if value is None:
+        return '-'
+    for unit, size in (('GiB', 1 << 30), ('MiB', 1 << 20), ('KiB', 1 << 10)):
+        if abs(value) >= size:
+            return f"{value / size:.1f} {unit}"
+    return f"{value:.0f} B"
+
+
+def load_baseline(path: str = BASELINE) -> dict:
+    """Load the tracked heap costs, {python: {param_set: {kind: bytes}}}"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def check(param_sets, tolerance: float, path: str = BASELINE) -> list:
+    """
+    Compare heap cost per object with the tracked baseline.
+
+    Returns:
+        List of (param_set, kind, baseline, current) that grew by more
+        than `tolerance` (a fraction)
+    """
+    tracked = load_baseline(path).get(_python_version())
+    if tracked is None:
+        raise LookupError(f"No baseline for Python {_python_version()} in {path}")
+    regressions = []
+    for param_set in param_sets:
+        for kind, expected in tracked.get(param_set, {}).items():
+            current = measure_objects(kind, param_set, BASELINE_COUNT, rss=False)
+            if current['heap_per_object'] > expected * (1 + tolerance):
+                regressions.append((param_set, kind, expected, current['heap_per_object']))
+    return regressions
+
+
+def update_baseline(param_sets, path: str = BASELINE) -> None:
+    """Record the current heap cost per object for this Python version"""
+    baseline = load_baseline(path)
+    entry = baseline.setdefault(_python_version(), {})
+    for param_set in param_sets:
+        entry[param_set] = {
+            kind: round(measure_objects(kind, param_set, BASELINE_COUNT,
+                                        rss=False)['heap_per_object'], 1)
+            for kind in KINDS
+        }
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == '--worker':
+        _worker(argv[1:])
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--param-set', action='append', choices=list(faest.PARAMETER_SETS),
+                        help="parameter set to measure (repeatable; default: all)")
+    parser.add_argument('--counts', default='1000,10000,100000',
+                        help="comma-separated object counts (up to 10000000)")
+    parser.add_argument('--kind', action='append', choices=KINDS,
+                        help="object kind to measure (repeatable; default: all)")
+    parser.add_argument('--message-sizes', default='1M,64M',
+                        help="comma-separated message sizes for sign/verify peaks")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    parser.add_argument('--check', action='store_true',
+                        help="compare heap per object with baseline.json")
+    parser.add_argument('--tolerance', type=float, default=0.05,
+                        help="allowed relative growth for --check (default: 0.05)")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="record heap per object in baseline.json")
+    args = parser.parse_args(argv)
+    param_sets = args.param_set or list(faest.PARAMETER_SETS)
+
+    if args.update_baseline:
+        update_baseline(param_sets)
+        print(f"Updated {BASELINE} for Python {_python_version()}")
+        return 0
+    if args.check:
+        try:
+            regressions = check(param_sets, args.tolerance)
+        except LookupError as e:
+            print(e, file=sys.stderr)
+            return 2
+        for param_set, kind, expected, current in regressions:
+            print(f"{param_set} {kind}: {expected:.0f} -> {current:.0f} bytes per object",
+                  file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"Heap per object within {args.tolerance:.0%} of baseline")
+        return 0
+
+    counts = [int(float(c)) for c in args.counts.split(',')]
+    sizes = [_parse_size(s) for s in args.message_sizes.split(',') if s]
+    results = {'python': _python_version(), 'objects': [], 'operations': []}
+    for param_set in param_sets:
+        for kind in args.kind or KINDS:
+            for count in counts:
+                row = _spawn('objects', kind, param_set, count)
+                row.update(param_set=param_set, kind=kind, count=count)
+                results['objects'].append(row)
+        for size in sizes:
+            row = _spawn('operations', param_set, size)
+            row.update(param_set=param_set, message_size=size)
+            results['operations'].append(row)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"Python {results['python']}, faest {faest.__version__}")
+    print(f"{'set':<9}{'kind':<13}{'count':>10}{'heap/obj':>12}{'rss/obj':>12}")
+    for row in results['objects']:
+        print(f"{row['param_set']:<9}{row['kind']:<13}{row['count']:>10}"
+              f"{_format_bytes(row['heap_per_object']):>12}"
+              f"{_format_bytes(row['rss_per_object']):>12}")
+    if results['operations']:
+        print()
+        print(f"{'set':<9}{'message':>10}{'sign heap':>12}{'sign rss':>12}"
+              f"{'verify heap':>13}{'verify rss':>12}")
+        for row in results['operations']:
+            print(f"{row['param_set']:<9}{_format_bytes(row['message_size']):>10}"
+                  f"{_format_bytes(row['sign_heap_peak']):>12}"
+                  f"{_format_bytes(row['sign_rss_peak']):>12}"
+                  f"{_format_bytes(row['verify_heap_peak']):>13}"
+                  f"{_format_bytes(row['verify_rss_peak']):>12}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,6 +7,7 @@ Shows various ways to save and load keys
 import json
 import base64
 from faest import Keypair, PublicKey, PrivateKey, sign, verify
+from faest import wire
 
 def example_basic_serialization():
     """Basic key export/import"""
@@ -168,6 +169,28 @@ def example_public_key_only():
     
     print(f"✓ Verification (public key only): {'✓ PASS' if is_valid else '✗ FAIL'}")
 
+def example_wire_format():
+    """Tagged records that carry their parameter set"""
+    print("\n" + "="*60)
+    print("6. Tagged Wire Format")
+    print("="*60)
+    
+    keypair = Keypair.generate('em_128f')
+    message = b"Wire format test"
+    signature = sign(message, keypair.private_key)
+    
+    # One tag byte identifies the record kind and parameter set
+    blob = wire.encode_many([keypair.public_key, signature], param_set='em_128f')
+    print(f"✓ Encoded public key + signature: {len(blob)} bytes")
+    
+    # No parameter set needs to be passed alongside the data
+    pk_record, sig_record = wire.decode_many(blob)
+    public_key = pk_record.value()
+    print(f"✓ Decoded parameter set: {public_key.param_set}")
+    
+    is_valid = verify(message, sig_record.value(), public_key)
+    print(f"Verification after decode: {'✓ PASS' if is_valid else '✗ FAIL'}")
+
 def main():
     print("\n" + "="*70)
     print("PyFAEST - Key Serialization Examples")
@@ -180,6 +203,7 @@ def main():
         example_base64_encoding()
         example_file_storage()
         example_public_key_only()
+        example_wire_format()
         
         print("\n" + "="*70)
         print("All serialization examples completed successfully!")
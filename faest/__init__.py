@@ -35,6 +35,7 @@ from .core import (
     Keypair,
     PublicKey,
     PrivateKey,
+    UnpackedPrivateKey,
     sign,
     verify,
     FaestError,
@@ -43,12 +44,15 @@ from .core import (
     VerificationError,
     InvalidKeyPairError,
     PARAMETER_SETS,
+    backend_info,
 )
+from .cache import SigningCache
 
 __all__ = [
     'Keypair',
     'PublicKey',
     'PrivateKey',
+    'UnpackedPrivateKey',
     'sign',
     'verify',
     'FaestError',
@@ -57,4 +61,6 @@ __all__ = [
     'VerificationError',
     'InvalidKeyPairError',
     'PARAMETER_SETS',
+    'backend_info',
+    'SigningCache',
 ]
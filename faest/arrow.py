@@ -0,0 +1,262 @@
+"""
+PyFAEST - Apache Arrow column interface
+
+Arrow binary columns already hold their values as one data buffer plus an
+offsets buffer, which is the arena layout of the native batch helpers.
+sign_column() and verify_column() pass the data buffer to the helpers
+through the buffer protocol without copying it; only the row offsets are
+converted to size_t (with Arrow compute kernels). Signing and verification
+run on the batch worker threads.
+
+A ChunkedArray (as returned by table.column()) is processed one chunk at a
+time, straight from each chunk's buffers, and the results are concatenated.
+
+Null messages produce null signatures and null verification results, and
+are never signed or verified.
+
+pyarrow is optional; importing this module without it raises ImportError.
+
+Example:
+    >>> import pyarrow as pa
+    >>> from faest.arrow import sign_column, verify_column
+    >>>
+    >>> payloads = table.column('payload')                  # binary / large_binary
+    >>> signatures = sign_column(payloads, private_key)     # fixed_size_binary(sig_size)
+    >>> ok = verify_column(payloads, signatures, public_key)  # bool
+"""
+
+from typing import Optional, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError as e:
+    raise ImportError(
+        "faest.arrow requires pyarrow; install it with 'pip install pyfaest[arrow]'"
+    ) from e
+
+from .core import ffi, SignatureError, PrivateKey, UnpackedPrivateKey, PublicKey, PARAMETER_SETS
+from .batching import sign_arena, verify_arena
+
+_SIZE_T = pa.uint64() if ffi.sizeof('size_t') == 8 else pa.uint32()
+
+
+def _size_t(array):
+    """Point at the values of an integer array converted to size_t"""
+    array = pc.cast(array, _SIZE_T)
+    buf = array.buffers()[1]
+    if buf is None:
+        return array, ffi.new('size_t[]', 1)
+    return array, ffi.from_buffer('size_t[]', buf) + array.offset
+
+
+def _bytes_buffer(buf):
+    if buf is None or buf.size == 0:
+        return ffi.new('uint8_t[]', 1)
+    return ffi.from_buffer('uint8_t[]', buf)
+
+
+def _arena(arr, name: str, valid=None):
+    """
+    Locate the values of a binary array in its data buffer.
+
+    Args:
+        arr: binary, large_binary or fixed_size_binary Array
+        valid: Optional boolean mask of the rows to include
+
+    Returns:
+        Tuple (keepalive, data, offsets, lengths, count)
+    """
+    typ = arr.type
+    count = len(arr)
+    if pa.types.is_binary(typ) or pa.types.is_large_binary(typ):
+        offset_type = pa.int32() if pa.types.is_binary(typ) else pa.int64()
+        starts = pa.Array.from_buffers(offset_type, count, [None, arr.buffers()[1]],
+                                       offset=arr.offset)
+        data = arr.buffers()[2]
+    elif pa.types.is_fixed_size_binary(typ):
+        width = typ.byte_width
+        starts = pa.array(range(arr.offset * width, (arr.offset + count) * width, width),
+                          pa.int64())
+        data = arr.buffers()[1]
+    else:
+        raise TypeError(f"{name} must be a binary, large_binary or fixed_size_binary column")
+    lengths = pc.fill_null(pc.binary_length(arr), 0)
+
+    if valid is not None:
+        starts = pc.filter(starts, valid)
+        lengths = pc.filter(lengths, valid)
+        count = len(starts)
+    starts, starts_ptr = _size_t(starts)
+    lengths, lengths_ptr = _size_t(lengths)
+    data_ptr = _bytes_buffer(data)
+    return (arr, starts, lengths, data_ptr), data_ptr, starts_ptr, lengths_ptr, count
+
+
+def _chunks(column) -> list:
+    """Split a column into its Arrays, without copying"""
+    if isinstance(column, pa.ChunkedArray):
+        return column.chunks or [pa.array([], column.type)]
+    if not isinstance(column, pa.Array):
+        raise TypeError("Expected a pyarrow Array or ChunkedArray")
+    return [column]
+
+
+def _array(column):
+    """Get a column as one Array, copying only if it has several chunks"""
+    chunks = _chunks(column)
+    if len(chunks) == 1:
+        return chunks[0]
+    return pa.concat_arrays(chunks)
+
+
+def _concat(results: list):
+    return results[0] if len(results) == 1 else pa.concat_arrays(results)
+
+
+def _valid_mask(*columns):
+    """Boolean mask of rows that are non-null in every column, or None"""
+    columns = [c for c in columns if c.null_count]
+    if not columns:
+        return None
+    mask = pc.is_valid(columns[0])
+    for column in columns[1:]:
+        mask = pc.and_(mask, pc.is_valid(column))
+    return mask
+
+
+def _scatter(values, valid, count: int):
+    """Spread the results for the valid rows back to all rows, nulls elsewhere"""
+    if valid is None:
+        return values
+    ranks = pc.subtract(pc.cumulative_sum(pc.cast(valid, pa.int64())), 1)
+    indices = pc.if_else(valid, ranks, pa.scalar(None, pa.int64()))
+    return pc.take(values, indices)
+
+
+def _sign_array(arr, private_key: Union[PrivateKey, UnpackedPrivateKey],
+                workers: Optional[int]):
+    """Sign the rows of one Array (see sign_column)"""
+    sig_size = private_key._params['sig_size']
+    sig_type = pa.binary(sig_size)
+    valid = _valid_mask(arr)
+    keepalive, data, offsets, lengths, count = _arena(arr, "Messages", valid)
+    if count == 0:
+        return _scatter(pa.array([], sig_type), valid, len(arr))
+    if isinstance(private_key, UnpackedPrivateKey) and not private_key._finalizer.alive:
+        raise SignatureError("Unpacked private key has been cleared")
+
+    signatures, _, results = sign_arena(private_key, data, offsets, lengths, count, workers)
+    for i in range(count):
+        if results[i] != 0:
+            raise SignatureError(
+                f"Signature generation failed with error code {results[i]} (message {i})"
+            )
+    out = pa.Array.from_buffers(sig_type, count,
+                                [None, pa.py_buffer(ffi.buffer(signatures, count * sig_size))])
+    return _scatter(out, valid, len(arr))
+
+
+def sign_column(column, private_key: Union[PrivateKey, UnpackedPrivateKey],
+                workers: Optional[int] = None):
+    """
+    Sign every value of a binary column.
+
+    Args:
+        column: binary, large_binary or fixed_size_binary Array or ChunkedArray
+        private_key: The private key to sign with (packed or unpacked)
+        workers: Number of worker threads (default: one per CPU)
+
+    Returns:
+        fixed_size_binary(sig_size) Array, null where the message is null
+
+    Raises:
+        SignatureError: If any signature fails
+        TypeError: If the column has an unsupported type
+    """
+    return _concat([_sign_array(arr, private_key, workers) for arr in _chunks(column)])
+
+
+def _verify_array(arr, sigs, pk_column, keys, pk_stride: int, param_set: str,
+                  workers: Optional[int]):
+    """Verify the rows of one Array against row-aligned signature and key Arrays"""
+    count = len(arr)
+    valid = _valid_mask(*[c for c in (arr, sigs, pk_column) if c is not None])
+    msg_keepalive, data, offsets, lengths, selected = _arena(arr, "Messages", valid)
+    sig_keepalive, sig_data, sig_offsets, sig_lens, _ = _arena(sigs, "Signatures", valid)
+    if pk_column is not None:
+        if valid is not None:
+            pk_column = pc.filter(pk_column, valid)
+        keys = _bytes_buffer(pk_column.buffers()[1]) + pk_column.offset * pk_stride
+    if selected == 0:
+        return _scatter(pa.array([], pa.bool_()), valid, count)
+
+    results = verify_arena(param_set, keys, pk_stride, data, offsets, lengths,
+                           sig_data, sig_offsets, sig_lens, selected, workers)
+    codes = pa.Array.from_buffers(pa.int32(), selected,
+                                  [None, pa.py_buffer(ffi.buffer(results, selected * ffi.sizeof('int')))])
+    return _scatter(pc.equal(codes, 0), valid, count)
+
+
+def verify_column(column, signature_column, public_key,
+                  param_set: Optional[str] = None, workers: Optional[int] = None):
+    """
+    Verify a signature for every value of a binary column.
+
+    Args:
+        column: Messages, as for sign_column()
+        signature_column: Signatures as a binary or fixed_size_binary column
+        public_key: One PublicKey for all rows, or a fixed_size_binary(pk_size)
+                    column with one raw public key per row
+        param_set: Parameter set of a public key column
+        workers: Number of worker threads (default: one per CPU)
+
+    Returns:
+        bool Array, null where the message, signature or public key is null
+
+    Raises:
+        TypeError: If a column has an unsupported type
+        ValueError: If the column lengths do not match, or param_set is
+                    missing or does not match the public key column
+    """
+    if not isinstance(signature_column, (pa.Array, pa.ChunkedArray)):
+        raise TypeError("Expected a pyarrow Array or ChunkedArray")
+    chunks = _chunks(column)
+    count = sum(len(chunk) for chunk in chunks)
+    if len(signature_column) != count:
+        raise ValueError("Number of messages and signatures must match")
+
+    if isinstance(public_key, PublicKey):
+        pk_column = None
+        param_set = public_key.param_set
+        keys = ffi.from_buffer('uint8_t[]', public_key.to_bytes())
+        pk_stride = 0
+    else:
+        pk_column = public_key
+        keys = None
+        if not isinstance(pk_column, (pa.Array, pa.ChunkedArray)):
+            raise TypeError("Expected a pyarrow Array or ChunkedArray")
+        if param_set not in PARAMETER_SETS:
+            raise ValueError(f"Invalid parameter set: {param_set}")
+        pk_stride = PARAMETER_SETS[param_set]['pk_size']
+        if pk_column.type != pa.binary(pk_stride):
+            raise ValueError(
+                f"Public key column must be fixed_size_binary({pk_stride}) for {param_set}"
+            )
+        if len(pk_column) != count:
+            raise ValueError("Number of messages and public keys must match")
+
+    # Signatures and public keys are cut at the message chunk boundaries;
+    # that only copies where one of their chunks spans a boundary
+    results = []
+    start = 0
+    for arr in chunks:
+        rows = len(arr)
+        sigs = _array(signature_column.slice(start, rows))
+        pks = None if pk_column is None else _array(pk_column.slice(start, rows))
+        results.append(_verify_array(arr, sigs, pks, keys, pk_stride, param_set, workers))
+        start += rows
+    return _concat(results)
+
+
+__all__ = ['sign_column', 'verify_column']
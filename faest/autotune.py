@@ -0,0 +1,232 @@
+"""
+PyFAEST - Adaptive batch sizing and worker autotuning
+
+Good batch sizes and thread counts depend on the parameter set (128f and
+256s differ by more than 10x per operation), the message size and the CPU
+quota of the container. AdaptiveBatcher splits sign_many/verify_many work
+into batches, times every batch, and tunes each workload separately:
+
+    batch size  chosen so that one batch takes about `target_latency`
+                seconds, from a moving average of the time per message
+    workers     hill-climbed on measured throughput: every few batches one
+                batch runs with one worker more or fewer, and the setting
+                is kept if it was at least 5% faster
+
+A workload is a (parameter set, operation, message size class) triple,
+where size classes are powers of four bytes. Worker counts are bounded by
+batching.available_cpus(), which honours the affinity mask and cgroup CPU
+quota, not os.cpu_count(). decisions() reports the current settings and
+measurements for monitoring.
+
+Example:
+    >>> from faest.autotune import AdaptiveBatcher
+    >>>
+    >>> batcher = AdaptiveBatcher(target_latency=0.05)
+    >>> signatures = batcher.sign_many(messages, private_key)
+    >>> batcher.decisions()[('128f', 'sign', 64)]['batch_size']
+    37
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import threading
+import time
+
+from .core import PrivateKey, UnpackedPrivateKey, PublicKey
+from . import batching
+from .batching import available_cpus
+
+# Relative throughput gain needed to move to another worker count
+_IMPROVEMENT = 1.05
+
+
+def _size_class(messages: Sequence[bytes]) -> int:
+    """Round the mean message size down to a power of four"""
+    if not messages:
+        return 0
+    mean = sum(map(len, messages)) // len(messages)
+    size = 1
+    while size * 4 <= mean:
+        size *= 4
+    return size if mean else 0
+
+
+class _Tuning:
+    """Online tuning state of one workload"""
+
+    def __init__(self, workers: int, max_workers: int, max_batch: int,
+                 target_latency: float, smoothing: float, explore_every: int):
+        self.workers = workers
+        self.max_workers = max_workers
+        self.max_batch = max_batch
+        self.target_latency = target_latency
+        self.smoothing = smoothing
+        self.explore_every = explore_every
+        self.batch_size = workers
+        self.item_seconds: Optional[float] = None    # CPU-seconds per message
+        self.throughput: Dict[int, float] = {}       # workers -> messages per second
+        self.batches = 0
+        self.last_latency: Optional[float] = None
+        self._direction = -1
+
+    def _average(self, previous: Optional[float], value: float) -> float:
+        if previous is None:
+            return value
+        return previous + self.smoothing * (value - previous)
+
+    def plan(self) -> Tuple[int, int]:
+        """Get (batch size, workers) for the next batch"""
+        workers = self.workers
+        if self.max_workers > 1 and self.batches and self.batches % self.explore_every == 0:
+            # Alternate between trying one worker fewer and one more
+            self._direction = -self._direction
+            workers = min(self.max_workers, max(1, workers + self._direction))
+        return self.batch_size, workers
+
+    def record(self, count: int, workers: int, seconds: float) -> None:
+        """Fold in the timing of one batch and update the decisions"""
+        self.batches += 1
+        self.last_latency = seconds
+        seconds = max(seconds, 1e-9)
+        used = min(workers, count)
+        self.item_seconds = self._average(self.item_seconds, seconds * used / count)
+        self.throughput[workers] = self._average(self.throughput.get(workers), count / seconds)
+
+        if workers != self.workers:
+            current = self.throughput.get(self.workers)
+            if current is None or self.throughput[workers] > current * _IMPROVEMENT:
+                self.workers = workers
+
+        size = int(self.target_latency * self.workers / self.item_seconds)
+        self.batch_size = max(1, min(self.max_batch, size))
+
+    def snapshot(self) -> dict:
+        return {
+            'batch_size': self.batch_size,
+            'workers': self.workers,
+            'batches': self.batches,
+            'item_seconds': self.item_seconds,
+            'last_latency': self.last_latency,
+            'throughput': self.throughput.get(self.workers),
+        }
+
+
+class AdaptiveBatcher:
+    """
+    sign_many/verify_many with batch size and worker count tuned online.
+
+    Safe to share between threads; the batches of one call run one after
+    another, each on the shared batch worker pool.
+    """
+
+    def __init__(self, target_latency: float = 0.05, max_batch: int = 4096,
+                 max_workers: Optional[int] = None, smoothing: float = 0.2,
+                 explore_every: int = 8):
+        """
+        Initialize an adaptive batcher.
+
+        Args:
+            target_latency: Desired duration of one batch in seconds
+            max_batch: Largest batch size to use
+            max_workers: Most worker threads per batch
+                         (default: batching.available_cpus())
+            smoothing: Weight of each new measurement in the moving averages
+            explore_every: Batches between worker-count experiments
+        """
+        if target_latency <= 0:
+            raise ValueError("target_latency must be positive")
+        if max_batch <= 0:
+            raise ValueError("max_batch must be positive")
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be in (0, 1]")
+        if explore_every <= 0:
+            raise ValueError("explore_every must be positive")
+        self._target_latency = target_latency
+        self._max_batch = max_batch
+        self._max_workers = max_workers or available_cpus()
+        self._smoothing = smoothing
+        self._explore_every = explore_every
+        self._lock = threading.Lock()
+        self._tuning: Dict[Tuple[str, str, int], _Tuning] = {}
+
+    def _state(self, key: Tuple[str, str, int]) -> _Tuning:
+        with self._lock:
+            state = self._tuning.get(key)
+            if state is None:
+                state = _Tuning(self._max_workers, self._max_workers, self._max_batch,
+                                self._target_latency, self._smoothing, self._explore_every)
+                self._tuning[key] = state
+            return state
+
+    def _run(self, key: Tuple[str, str, int], count: int, run_batch) -> list:
+        state = self._state(key)
+        out: list = []
+        start = 0
+        while start < count:
+            with self._lock:
+                size, workers = state.plan()
+            stop = min(count, start + size)
+            began = time.perf_counter()
+            out.extend(run_batch(start, stop, workers))
+            elapsed = time.perf_counter() - began
+            with self._lock:
+                state.record(stop - start, workers, elapsed)
+            start = stop
+        return out
+
+    def sign_many(self, messages: Sequence[bytes],
+                  private_key: Union[PrivateKey, UnpackedPrivateKey]) -> List[bytes]:
+        """
+        Sign many messages with one private key (see batching.sign_many).
+
+        Returns:
+            List of signatures, in the same order as the messages
+
+        Raises:
+            SignatureError: If any signature fails
+            TypeError: If a message is not bytes
+        """
+        messages = list(messages)
+        key = (private_key.param_set, 'sign', _size_class(messages))
+        return self._run(key, len(messages), lambda start, stop, workers: batching.sign_many(
+            messages[start:stop], private_key, workers))
+
+    def verify_many(self, messages: Sequence[bytes], signatures: Sequence[bytes],
+                    public_key: PublicKey) -> List[bool]:
+        """
+        Verify many signatures under one public key (see batching.verify_many).
+
+        Returns:
+            List of booleans, one per message
+
+        Raises:
+            TypeError: If inputs are not bytes
+            ValueError: If the numbers of messages and signatures differ
+        """
+        messages = list(messages)
+        signatures = list(signatures)
+        if len(signatures) != len(messages):
+            raise ValueError("Number of messages and signatures must match")
+        key = (public_key.param_set, 'verify', _size_class(messages))
+        return self._run(key, len(messages), lambda start, stop, workers: batching.verify_many(
+            messages[start:stop], signatures[start:stop], public_key, workers))
+
+    def decisions(self) -> Dict[Tuple[str, str, int], dict]:
+        """
+        Get the current settings per workload.
+
+        Returns:
+            {(param_set, op, size_class): {'batch_size', 'workers', 'batches',
+            'item_seconds', 'last_latency', 'throughput'}}, where
+            'item_seconds' is the estimated single-thread time per message
+            and 'throughput' is messages per second at the current workers
+        """
+        with self._lock:
+            return {key: state.snapshot() for key, state in self._tuning.items()}
+
+    @property
+    def max_workers(self) -> int:
+        """Upper bound on worker threads per batch"""
+        return self._max_workers
+
+
+__all__ = ['AdaptiveBatcher']
@@ -0,0 +1,741 @@
+"""
+PyFAEST - Batch signing and verification
+
+Signs or verifies many messages per call. Messages are packed into one
+contiguous arena and handed to native batch helpers compiled into the
+extension module, which loop over the batch without returning to Python.
+Large batches are split into chunks that run concurrently on a shared
+thread pool; the GIL is released for the whole duration of each chunk.
+
+Coalescer turns independent calls made concurrently from many threads into
+such batches, with a bounded extra wait per call.
+
+Example:
+    >>> from faest.batching import sign_many, verify_many
+    >>>
+    >>> signatures = sign_many(messages, keypair.private_key)
+    >>> results = verify_many(messages, signatures, keypair.public_key)
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import math
+import os
+import queue
+import threading
+import time
+
+from .core import (
+    ffi, lib, PARAMETER_SETS,
+    PrivateKey, UnpackedPrivateKey, PublicKey,
+    InvalidKeyPairError, SignatureError,
+)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+_available_cpus: Optional[int] = None
+
+# Native function pointers, cast once per parameter set
+_SIGN_FNS = {
+    name: ffi.cast('pyfaest_sign_fn', ffi.addressof(lib, params['sign'].__name__))
+    for name, params in PARAMETER_SETS.items()
+}
+_UNPACKED_SIGN_FNS = {
+    name: ffi.cast('pyfaest_sign_fn', ffi.addressof(lib, params['unpacked_sign'].__name__))
+    for name, params in PARAMETER_SETS.items()
+}
+_VERIFY_FNS = {
+    name: ffi.cast('pyfaest_verify_fn', ffi.addressof(lib, params['verify'].__name__))
+    for name, params in PARAMETER_SETS.items()
+}
+_UNPACK_FNS = {
+    name: ffi.cast('pyfaest_unpack_fn', ffi.addressof(lib, params['unpack'].__name__))
+    for name, params in PARAMETER_SETS.items()
+}
+_VALIDATE_FNS = {
+    name: ffi.cast('pyfaest_validate_fn', ffi.addressof(lib, params['validate'].__name__))
+    for name, params in PARAMETER_SETS.items()
+}
+_CLEAR_UNPACKED_FNS = {
+    name: ffi.cast('pyfaest_clear_unpacked_fn',
+                   ffi.addressof(lib, params['clear_unpacked'].__name__))
+    for name, params in PARAMETER_SETS.items()
+}
+
+
+def _public_key_fields(unpacked_type: str) -> Tuple[int, int, int, int]:
+    """(offset, size) of owf_input and owf_output in an unpacked key"""
+    fields = dict(ffi.typeof(unpacked_type).fields)
+    return (fields['owf_input'].offset, fields['owf_input'].type.length,
+            fields['owf_output'].offset, fields['owf_output'].type.length)
+
+
+_PUBLIC_KEY_FIELDS = {
+    name: _public_key_fields(params['unpacked_type'])
+    for name, params in PARAMETER_SETS.items()
+}
+
+
+def _read_first_line(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def _read_lines(path: str) -> List[str]:
+    try:
+        with open(path) as f:
+            return f.read().splitlines()
+    except OSError:
+        return []
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPU quota of this process's cgroup in CPUs, or None if unlimited"""
+    paths = {}
+    for line in _read_lines('/proc/self/cgroup'):
+        _, controllers, path = line.split(':', 2)
+        for controller in controllers.split(',') if controllers else ['']:
+            paths[controller] = path.strip('/')
+
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    if '' in paths:
+        for directory in (os.path.join('/sys/fs/cgroup', paths['']), '/sys/fs/cgroup'):
+            line = _read_first_line(os.path.join(directory, 'cpu.max'))
+            if line is not None:
+                quota, _, period = line.partition(' ')
+                if quota == 'max' or not period:
+                    return None
+                return int(quota) / int(period)
+
+    # cgroup v1: cfs_quota_us is -1 when unlimited
+    for name in ('cpu', 'cpu,cpuacct', 'cpuacct,cpu'):
+        base = os.path.join('/sys/fs/cgroup', name)
+        for directory in (os.path.join(base, paths.get('cpu', '')), base):
+            quota = _read_first_line(os.path.join(directory, 'cpu.cfs_quota_us'))
+            period = _read_first_line(os.path.join(directory, 'cpu.cfs_period_us'))
+            if quota is not None and period is not None:
+                if int(quota) <= 0:
+                    return None
+                return int(quota) / int(period)
+    return None
+
+
+def available_cpus() -> int:
+    """
+    Number of CPUs this process can use.
+
+    Honours the CPU affinity mask and a cgroup (v1 or v2) CPU quota, so in a
+    container limited to 2 CPUs this returns 2 even on a 64-core host.
+    """
+    global _available_cpus
+    if _available_cpus is None:
+        try:
+            count = len(os.sched_getaffinity(0))
+        except AttributeError:
+            count = os.cpu_count() or 1
+        try:
+            limit = _cgroup_cpu_limit()
+        except ValueError:
+            limit = None
+        if limit is not None:
+            count = min(count, max(1, math.ceil(limit)))
+        _available_cpus = max(1, count)
+    return _available_cpus
+
+
+def default_workers() -> int:
+    """Number of worker threads used when none is requested (see available_cpus())"""
+    return available_cpus()
+
+
+def _get_executor(workers: int) -> ThreadPoolExecutor:
+    """Get the shared worker pool, replacing it if more workers are needed"""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers < workers:
+            # A pool that is too small is left to finish any work already
+            # submitted to it by other threads; its idle threads are cheap.
+            _executor_workers = max(workers, default_workers())
+            _executor = ThreadPoolExecutor(max_workers=_executor_workers,
+                                           thread_name_prefix='faest-batch')
+        return _executor
+
+
+def _chunks(count: int, workers: int) -> List[Tuple[int, int]]:
+    """Split range(count) into at most `workers` contiguous (start, stop) ranges"""
+    parts = max(1, min(workers, count))
+    base, extra = divmod(count, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        stop = start + base + (1 if i < extra else 0)
+        if stop > start:
+            ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def _run(tasks, workers: int) -> None:
+    """Run (func, args) tasks, in the calling thread if only one"""
+    if len(tasks) == 1 or workers <= 1:
+        for func, args in tasks:
+            func(*args)
+        return
+    executor = _get_executor(workers)
+    futures = [executor.submit(func, *args) for func, args in tasks]
+    for future in futures:
+        future.result()
+
+
+def pack_messages(messages: Sequence[bytes]):
+    """
+    Pack messages into one arena.
+
+    Returns:
+        Tuple (data, offsets, lengths) of cdata suitable for the native
+        batch helpers
+    """
+    lengths_list = []
+    for message in messages:
+        if not isinstance(message, bytes):
+            raise TypeError("Message must be bytes")
+        lengths_list.append(len(message))
+    count = len(lengths_list)
+    offsets = ffi.new('size_t[]', count)
+    lengths = ffi.new('size_t[]', lengths_list)
+    pos = 0
+    for i, length in enumerate(lengths_list):
+        offsets[i] = pos
+        pos += length
+    data = ffi.from_buffer('uint8_t[]', b''.join(messages))
+    return data, offsets, lengths
+
+
+def sign_arena(private_key: Union[PrivateKey, UnpackedPrivateKey], data, offsets, lengths,
+               count: int, workers: Optional[int] = None):
+    """
+    Sign `count` messages stored in an arena.
+
+    Args:
+        private_key: The key to sign with (packed or unpacked)
+        data: uint8_t* cdata pointing at the message arena
+        offsets: size_t* cdata with the offset of each message in the arena
+        lengths: size_t* cdata with the length of each message
+        count: Number of messages
+        workers: Number of worker threads (default: default_workers())
+
+    Returns:
+        Tuple (signatures, signature_lens, results) of cdata arrays; signature
+        i starts at signatures + i * sig_size, results[i] is the return code
+    """
+    params = private_key._params
+    sig_size = params['sig_size']
+    if isinstance(private_key, UnpackedPrivateKey):
+        sign_fn = _UNPACKED_SIGN_FNS[private_key.param_set]
+    else:
+        sign_fn = _SIGN_FNS[private_key.param_set]
+    sk = private_key._sk_buf
+
+    signatures = ffi.new('uint8_t[]', max(count, 1) * sig_size)
+    signature_lens = ffi.new('size_t[]', max(count, 1))
+    results = ffi.new('int[]', max(count, 1))
+
+    workers = workers or default_workers()
+    tasks = [
+        (lib.pyfaest_sign_batch,
+         (sign_fn, sk, data, offsets + start, lengths + start, stop - start,
+          signatures + start * sig_size, sig_size, signature_lens + start,
+          results + start))
+        for start, stop in _chunks(count, workers)
+    ]
+    _run(tasks, workers)
+    return signatures, signature_lens, results
+
+
+def verify_arena(param_set: str, pks, pk_stride: int, data, offsets, lengths,
+                 signatures, sig_offsets, sig_lens, count: int,
+                 workers: Optional[int] = None):
+    """
+    Verify `count` signatures over messages stored in an arena.
+
+    Args:
+        param_set: The parameter set of the public keys
+        pks: uint8_t* cdata pointing at the public key(s)
+        pk_stride: Distance between consecutive public keys (0 for one key)
+        data, offsets, lengths: The message arena, as for sign_arena()
+        signatures: uint8_t* cdata pointing at the signature arena
+        sig_offsets, sig_lens: size_t* cdata locating each signature
+        count: Number of signatures
+        workers: Number of worker threads (default: default_workers())
+
+    Returns:
+        int[] cdata of return codes; 0 means the signature is valid
+    """
+    verify_fn = _VERIFY_FNS[param_set]
+    results = ffi.new('int[]', max(count, 1))
+
+    workers = workers or default_workers()
+    tasks = [
+        (lib.pyfaest_verify_batch,
+         (verify_fn, pks + start * pk_stride, pk_stride, data,
+          offsets + start, lengths + start, signatures,
+          sig_offsets + start, sig_lens + start, stop - start, results + start))
+        for start, stop in _chunks(count, workers)
+    ]
+    _run(tasks, workers)
+    return results
+
+
+def sign_many(messages: Sequence[bytes], private_key: Union[PrivateKey, UnpackedPrivateKey],
+              workers: Optional[int] = None) -> List[bytes]:
+    """
+    Sign many messages with one private key.
+
+    Args:
+        messages: The messages to sign (as bytes)
+        private_key: The private key to sign with (packed or unpacked)
+        workers: Number of worker threads (default: one per CPU)
+
+    Returns:
+        List of signatures, in the same order as the messages
+
+    Raises:
+        SignatureError: If any signature fails
+        TypeError: If a message is not bytes
+    """
+    out = _sign_each(list(messages), private_key, workers)
+    for i, signature in enumerate(out):
+        if isinstance(signature, SignatureError):
+            raise SignatureError(f"{signature} (message {i})")
+    return out
+
+
+def _sign_each(messages: List[bytes], private_key: Union[PrivateKey, UnpackedPrivateKey],
+               workers: Optional[int]) -> list:
+    """Sign a batch, returning a signature or a SignatureError per message"""
+    count = len(messages)
+    if count == 0:
+        return []
+    if isinstance(private_key, UnpackedPrivateKey) and not private_key._finalizer.alive:
+        raise SignatureError("Unpacked private key has been cleared")
+
+    data, offsets, lengths = pack_messages(messages)
+    signatures, signature_lens, results = sign_arena(
+        private_key, data, offsets, lengths, count, workers)
+
+    sig_size = private_key._params['sig_size']
+    out = []
+    for i in range(count):
+        if results[i] != 0:
+            out.append(SignatureError(
+                f"Signature generation failed with error code {results[i]}"
+            ))
+        else:
+            out.append(bytes(ffi.buffer(signatures + i * sig_size, signature_lens[i])))
+    return out
+
+
+def verify_many(messages: Sequence[bytes], signatures: Sequence[bytes],
+                public_key: Union[PublicKey, Sequence[PublicKey]],
+                workers: Optional[int] = None) -> List[bool]:
+    """
+    Verify many signatures.
+
+    Args:
+        messages: The messages that were signed
+        signatures: The signatures, one per message
+        public_key: One public key for all messages, or one per message
+                    (all with the same parameter set)
+        workers: Number of worker threads (default: one per CPU)
+
+    Returns:
+        List of booleans, one per message
+
+    Raises:
+        TypeError: If inputs are not bytes
+        ValueError: If input lengths or parameter sets do not match
+    """
+    messages = list(messages)
+    signatures = list(signatures)
+    count = len(messages)
+    if len(signatures) != count:
+        raise ValueError("Number of messages and signatures must match")
+    if count == 0:
+        return []
+
+    if isinstance(public_key, PublicKey):
+        param_set = public_key.param_set
+        pk_stride = 0
+        pk_data = public_key.to_bytes()
+    else:
+        public_keys = list(public_key)
+        if len(public_keys) != count:
+            raise ValueError("Number of messages and public keys must match")
+        param_set = public_keys[0].param_set
+        if any(pk.param_set != param_set for pk in public_keys):
+            raise ValueError("All public keys must use the same parameter set")
+        pk_stride = PARAMETER_SETS[param_set]['pk_size']
+        pk_data = b''.join(pk.to_bytes() for pk in public_keys)
+
+    data, offsets, lengths = pack_messages(messages)
+    try:
+        sig_data, sig_offsets, sig_lens = pack_messages(signatures)
+    except TypeError:
+        raise TypeError("Signature must be bytes") from None
+    pks = ffi.from_buffer('uint8_t[]', pk_data)
+
+    results = verify_arena(param_set, pks, pk_stride, data, offsets, lengths,
+                           sig_data, sig_offsets, sig_lens, count, workers)
+    return [results[i] == 0 for i in range(count)]
+
+
+def derive_public_keys(private_keys, param_set: str, workers: Optional[int] = None) -> bytes:
+    """
+    Derive the public keys of many private keys.
+
+    A public key is the OWF input (the first bytes of the private key)
+    followed by the OWF output. When libfaest is linked statically, the OWF
+    is computed directly; otherwise each key is unpacked natively (which
+    also expands the witness) and the unpacked data cleared afterwards.
+    Every derived key pair is checked with validate_keypair. Chunks of keys
+    run on the batch worker threads.
+
+    Args:
+        private_keys: Raw private keys, concatenated, as any buffer (bytes,
+                      bytearray, memoryview, mmap, NumPy array)
+        param_set: Parameter set of the keys
+        workers: Number of worker threads (default: one per CPU)
+
+    Returns:
+        The public keys, concatenated in the same order (pk_size bytes each)
+
+    Raises:
+        InvalidKeyPairError: If a private key is invalid
+        ValueError: If param_set is unknown or the buffer size is not a
+                    multiple of the private key size
+    """
+    if param_set not in PARAMETER_SETS:
+        raise ValueError(f"Invalid parameter set: {param_set}")
+    params = PARAMETER_SETS[param_set]
+    sk_size, pk_size = params['sk_size'], params['pk_size']
+    sks = ffi.from_buffer('uint8_t[]', private_keys)
+    total = len(sks)
+    if total % sk_size:
+        raise ValueError(f"Private key buffer size {total} is not a multiple of {sk_size}")
+    count = total // sk_size
+    if count == 0:
+        return b''
+
+    input_offset, input_size, output_offset, output_size = _PUBLIC_KEY_FIELDS[param_set]
+    pks = ffi.new('uint8_t[]', count * pk_size)
+    results = ffi.new('int[]', count)
+    owf_fn = lib.pyfaest_owf(params['param_id'])
+
+    workers = workers or default_workers()
+    if owf_fn != ffi.NULL:
+        tasks = [
+            (lib.pyfaest_owf_derive_batch,
+             (owf_fn, _VALIDATE_FNS[param_set], input_size, sk_size - input_size, output_size,
+              sks + start * sk_size, stop - start, pks + start * pk_size, results + start))
+            for start, stop in _chunks(count, workers)
+        ]
+    else:
+        unpacked_size = ffi.sizeof(params['unpacked_type'])
+        tasks = [
+            (lib.pyfaest_derive_batch,
+             (_UNPACK_FNS[param_set], _CLEAR_UNPACKED_FNS[param_set], _VALIDATE_FNS[param_set],
+              ffi.new('uint8_t[]', unpacked_size), input_offset, input_size,
+              output_offset, output_size, sks + start * sk_size, sk_size, stop - start,
+              pks + start * pk_size, results + start))
+            for start, stop in _chunks(count, workers)
+        ]
+    _run(tasks, workers)
+    for i in range(count):
+        if results[i] != 0:
+            raise InvalidKeyPairError(f"Invalid private key {i} (error code {results[i]})")
+    return ffi.buffer(pks)[:]
+
+
+def validate_many(public_keys, private_keys, param_set: str,
+                  workers: Optional[int] = None) -> bytes:
+    """
+    Validate many keypairs in native batches.
+
+    Public key i and private key i are checked with validate_keypair, in
+    chunks on the batch worker threads. The keys are read in place, so
+    memory-mapped keystore files are not copied.
+
+    Args:
+        public_keys: Raw public keys, concatenated, as any buffer (bytes,
+                     bytearray, memoryview, mmap, NumPy array)
+        private_keys: Raw private keys, concatenated, in the same order
+        param_set: Parameter set of the keys
+        workers: Number of worker threads (default: one per CPU)
+
+    Returns:
+        Failure bitmap of ceil(count / 8) bytes: bit i (LSB first) is set if
+        keypair i is invalid, e.g.
+        [i for i in range(count) if bitmap[i >> 3] >> (i & 7) & 1].
+        All bytes are zero when every keypair is valid.
+
+    Raises:
+        ValueError: If param_set is unknown, a buffer size is not a multiple
+                    of the key size, or the key counts differ
+    """
+    if param_set not in PARAMETER_SETS:
+        raise ValueError(f"Invalid parameter set: {param_set}")
+    params = PARAMETER_SETS[param_set]
+    pk_size, sk_size = params['pk_size'], params['sk_size']
+    pks = ffi.from_buffer('uint8_t[]', public_keys)
+    sks = ffi.from_buffer('uint8_t[]', private_keys)
+    if len(pks) % pk_size:
+        raise ValueError(f"Public key buffer size {len(pks)} is not a multiple of {pk_size}")
+    if len(sks) % sk_size:
+        raise ValueError(f"Private key buffer size {len(sks)} is not a multiple of {sk_size}")
+    count = len(pks) // pk_size
+    if len(sks) // sk_size != count:
+        raise ValueError("Number of public and private keys must match")
+    if count == 0:
+        return b''
+
+    failures = ffi.new('uint8_t[]', (count + 7) // 8)
+    workers = workers or default_workers()
+    # Chunks start on byte boundaries of the bitmap, so no two threads
+    # write the same byte
+    tasks = []
+    for first, last in _chunks((count + 7) // 8, workers):
+        start, stop = first * 8, min(count, last * 8)
+        tasks.append((lib.pyfaest_validate_batch,
+                      (_VALIDATE_FNS[param_set], pks + start * pk_size, pk_size,
+                       sks + start * sk_size, sk_size, stop - start, failures + first)))
+    _run(tasks, workers)
+    return ffi.buffer(failures)[:]
+
+
+_OP_SIGN = 'sign'
+_OP_VERIFY = 'verify'
+
+
+class _Call:
+    __slots__ = ('op', 'group', 'key', 'message', 'signature', 'future')
+
+    def __init__(self, op, group, key, message, signature, future):
+        self.op = op
+        self.group = group
+        self.key = key
+        self.message = message
+        self.signature = signature
+        self.future = future
+
+
+class Coalescer:
+    """
+    Collects independent sign/verify calls from many threads into batches.
+
+    The first call to arrive opens a collection window; the window closes
+    after `max_delay` seconds or once `max_batch` calls have arrived, and the
+    collected calls are dispatched as native batches (grouped by signing key,
+    or by parameter set for verification). Each caller gets a Future that is
+    resolved when its batch completes.
+
+    A call therefore waits at most `max_delay` before its batch is dispatched.
+    Up to `max_inflight` batches execute at once; while they are all busy,
+    newly closed batches queue behind them.
+
+    Example:
+        >>> coalescer = Coalescer(max_delay=200e-6, max_batch=32)
+        >>> # from any number of threads:
+        >>> ok = coalescer.verify(message, signature, public_key)
+        >>> coalescer.close()
+    """
+
+    def __init__(self, max_delay: float = 200e-6, max_batch: int = 64,
+                 workers: Optional[int] = None, max_inflight: int = 2):
+        """
+        Initialize a coalescer and start its dispatcher thread.
+
+        Args:
+            max_delay: Maximum time in seconds a call waits for others to
+                       join its batch
+            max_batch: Maximum number of calls per batch
+            workers: Worker threads used to execute each batch
+                     (default: one per CPU)
+            max_inflight: Maximum number of batches executing concurrently
+        """
+        if max_delay < 0:
+            raise ValueError("max_delay must not be negative")
+        if max_batch <= 0:
+            raise ValueError("max_batch must be positive")
+        if max_inflight <= 0:
+            raise ValueError("max_inflight must be positive")
+
+        self._max_delay = max_delay
+        self._max_batch = max_batch
+        self._workers = workers
+        self._queue: 'queue.Queue[Optional[_Call]]' = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_inflight,
+                                            thread_name_prefix='faest-coalescer')
+        self._lock = threading.Lock()
+        self._closed = False
+        self._calls = 0
+        self._batches = 0
+        self._thread = threading.Thread(target=self._run, name='faest-coalescer',
+                                        daemon=True)
+        self._thread.start()
+
+    def _submit(self, call: _Call) -> Future:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Coalescer is closed")
+            self._queue.put(call)
+        return call.future
+
+    def submit_sign(self, message: bytes,
+                    private_key: Union[PrivateKey, UnpackedPrivateKey]) -> Future:
+        """
+        Queue a message for signing.
+
+        Returns:
+            A Future resolving to the signature bytes
+        """
+        if not isinstance(message, bytes):
+            raise TypeError("Message must be bytes")
+        return self._submit(_Call(_OP_SIGN, (_OP_SIGN, id(private_key)), private_key,
+                                  message, None, Future()))
+
+    def submit_verify(self, message: bytes, signature: bytes,
+                      public_key: PublicKey) -> Future:
+        """
+        Queue a signature for verification.
+
+        Returns:
+            A Future resolving to True if the signature is valid
+        """
+        if not isinstance(message, bytes):
+            raise TypeError("Message must be bytes")
+        if not isinstance(signature, bytes):
+            raise TypeError("Signature must be bytes")
+        return self._submit(_Call(_OP_VERIFY, (_OP_VERIFY, public_key.param_set), public_key,
+                                  message, signature, Future()))
+
+    def sign(self, message: bytes, private_key: Union[PrivateKey, UnpackedPrivateKey]) -> bytes:
+        """Sign a message as part of a batch and wait for the signature"""
+        return self.submit_sign(message, private_key).result()
+
+    def verify(self, message: bytes, signature: bytes, public_key: PublicKey) -> bool:
+        """Verify a signature as part of a batch and wait for the result"""
+        return self.submit_verify(message, signature, public_key).result()
+
+    def _collect(self, first: _Call) -> Tuple[List[_Call], bool]:
+        """Gather calls until the window closes; returns (batch, stopping)"""
+        batch = [first]
+        deadline = time.monotonic() + self._max_delay
+        while len(batch) < self._max_batch:
+            try:
+                call = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    call = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if call is None:
+                return batch, True
+            batch.append(call)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stopping = self._collect(first)
+            groups: Dict[tuple, List[_Call]] = {}
+            for call in batch:
+                groups.setdefault(call.group, []).append(call)
+            with self._lock:
+                self._calls += len(batch)
+                self._batches += len(groups)
+            for calls in groups.values():
+                self._executor.submit(self._execute, calls)
+            if stopping:
+                return
+
+    def _execute(self, calls: List[_Call]) -> None:
+        messages = [call.message for call in calls]
+        try:
+            if calls[0].op == _OP_SIGN:
+                results = _sign_each(messages, calls[0].key, self._workers)
+            else:
+                results = verify_many(messages, [call.signature for call in calls],
+                                      [call.key for call in calls], self._workers)
+        except Exception as e:
+            for call in calls:
+                call.future.set_exception(e)
+            return
+        for call, result in zip(calls, results):
+            if isinstance(result, Exception):
+                call.future.set_exception(result)
+            else:
+                call.future.set_result(result)
+
+    def stats(self) -> dict:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            Dictionary with 'calls', 'batches' and 'mean_batch_size'
+        """
+        with self._lock:
+            return {
+                'calls': self._calls,
+                'batches': self._batches,
+                'mean_batch_size': self._calls / self._batches if self._batches else 0.0,
+            }
+
+    @property
+    def max_delay(self) -> float:
+        """Maximum time in seconds a call waits before its batch is dispatched"""
+        return self._max_delay
+
+    @property
+    def max_batch(self) -> int:
+        """Maximum number of calls per batch"""
+        return self._max_batch
+
+    def close(self) -> None:
+        """Dispatch any queued calls, wait for them, and stop the dispatcher"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'Coalescer':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+__all__ = [
+    'Coalescer',
+    'sign_many',
+    'verify_many',
+    'sign_arena',
+    'verify_arena',
+    'pack_messages',
+    'derive_public_keys',
+    'validate_many',
+    'default_workers',
+    'available_cpus',
+]
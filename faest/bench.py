@@ -0,0 +1,671 @@
+"""
+PyFAEST - Benchmarks
+
+Measures key generation, signing and verification for every parameter set
+and prints SUPERCOP/NIST-style tables: median and quartiles over many runs,
+cost per message byte, and key and signature sizes.
+
+The per-byte cost is the verification slope between a short and a long
+message. Signing hashes the message the same way, but its grinding makes
+it too noisy to difference.
+
+With --cycles, times are CPU cycles read from the perf_event_open hardware
+counter of the calling thread. If that counter is unavailable (containers,
+VMs, perf_event_paranoid), the extension's cycle clock is used instead:
+the TSC on x86 (reference cycles at the nominal frequency, so frequency
+scaling and turbo are not accounted for), cntvct on arm64. Without
+--cycles, times are wall-clock nanoseconds.
+
+The library is called directly through cffi with preallocated buffers, so
+Python overhead is a few microseconds per operation.
+
+The compare subcommand checks a libfaest upgrade before it ships. It runs
+the baseline and candidate libraries in two worker processes, alternating
+single keygen/sign/verify trials between them so drift in CPU frequency or
+load affects both alike, and reports the change in median time with a
+Mann-Whitney U test for each operation. Keys and signatures made by each
+library are also checked by the other.
+
+Usage:
+    python -m faest.bench --cycles
+    python -m faest.bench --cycles --param-set 128f --param-set em_128f --runs 201
+    python -m faest.bench --format markdown > results.md
+    python -m faest.bench compare --baseline lib/linux/x86_64/libfaest.so.1 \\
+                                  --candidate ../faest-ref/build/libfaest.so.1
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import argparse
+import ctypes
+import json
+import math
+import os
+import platform
+import statistics
+import struct
+import subprocess
+import sys
+import time
+
+from .core import ffi, lib, PARAMETER_SETS
+
+# Message length used for the headline numbers, as in SUPERCOP tables
+MESSAGE_SIZE = 59
+# Long message used to derive the per-byte cost
+LONG_MESSAGE_SIZE = 1 << 20
+
+_PERF_EVENT_OPEN = {'x86_64': 298, 'amd64': 298, 'aarch64': 241, 'arm64': 241}
+_PERF_TYPE_HARDWARE = 0
+_PERF_COUNT_HW_CPU_CYCLES = 0
+_PERF_EXCLUDE_KERNEL = 1 << 5
+_PERF_EXCLUDE_HV = 1 << 6
+_PERF_FLAG_FD_CLOEXEC = 1 << 3
+
+
+class PerfCycleCounter:
+    """Hardware cycle counter for the calling thread (Linux perf_event_open)"""
+
+    unit = 'cycles'
+
+    def __init__(self):
+        """
+        Raises:
+            OSError: If the counter cannot be opened
+        """
+        number = _PERF_EVENT_OPEN.get(platform.machine().lower())
+        if not sys.platform.startswith('linux') or number is None:
+            raise OSError("perf_event_open is not supported on this platform")
+        # struct perf_event_attr, PERF_ATTR_SIZE_VER0 (64 bytes)
+        attr = ctypes.create_string_buffer(struct.pack(
+            '<IIQQQQQIIQ', _PERF_TYPE_HARDWARE, 64, _PERF_COUNT_HW_CPU_CYCLES,
+            0, 0, 0, _PERF_EXCLUDE_KERNEL | _PERF_EXCLUDE_HV, 0, 0, 0), 64)
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.syscall.restype = ctypes.c_long
+        fd = libc.syscall(ctypes.c_long(number), attr, ctypes.c_int(0), ctypes.c_int(-1),
+                          ctypes.c_int(-1), ctypes.c_ulong(_PERF_FLAG_FD_CLOEXEC))
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"perf_event_open failed: {os.strerror(errno)}")
+        self._fd = fd
+        self.description = 'perf_event_open CPU cycles (user space)'
+
+    def read(self) -> int:
+        """Read the current cycle count"""
+        return int.from_bytes(os.read(self._fd, 8), 'little')
+
+    def close(self) -> None:
+        """Close the counter"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class ClockCounter:
+    """The extension's cycle clock (TSC on x86, cntvct on arm64)"""
+
+    def __init__(self):
+        name = ffi.string(lib.pyfaest_clock_name()).decode()
+        self.unit = 'ns' if name == 'ns' else 'cycles'
+        self.description = {
+            'tsc': 'rdtsc reference cycles (perf counters unavailable)',
+            'cntvct': 'cntvct_el0 ticks (perf counters unavailable)',
+        }.get(name, 'CLOCK_MONOTONIC nanoseconds (no cycle counter)')
+        self.read = lib.pyfaest_clock
+
+    def close(self) -> None:
+        pass
+
+
+class WallClockCounter:
+    """Wall-clock nanoseconds"""
+
+    unit = 'ns'
+    description = 'wall-clock nanoseconds (time.perf_counter_ns)'
+    read = staticmethod(time.perf_counter_ns)
+
+    def close(self) -> None:
+        pass
+
+
+def open_counter(cycles: bool = True):
+    """
+    Open the best available counter.
+
+    Args:
+        cycles: Count CPU cycles (perf counters, then the cycle clock)
+                instead of wall-clock nanoseconds
+
+    Returns:
+        A counter with read(), close(), unit and description
+    """
+    if not cycles:
+        return WallClockCounter()
+    try:
+        return PerfCycleCounter()
+    except OSError:
+        return ClockCounter()
+
+
+class Measurement:
+    """Repeated measurements of one operation"""
+
+    def __init__(self, samples: Sequence[int]):
+        self.samples = sorted(samples)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples)
+
+    @property
+    def quartiles(self):
+        """(lower quartile, upper quartile)"""
+        if len(self.samples) < 2:
+            return self.samples[0], self.samples[0]
+        q1, _, q3 = statistics.quantiles(self.samples, n=4, method='inclusive')
+        return q1, q3
+
+
+def _measure(counter, operation: Callable[[], int], runs: int, warmup: int) -> Measurement:
+    for _ in range(warmup):
+        operation()
+    samples = []
+    read = counter.read
+    for _ in range(runs):
+        start = read()
+        result = operation()
+        samples.append(read() - start)
+        if result != 0:
+            raise RuntimeError(f"Benchmarked operation failed with error code {result}")
+    return Measurement(samples)
+
+
+def benchmark_parameter_set(param_set: str, counter, runs: int = 31, warmup: int = 2,
+                            long_message_size: int = LONG_MESSAGE_SIZE) -> Dict[str, object]:
+    """
+    Benchmark one parameter set.
+
+    Args:
+        param_set: Parameter set name
+        counter: Counter from open_counter()
+        runs: Measured runs per operation
+        warmup: Unmeasured runs before each operation
+        long_message_size: Message length used for the per-byte cost
+
+    Returns:
+        Dictionary with Measurement entries 'keygen', 'sign', 'verify' and
+        'verify_long', and 'per_byte' (cost per message byte)
+    """
+    params = PARAMETER_SETS[param_set]
+    pk = ffi.new('uint8_t[]', params['pk_size'])
+    sk = ffi.new('uint8_t[]', params['sk_size'])
+    signature = ffi.new('uint8_t[]', params['sig_size'])
+    sig_len = ffi.new('size_t*')
+    message = ffi.new('uint8_t[]', os.urandom(MESSAGE_SIZE))
+    long_message = ffi.new('uint8_t[]', os.urandom(long_message_size))
+
+    keygen_fn, sign_fn, verify_fn = params['keygen'], params['sign'], params['verify']
+
+    def keygen():
+        return keygen_fn(pk, sk)
+
+    def sign(msg=message, length=MESSAGE_SIZE, out=signature, out_len=sig_len):
+        out_len[0] = params['sig_size']
+        return sign_fn(sk, msg, length, out, out_len)
+
+    def verify():
+        return verify_fn(pk, message, MESSAGE_SIZE, signature, sig_len[0])
+
+    long_signature = ffi.new('uint8_t[]', params['sig_size'])
+    long_sig_len = ffi.new('size_t*')
+
+    def verify_long():
+        return verify_fn(pk, long_message, long_message_size, long_signature, long_sig_len[0])
+
+    try:
+        results = {'keygen': _measure(counter, keygen, runs, warmup)}
+        results['sign'] = _measure(counter, sign, runs, warmup)
+        results['verify'] = _measure(counter, verify, runs, warmup)
+        if sign(long_message, long_message_size, long_signature, long_sig_len) != 0:
+            raise RuntimeError("Signing the long message failed")
+        results['verify_long'] = _measure(counter, verify_long, runs, warmup)
+    finally:
+        params['clear'](sk)
+    results['per_byte'] = max(
+        0.0, (results['verify_long'].median - results['verify'].median)
+        / (long_message_size - MESSAGE_SIZE))
+    return results
+
+
+def _thousands(value: float) -> str:
+    return f"{value:,.0f}"
+
+
+def format_results(results: Dict[str, dict], counter, fmt: str = 'table') -> str:
+    """
+    Format benchmark results.
+
+    Args:
+        results: {param_set: benchmark_parameter_set() result}
+        counter: Counter the results were measured with
+        fmt: 'table' (aligned text), 'markdown' or 'csv'
+
+    Returns:
+        The formatted report
+    """
+    unit = counter.unit
+    rows = []
+    for param_set, r in results.items():
+        params = PARAMETER_SETS[param_set]
+        row = {
+            'parameter set': f"FAEST-{param_set.upper().replace('_', '-')}",
+            'pk bytes': str(params['pk_size']),
+            'sk bytes': str(params['sk_size']),
+            'sig bytes': str(params['sig_size']),
+        }
+        for op in ('keygen', 'sign', 'verify'):
+            q1, q3 = r[op].quartiles
+            row[f'{op} {unit}'] = _thousands(r[op].median)
+            row[f'{op} q1-q3'] = f"{_thousands(q1)}-{_thousands(q3)}"
+        row[f'{unit}/msg byte'] = f"{r['per_byte']:.1f}"
+        rows.append(row)
+    if not rows:
+        return ''
+    headers = list(rows[0])
+
+    if fmt == 'csv':
+        lines = [','.join(headers)]
+        lines += [','.join(f'"{row[h]}"' for h in headers) for row in rows]
+        return '\n'.join(lines)
+
+    if fmt == 'markdown':
+        lines = ['| ' + ' | '.join(headers) + ' |',
+                 '|' + '|'.join('---' if i == 0 else '---:' for i in range(len(headers))) + '|']
+        lines += ['| ' + ' | '.join(row[h] for h in headers) + ' |' for row in rows]
+        return '\n'.join(lines)
+
+    widths = {h: max(len(h), *(len(row[h]) for row in rows)) for h in headers}
+    lines = ['  '.join(h.ljust(widths[h]) if i == 0 else h.rjust(widths[h])
+                       for i, h in enumerate(headers))]
+    lines.append('  '.join('-' * widths[h] for h in headers))
+    for row in rows:
+        lines.append('  '.join(row[h].ljust(widths[h]) if i == 0 else row[h].rjust(widths[h])
+                               for i, h in enumerate(headers)))
+    return '\n'.join(lines)
+
+
+# Worker started for each library under comparison. libfaest is loaded
+# before the extension, so the extension's libfaest.so.1 dependency is
+# satisfied by it (matched by soname) whatever its rpath says.
+_COMPARE_BOOTSTRAP = (
+    "import ctypes, sys; "
+    "ctypes.CDLL(sys.argv[1], mode=ctypes.RTLD_GLOBAL); "
+    "from faest.bench import _compare_worker; _compare_worker()"
+)
+COMPARE_OPERATIONS = ('keygen', 'sign', 'verify')
+
+
+def _loaded_library() -> Optional[str]:
+    """Path of the libfaest mapped into this process (Linux), or None"""
+    try:
+        with open('/proc/self/maps') as f:
+            for line in f:
+                path = line.split(None, 5)[-1].strip()
+                if os.path.basename(path).startswith('libfaest'):
+                    return os.path.realpath(path)
+    except OSError:
+        pass
+    return None
+
+
+def _compare_worker() -> None:
+    """Serve compare requests, one JSON object per line on stdin/stdout"""
+    keys: Dict[str, Tuple[bytes, bytes]] = {}
+    message = bytes(range(MESSAGE_SIZE))
+
+    def reply(obj):
+        sys.stdout.write(json.dumps(obj) + '\n')
+        sys.stdout.flush()
+
+    reply({'library': _loaded_library()})
+    for line in sys.stdin:
+        request = json.loads(line)
+        params = PARAMETER_SETS[request['param_set']]
+        command = request['command']
+        if command == 'keygen':
+            pk = ffi.new('uint8_t[]', params['pk_size'])
+            sk = ffi.new('uint8_t[]', params['sk_size'])
+            start = time.perf_counter_ns()
+            result = params['keygen'](pk, sk)
+            elapsed = time.perf_counter_ns() - start
+            reply({'ns': elapsed, 'ok': result == 0, 'pk': ffi.buffer(pk)[:].hex(),
+                   'sk': ffi.buffer(sk)[:].hex()})
+        elif command == 'use_key':
+            keys[request['param_set']] = (bytes.fromhex(request['pk']),
+                                          bytes.fromhex(request['sk']))
+            reply({'ok': params['validate'](*keys[request['param_set']]) == 0})
+        elif command == 'sign':
+            _, sk = keys[request['param_set']]
+            signature = ffi.new('uint8_t[]', params['sig_size'])
+            sig_len = ffi.new('size_t*', params['sig_size'])
+            start = time.perf_counter_ns()
+            result = params['sign'](sk, message, len(message), signature, sig_len)
+            elapsed = time.perf_counter_ns() - start
+            reply({'ns': elapsed, 'ok': result == 0,
+                   'signature': ffi.buffer(signature, sig_len[0])[:].hex()})
+        elif command == 'verify':
+            pk, _ = keys[request['param_set']]
+            signature = bytes.fromhex(request['signature'])
+            start = time.perf_counter_ns()
+            result = params['verify'](pk, message, len(message), signature, len(signature))
+            elapsed = time.perf_counter_ns() - start
+            reply({'ns': elapsed, 'ok': result == 0})
+
+
+class _CompareWorker:
+    """A worker process with one libfaest loaded"""
+
+    def __init__(self, library: str):
+        import faest
+        import _faest_cffi
+        path = [os.path.dirname(os.path.dirname(os.path.abspath(faest.__file__))),
+                os.path.dirname(os.path.abspath(_faest_cffi.__file__))]
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(path + [env.get('PYTHONPATH', '')]).rstrip(os.pathsep)
+        env['LD_LIBRARY_PATH'] = os.pathsep.join(
+            [os.path.dirname(library), env.get('LD_LIBRARY_PATH', '')]).rstrip(os.pathsep)
+        self._process = subprocess.Popen(
+            [sys.executable, '-c', _COMPARE_BOOTSTRAP, library], env=env,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        self.library = self._read()['library']
+
+    def _read(self) -> dict:
+        line = self._process.stdout.readline()
+        if not line:
+            raise RuntimeError("Benchmark worker exited unexpectedly")
+        return json.loads(line)
+
+    def request(self, command: str, param_set: str, **kwargs) -> dict:
+        kwargs.update(command=command, param_set=param_set)
+        self._process.stdin.write(json.dumps(kwargs) + '\n')
+        self._process.stdin.flush()
+        return self._read()
+
+    def close(self) -> None:
+        self._process.stdin.close()
+        self._process.wait()
+
+
+def _resolve_library(path: str) -> str:
+    """Accept a libfaest file or a directory holding libfaest.so.1"""
+    if os.path.isdir(path):
+        path = os.path.join(path, 'libfaest.so.1')
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"libfaest not found: {path}")
+    return os.path.realpath(path)
+
+
+def mann_whitney(a: Sequence[float], b: Sequence[float]) -> float:
+    """
+    Two-sided p-value of the Mann-Whitney U test (normal approximation).
+
+    Args:
+        a: Samples of the first distribution
+        b: Samples of the second distribution
+
+    Returns:
+        Probability of a rank difference at least this large if both
+        samples came from the same distribution
+    """
+    n1, n2 = len(a), len(b)
+    if not n1 or not n2:
+        return 1.0
+    combined = sorted([(value, 0) for value in a] + [(value, 1) for value in b])
+    n = n1 + n2
+    rank_sum = 0.0
+    ties = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        rank = (i + j) / 2 + 1
+        rank_sum += rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 0)
+        t = j - i + 1
+        ties += t ** 3 - t
+        i = j + 1
+    u = rank_sum - n1 * (n1 + 1) / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0.0
+    if variance <= 0:
+        return 1.0
+    delta = abs(u - n1 * n2 / 2)
+    z = max(0.0, delta - 0.5) / math.sqrt(variance)
+    return math.erfc(z / math.sqrt(2))
+
+
+def compare_libraries(baseline: str, candidate: str, param_sets: Sequence[str],
+                      runs: int = 11, warmup: int = 1, alpha: float = 0.01,
+                      threshold: float = 0.02) -> Dict[str, dict]:
+    """
+    Benchmark two libfaest builds against each other.
+
+    Trials alternate between the libraries (ABBA order). Each library signs
+    with keys from both, and verifies its own and the other's signatures.
+
+    Args:
+        baseline: Path of the reference libfaest.so.1 (or its directory)
+        candidate: Path of the libfaest.so.1 under test (or its directory)
+        param_sets: Parameter sets to compare
+        runs: Timed trials per operation and library
+        warmup: Untimed trials per operation and library
+        alpha: Significance level of the Mann-Whitney test
+        threshold: Smallest relative change in the median reported as a
+                   speedup or regression
+
+    Returns:
+        {param_set: {'cross_verified': bool, op: {'baseline', 'candidate':
+        median ns, 'change': relative change of the candidate's median,
+        'p_value', 'verdict': 'faster', 'slower' or 'same'}}}
+
+    Raises:
+        FileNotFoundError: If a library does not exist
+        RuntimeError: If a worker did not load the requested library
+    """
+    paths = [_resolve_library(baseline), _resolve_library(candidate)]
+    workers = []
+    try:
+        for path in paths:
+            worker = _CompareWorker(path)
+            workers.append(worker)
+            if worker.library is not None and worker.library != path:
+                raise RuntimeError(f"Worker loaded {worker.library} instead of {path} "
+                                   "(is the extension linked statically?)")
+
+        results = {}
+        for param_set in param_sets:
+            # Each library generates a key; both sign with the baseline's key
+            # and check that the candidate's key validates under the baseline
+            made = [w.request('keygen', param_set) for w in workers]
+            cross = all(m['ok'] for m in made)
+            for worker in workers:
+                for key in made:
+                    cross &= worker.request('use_key', param_set, pk=key['pk'],
+                                            sk=key['sk'])['ok']
+            for worker in workers:
+                worker.request('use_key', param_set, pk=made[0]['pk'], sk=made[0]['sk'])
+
+            signatures = [w.request('sign', param_set) for w in workers]
+            cross &= all(s['ok'] for s in signatures)
+            for worker in workers:
+                for signature in signatures:
+                    cross &= worker.request('verify', param_set,
+                                            signature=signature['signature'])['ok']
+
+            samples = {op: ([], []) for op in COMPARE_OPERATIONS}
+            for trial in range(warmup + runs):
+                order = (0, 1) if trial % 2 == 0 else (1, 0)
+                for op in COMPARE_OPERATIONS:
+                    for index in order:
+                        if op == 'verify':
+                            reply = workers[index].request(
+                                op, param_set, signature=signatures[0]['signature'])
+                        else:
+                            reply = workers[index].request(op, param_set)
+                        if not reply['ok']:
+                            raise RuntimeError(f"{op} failed for {param_set} with {paths[index]}")
+                        if trial >= warmup:
+                            samples[op][index].append(reply['ns'])
+
+            row = {'cross_verified': bool(cross)}
+            for op, (base, cand) in samples.items():
+                base_median, cand_median = statistics.median(base), statistics.median(cand)
+                change = cand_median / base_median - 1
+                p_value = mann_whitney(base, cand)
+                verdict = 'same'
+                if p_value < alpha and abs(change) >= threshold:
+                    verdict = 'slower' if change > 0 else 'faster'
+                row[op] = {'baseline': base_median, 'candidate': cand_median,
+                           'change': change, 'p_value': p_value, 'verdict': verdict}
+            results[param_set] = row
+        return results
+    finally:
+        for worker in workers:
+            worker.close()
+
+
+def format_comparison(results: Dict[str, dict]) -> str:
+    """Format compare_libraries() results as an aligned table"""
+    lines = [f"{'parameter set':<16}{'op':<8}{'baseline ns':>14}{'candidate ns':>14}"
+             f"{'change':>9}{'p-value':>10}  verdict"]
+    for param_set, row in results.items():
+        name = f"FAEST-{param_set.upper().replace('_', '-')}"
+        for op in COMPARE_OPERATIONS:
+            r = row[op]
+            lines.append(f"{name:<16}{op:<8}{_thousands(r['baseline']):>14}"
+                         f"{_thousands(r['candidate']):>14}{r['change']:>+9.1%}"
+                         f"{r['p_value']:>10.4f}  {r['verdict']}")
+        lines.append(f"{name:<16}{'cross-verification':<44}"
+                     f"  {'ok' if row['cross_verified'] else 'FAILED'}")
+    return '\n'.join(lines)
+
+
+def compare_main(argv: Sequence[str]) -> int:
+    """
+    Entry point of `python -m faest.bench compare`.
+
+    Returns:
+        0 if nothing regressed, 1 on a significant regression or a
+        cross-verification failure, 2 on usage errors
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m faest.bench compare',
+        description="Compare the speed of two libfaest builds and cross-verify their output",
+    )
+    parser.add_argument('--baseline', required=True,
+                        help="reference libfaest.so.1 (file or directory)")
+    parser.add_argument('--candidate', required=True,
+                        help="libfaest.so.1 under test (file or directory)")
+    parser.add_argument('--param-set', action='append', choices=list(PARAMETER_SETS),
+                        help="parameter set to compare (repeatable, default: all)")
+    parser.add_argument('--runs', type=int, default=11,
+                        help="timed trials per operation and library (default: 11)")
+    parser.add_argument('--warmup', type=int, default=1,
+                        help="untimed trials per operation and library (default: 1)")
+    parser.add_argument('--alpha', type=float, default=0.01,
+                        help="significance level (default: 0.01)")
+    parser.add_argument('--threshold', type=float, default=0.02,
+                        help="smallest relative change reported (default: 0.02)")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args(argv)
+    if args.runs < 2:
+        print("error: --runs must be at least 2", file=sys.stderr)
+        return 2
+
+    try:
+        results = compare_libraries(args.baseline, args.candidate,
+                                    args.param_set or list(PARAMETER_SETS), args.runs,
+                                    args.warmup, args.alpha, args.threshold)
+    except FileNotFoundError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"# baseline:  {_resolve_library(args.baseline)}")
+        print(f"# candidate: {_resolve_library(args.candidate)}")
+        print(f"# {args.runs} interleaved trials per operation, median wall-clock ns, "
+              f"Mann-Whitney U test at alpha={args.alpha}")
+        print(format_comparison(results))
+    failed = any(not row['cross_verified'] or
+                 any(row[op]['verdict'] == 'slower' for op in COMPARE_OPERATIONS)
+                 for row in results.values())
+    return 1 if failed else 0
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m faest.bench',
+        description="Benchmark FAEST key generation, signing and verification",
+    )
+    parser.add_argument('--cycles', action='store_true',
+                        help="measure CPU cycles instead of wall-clock time")
+    parser.add_argument('--param-set', action='append', choices=list(PARAMETER_SETS),
+                        help="parameter set to benchmark (repeatable, default: all)")
+    parser.add_argument('--runs', type=int, default=31,
+                        help="measured runs per operation (default: 31)")
+    parser.add_argument('--warmup', type=int, default=2,
+                        help="unmeasured runs before each operation (default: 2)")
+    parser.add_argument('--format', choices=['table', 'markdown', 'csv'], default='table')
+    parser.add_argument('--cpu', type=int,
+                        help="pin the benchmark to this CPU (Linux)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] == 'compare':
+        return compare_main(argv[1:])
+    args = _build_parser().parse_args(argv)
+    if args.runs < 1:
+        print("error: --runs must be at least 1", file=sys.stderr)
+        return 2
+    if args.cpu is not None:
+        os.sched_setaffinity(0, {args.cpu})
+
+    counter = open_counter(args.cycles)
+    try:
+        results = {}
+        for param_set in args.param_set or list(PARAMETER_SETS):
+            print(f"benchmarking {param_set}...", file=sys.stderr)
+            results[param_set] = benchmark_parameter_set(param_set, counter, args.runs,
+                                                         args.warmup)
+        if args.format != 'csv':
+            print(f"# counter: {counter.description}")
+            print(f"# {args.runs} runs per operation, median and quartiles; "
+                  f"sign/verify on {MESSAGE_SIZE}-byte messages; "
+                  f"per-byte cost from {LONG_MESSAGE_SIZE}-byte messages")
+            print(f"# {platform.machine()}, {platform.processor() or platform.system()}, "
+                  f"Python {platform.python_version()}")
+        print(format_results(results, counter, args.format))
+    finally:
+        counter.close()
+    return 0
+
+
+__all__ = [
+    'Measurement',
+    'PerfCycleCounter',
+    'ClockCounter',
+    'WallClockCounter',
+    'open_counter',
+    'benchmark_parameter_set',
+    'format_results',
+    'mann_whitney',
+    'compare_libraries',
+    'format_comparison',
+    'main',
+]
+
+
+if __name__ == '__main__':
+    sys.exit(main())
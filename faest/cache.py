@@ -0,0 +1,220 @@
+"""
+PyFAEST - Idempotent signing cache
+
+FAEST signing samples fresh randomness, so signing the same message twice
+produces two different (equally valid) signatures and pays the full signing
+cost each time. SigningCache remembers the signature produced for a
+(private key, message) pair for a limited time, so retried requests get the
+original signature back instead of a brand new one.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Union
+import hashlib
+import os
+import threading
+import time
+import weakref
+
+from .core import ffi, PrivateKey, UnpackedPrivateKey, sign
+
+
+class SigningCache:
+    """
+    Bounded, time-limited cache of signatures keyed by (private key, message).
+
+    Each key object gets a fingerprint once, a keyed BLAKE2b digest of its
+    parameter set and key (the secret key buffer of a PrivateKey, the public
+    key of an UnpackedPrivateKey). Entries are indexed by the message hashed
+    under that fingerprint, so neither the message nor the key material is
+    retained by the cache. Concurrent requests for the same entry share a
+    single signing operation.
+
+    Example:
+        >>> cache = SigningCache(maxsize=10000, ttl=30.0)
+        >>> sig1 = cache.sign(b"request-body", keypair.private_key)
+        >>> sig2 = cache.sign(b"request-body", keypair.private_key)
+        >>> sig1 == sig2
+        True
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize a signing cache.
+
+        Args:
+            maxsize: Maximum number of signatures kept; the oldest entries
+                     are evicted first once the limit is reached
+            ttl: Time in seconds for which a cached signature is returned
+            clock: Monotonic time source (overridable for testing)
+        """
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._clock = clock
+        # Per-cache secret so cache keys cannot be linked to messages offline
+        self._salt = os.urandom(32)
+        self._lock = threading.Lock()
+        # digest -> (expiry, signature), in insertion (and so expiry) order
+        self._entries: 'OrderedDict[bytes, tuple]' = OrderedDict()
+        self._pending: Dict[bytes, Future] = {}
+        self._fingerprints: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _fingerprint(self, private_key: Union[PrivateKey, UnpackedPrivateKey]) -> bytes:
+        """Keyed fingerprint of a private key, computed once per key object"""
+        with self._lock:
+            fingerprint = self._fingerprints.get(private_key)
+        if fingerprint is not None:
+            return fingerprint
+        h = hashlib.blake2b(key=self._salt, digest_size=32)
+        h.update(private_key.param_set.encode('ascii'))
+        if isinstance(private_key, UnpackedPrivateKey):
+            h.update(b'\x00pk')
+            h.update(private_key.public_key().to_bytes())
+        else:
+            # Hash the key buffer in place rather than copying it with to_bytes()
+            h.update(b'\x00sk')
+            h.update(ffi.buffer(private_key._sk_buf))
+        fingerprint = h.digest()
+        with self._lock:
+            self._fingerprints[private_key] = fingerprint
+        return fingerprint
+
+    def _digest(self, message: bytes,
+                private_key: Union[PrivateKey, UnpackedPrivateKey]) -> bytes:
+        """Compute the cache key for a (key, message) pair"""
+        h = hashlib.blake2b(key=self._fingerprint(private_key), digest_size=32)
+        h.update(message)
+        return h.digest()
+
+    def _purge(self, now: float) -> None:
+        """Drop expired entries and enforce the size bound (lock held)"""
+        entries = self._entries
+        while entries:
+            digest, (expires, _) = next(iter(entries.items()))
+            if expires > now and len(entries) <= self._maxsize:
+                break
+            del entries[digest]
+            if expires > now:
+                self._evictions += 1
+
+    def sign(self, message: bytes,
+             private_key: Union[PrivateKey, UnpackedPrivateKey]) -> bytes:
+        """
+        Sign a message, reusing a cached signature if one is still valid.
+
+        Args:
+            message: The message to sign (as bytes)
+            private_key: The private key to sign with (packed or unpacked)
+
+        Returns:
+            The signature as bytes
+
+        Raises:
+            FaestError: If an unpacked key has been cleared
+            SignatureError: If signing fails
+            TypeError: If message is not bytes
+        """
+        if not isinstance(message, bytes):
+            raise TypeError("Message must be bytes")
+
+        digest = self._digest(message, private_key)
+
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(digest)
+            if entry is not None and entry[0] > now:
+                self._hits += 1
+                return entry[1]
+
+            pending = self._pending.get(digest)
+            if pending is None:
+                self._misses += 1
+                future = Future()
+                self._pending[digest] = future
+
+        if pending is not None:
+            # Another thread is already signing this exact request
+            with self._lock:
+                self._hits += 1
+            return pending.result()
+
+        try:
+            signature = sign(message, private_key)
+        except BaseException as e:
+            with self._lock:
+                del self._pending[digest]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            now = self._clock()
+            self._entries.pop(digest, None)
+            self._entries[digest] = (now + self._ttl, signature)
+            del self._pending[digest]
+            self._purge(now)
+        future.set_result(signature)
+        return signature
+
+    def invalidate(self, message: bytes,
+                   private_key: Union[PrivateKey, UnpackedPrivateKey]) -> bool:
+        """
+        Remove the cached signature for a (key, message) pair.
+
+        Returns:
+            True if an entry was removed, False otherwise
+        """
+        digest = self._digest(message, private_key)
+        with self._lock:
+            return self._entries.pop(digest, None) is not None
+
+    def clear(self) -> None:
+        """Remove all cached signatures"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with 'hits', 'misses', 'evictions', 'size' and 'maxsize'
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'size': len(self._entries),
+                'maxsize': self._maxsize,
+            }
+
+    @property
+    def maxsize(self) -> int:
+        """Maximum number of cached signatures"""
+        return self._maxsize
+
+    @property
+    def ttl(self) -> float:
+        """Lifetime of a cached signature in seconds"""
+        return self._ttl
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._purge(self._clock())
+            return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"SigningCache(maxsize={self._maxsize}, ttl={self._ttl})"
+
+
+__all__ = ['SigningCache']
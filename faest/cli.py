@@ -0,0 +1,474 @@
+"""
+PyFAEST - Command-line tool
+
+The `faest` command generates keys and signs or verifies many items per
+run:
+
+    faest keygen --param-set 128f --out release
+    faest sign --key release.sk dist/
+    faest verify --key release.pk dist/
+    find logs -name '*.gz' | faest sign --key release.sk
+    faest sign --key audit.sk --input lines < audit.log > audit.signed
+    faest verify --key audit.pk --input lines < audit.signed
+    faest sign --key audit.sk --input jsonl events.jsonl > signed.jsonl
+
+Inputs (--input):
+    files   each file is one message; directories are walked recursively
+            and file names are read from stdin when no path is given.
+            sign writes the raw signature to FILE.sig; verify reads it.
+    lines   each line (without its newline) is one message. sign writes
+            `base64(signature) TAB line`; verify reads that format back.
+    jsonl   one JSON object per line; the message is the UTF-8 encoding of
+            a string field (--field, default 'message'). sign adds the
+            base64 signature (--signature-field, default 'signature').
+For lines and jsonl, paths are input files and '-' or no path is stdin.
+
+Items are read by a background thread while the previous batch is signed
+or verified, and each batch is one batching.sign_many/verify_many call on
+the shared worker pool, so reading and signing overlap and the native calls
+run in parallel with the GIL released. Signing uses the unpacked private
+key. With --prehash, messages are hashed first (see faest.prehash), which
+suits large files.
+
+Key files are wire records (faest.wire) as written by keygen, or the raw
+bytes from to_bytes() when --param-set is given. Items that cannot be read
+or parsed, and (for verify) invalid signatures, are reported as one
+`FAILED name: reason` line, on stdout for verify and on stderr for sign;
+the command then exits 1. Bad keys and arguments exit 2. Progress and
+throughput go to stderr.
+"""
+
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence
+import argparse
+import base64
+import binascii
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+from .core import FaestError, Keypair, PrivateKey, PublicKey, PARAMETER_SETS
+from . import batching, prehash, wire
+
+DEFAULT_BATCH = 256
+DEFAULT_BATCH_BYTES = 64 << 20
+# Seconds between progress updates
+_PROGRESS_INTERVAL = 0.5
+
+
+class _Item:
+    """One message to sign or verify, with what is needed to write its result"""
+
+    __slots__ = ('name', 'message', 'signature', 'context', 'error')
+
+    def __init__(self, name: str, message: bytes = b'', signature: bytes = b'',
+                 context=None, error: Optional[str] = None):
+        self.name = name
+        self.message = message
+        self.signature = signature
+        self.context = context
+        self.error = error
+
+
+class _Progress:
+    """Item and byte counters, reported on stderr"""
+
+    def __init__(self, verb: str, live: bool, quiet: bool):
+        self.verb = verb
+        self.live = live and not quiet
+        self.quiet = quiet
+        self.items = 0
+        self.bytes = 0
+        self.failed = 0
+        self._start = time.perf_counter()
+        self._shown = self._start
+
+    def _rates(self, now: float) -> str:
+        elapsed = max(now - self._start, 1e-9)
+        return (f"{self.items} items, {self.bytes / (1 << 20):.1f} MiB in {elapsed:.1f} s "
+                f"({self.items / elapsed:.0f} items/s, "
+                f"{self.bytes / (1 << 20) / elapsed:.1f} MiB/s)")
+
+    def update(self, items: int, nbytes: int) -> None:
+        self.items += items
+        self.bytes += nbytes
+        now = time.perf_counter()
+        if self.live and now - self._shown >= _PROGRESS_INTERVAL:
+            self._shown = now
+            print(f"\r{self.verb} {self._rates(now)}", end='', file=sys.stderr, flush=True)
+
+    def finish(self) -> None:
+        if self.quiet:
+            return
+        if self.live:
+            print('\r', end='', file=sys.stderr)
+        failed = f", {self.failed} failed" if self.failed else ''
+        print(f"{self.verb} {self._rates(time.perf_counter())}{failed}", file=sys.stderr)
+
+
+def _prefetch(iterable: Iterable, depth: int = 2) -> Iterator:
+    """Iterate in a background thread, staying at most `depth` values ahead"""
+    values: queue.Queue = queue.Queue(depth)
+    done = object()
+
+    def fill():
+        try:
+            for value in iterable:
+                values.put((value, None))
+            values.put((done, None))
+        except BaseException as e:
+            values.put((done, e))
+
+    threading.Thread(target=fill, daemon=True).start()
+    while True:
+        value, error = values.get()
+        if value is done:
+            if error is not None:
+                raise error
+            return
+        yield value
+
+
+def _batched(items: Iterable[_Item], batch_size: int, batch_bytes: int) -> Iterator[List[_Item]]:
+    """Group items into batches bounded by count and total message size"""
+    batch: List[_Item] = []
+    size = 0
+    for item in items:
+        batch.append(item)
+        size += len(item.message)
+        if len(batch) >= batch_size or size >= batch_bytes:
+            yield batch
+            batch = []
+            size = 0
+    if batch:
+        yield batch
+
+
+def _read_lines(paths: Sequence[str]) -> Iterator[tuple]:
+    """Yield (source, line number, line without newline) from files or stdin"""
+    for path in paths or ['-']:
+        if path == '-':
+            source, stream, close = '<stdin>', sys.stdin.buffer, False
+        else:
+            source, stream, close = path, open(path, 'rb'), True
+        try:
+            for number, line in enumerate(stream, 1):
+                yield source, number, line[:-1] if line.endswith(b'\n') else line
+        finally:
+            if close:
+                stream.close()
+
+
+def _walk(paths: Sequence[str], suffix: str) -> Iterator[str]:
+    """Expand directories (sorted, recursively), skipping signature files"""
+    if not paths or list(paths) == ['-']:
+        paths = (os.fsdecode(line).rstrip('\r') for _, _, line in _read_lines(['-']))
+    for path in paths:
+        if not path:
+            continue
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if not name.endswith(suffix):
+                    yield os.path.join(root, name)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _file_items(paths: Sequence[str], suffix: str, verifying: bool) -> Iterator[_Item]:
+    for path in _walk(paths, suffix):
+        try:
+            message = _read_file(path)
+        except OSError as e:
+            yield _Item(path, error=e.strerror or str(e))
+            continue
+        signature = b''
+        if verifying:
+            try:
+                signature = _read_file(path + suffix)
+            except FileNotFoundError:
+                yield _Item(path, error="missing signature")
+                continue
+            except OSError as e:
+                yield _Item(path, error=e.strerror or str(e))
+                continue
+        yield _Item(path, message, signature)
+
+
+def _line_items(paths: Sequence[str], verifying: bool) -> Iterator[_Item]:
+    for source, number, line in _read_lines(paths):
+        name = f"{source}:{number}"
+        if not verifying:
+            yield _Item(name, line, context=line)
+            continue
+        encoded, tab, message = line.partition(b'\t')
+        try:
+            if not tab:
+                raise ValueError("expected base64 signature TAB message")
+            signature = base64.b64decode(encoded, validate=True)
+        except (ValueError, binascii.Error) as e:
+            yield _Item(name, error=str(e))
+            continue
+        yield _Item(name, message, signature)
+
+
+def _json_items(paths: Sequence[str], field: str, signature_field: str,
+                verifying: bool) -> Iterator[_Item]:
+    for source, number, line in _read_lines(paths):
+        if not line.strip():
+            continue
+        name = f"{source}:{number}"
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("expected a JSON object")
+            message = record.get(field)
+            if not isinstance(message, str):
+                raise ValueError(f"field '{field}' must be a string")
+            data = message.encode('utf-8')
+            signature = b''
+            if verifying:
+                encoded = record.get(signature_field)
+                if not isinstance(encoded, str):
+                    raise ValueError(f"field '{signature_field}' must be a string")
+                signature = base64.b64decode(encoded, validate=True)
+        except (ValueError, binascii.Error) as e:
+            yield _Item(name, error=str(e))
+            continue
+        yield _Item(name, data, signature, context=record)
+
+
+def _items(args, verifying: bool) -> Iterator[_Item]:
+    if args.input == 'files':
+        return _file_items(args.paths, args.suffix, verifying)
+    if args.input == 'lines':
+        return _line_items(args.paths, verifying)
+    return _json_items(args.paths, args.field, args.signature_field, verifying)
+
+
+def _process(items: Iterable[_Item], run_batch: Callable[[List[_Item]], list],
+             emit: Callable[[_Item, object], None], fail: Callable[[str, str], None],
+             progress: _Progress, batch_size: int, batch_bytes: int, out) -> None:
+    """
+    Run batches of items, calling emit(item, result) in input order and
+    fail(name, reason) for items that could not be read.
+    """
+    for batch in _prefetch(_batched(items, batch_size, batch_bytes)):
+        good = [item for item in batch if item.error is None]
+        results = iter(run_batch(good) if good else ())
+        for item in batch:
+            if item.error is not None:
+                fail(item.name, item.error)
+            else:
+                emit(item, next(results))
+        out.flush()
+        progress.update(len(batch), sum(len(item.message) for item in batch))
+
+
+def _load_key(path: str, private: bool, param_set: Optional[str]):
+    """Load a key file: a wire record, or raw bytes if param_set is given"""
+    data = _read_file(path)
+    if param_set is not None:
+        return (PrivateKey if private else PublicKey)(data, param_set)
+    try:
+        record = wire.decode(data)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e} (use --param-set for raw key files)") from None
+    expected = wire.PRIVATE_KEY if private else wire.PUBLIC_KEY
+    if record.kind != expected:
+        kind = 'private' if private else 'public'
+        raise ValueError(f"{path} does not contain a {kind} key")
+    return record.value()
+
+
+def _create(path: str, mode: int, force: bool) -> int:
+    """Create a file with exactly `mode`, replacing it only if force is set"""
+    flags = os.O_WRONLY | os.O_CREAT | (os.O_TRUNC if force else os.O_EXCL)
+    fd = os.open(path, flags, mode)
+    if hasattr(os, 'fchmod'):
+        # An existing file keeps its mode through O_TRUNC
+        os.fchmod(fd, mode)
+    return fd
+
+
+def keygen_main(args) -> int:
+    keypair = Keypair.generate(args.param_set)
+    pk, sk = keypair.public_key, keypair.private_key
+    if args.raw:
+        pk_bytes, sk_bytes = pk.to_bytes(), sk.to_bytes()
+    else:
+        pk_bytes, sk_bytes = wire.encode(pk), wire.encode(sk)
+    sk_path, pk_path = args.out + '.sk', args.out + '.pk'
+    # Create both files before writing either, so a clash leaves nothing behind
+    files = []
+    try:
+        for path, mode, data in ((sk_path, 0o600, sk_bytes), (pk_path, 0o644, pk_bytes)):
+            files.append((_create(path, mode, args.force), path, data))
+    except OSError as e:
+        for fd, path, _ in files:
+            os.close(fd)
+            if not args.force:
+                os.unlink(path)
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    for fd, _, data in files:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+    if not args.quiet:
+        print(f"Wrote {args.param_set} keypair to {sk_path} and {pk_path}", file=sys.stderr)
+    return 0
+
+
+def sign_main(args) -> int:
+    try:
+        private_key = _load_key(args.key, True, args.param_set)
+    except (OSError, ValueError, FaestError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    key = private_key.unpack()
+    signer = prehash.sign_many if args.prehash else batching.sign_many
+    out = sys.stdout.buffer
+    progress = _Progress('Signed', args.progress, args.quiet)
+
+    def fail(name, reason):
+        progress.failed += 1
+        print(f"FAILED {name}: {reason}", file=sys.stderr)
+
+    def run_batch(batch):
+        return signer([item.message for item in batch], key, args.workers)
+
+    def emit(item, signature):
+        if args.input == 'files':
+            try:
+                with open(item.name + args.suffix, 'wb') as f:
+                    f.write(signature)
+            except OSError as e:
+                fail(item.name, e.strerror or str(e))
+        elif args.input == 'lines':
+            out.write(base64.b64encode(signature) + b'\t' + item.context + b'\n')
+        else:
+            item.context[args.signature_field] = base64.b64encode(signature).decode('ascii')
+            out.write(json.dumps(item.context, separators=(',', ':')).encode('utf-8') + b'\n')
+
+    try:
+        _process(_items(args, False), run_batch, emit, fail, progress,
+                 args.batch, args.batch_bytes, out)
+    finally:
+        key.clear()
+    progress.finish()
+    return 1 if progress.failed else 0
+
+
+def verify_main(args) -> int:
+    try:
+        public_key = _load_key(args.key, False, args.param_set)
+    except (OSError, ValueError, FaestError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    verifier = prehash.verify_many if args.prehash else batching.verify_many
+    out = sys.stdout
+
+    def run_batch(batch):
+        return verifier([item.message for item in batch],
+                        [item.signature for item in batch], public_key, args.workers)
+
+    progress = _Progress('Verified', args.progress, args.quiet)
+
+    def fail(name, reason):
+        progress.failed += 1
+        print(f"FAILED {name}: {reason}", file=out)
+
+    def emit(item, valid):
+        if not valid:
+            fail(item.name, "invalid signature")
+
+    _process(_items(args, True), run_batch, emit, fail, progress,
+             args.batch, args.batch_bytes, out)
+    progress.finish()
+    return 1 if progress.failed else 0
+
+
+def _positive(text: str) -> int:
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"must be positive: {text}")
+    return value
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='faest',
+        description='Generate FAEST keys and sign or verify files, lines or JSONL records.',
+    )
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+    commands.required = True
+
+    keygen = commands.add_parser('keygen', help='generate a keypair')
+    keygen.add_argument('--param-set', default='128f', choices=list(PARAMETER_SETS),
+                        help='parameter set (default: 128f)')
+    keygen.add_argument('--out', required=True, metavar='PREFIX',
+                        help='write PREFIX.sk (mode 0600) and PREFIX.pk')
+    keygen.add_argument('--raw', action='store_true',
+                        help='write raw key bytes instead of wire records')
+    keygen.add_argument('--force', action='store_true', help='overwrite existing key files')
+    keygen.add_argument('-q', '--quiet', action='store_true')
+    keygen.set_defaults(run=keygen_main)
+
+    for name, run, key_help in (('sign', sign_main, 'private key file'),
+                                ('verify', verify_main, 'public key file')):
+        command = commands.add_parser(name, help=f'{name} files, lines or JSONL records')
+        command.add_argument('paths', nargs='*', metavar='PATH',
+                             help="files or directories (--input files), otherwise input "
+                                  "files; '-' or none reads stdin")
+        command.add_argument('-k', '--key', required=True, help=key_help)
+        command.add_argument('--param-set', choices=list(PARAMETER_SETS),
+                             help='read the key as raw bytes of this parameter set')
+        command.add_argument('--input', choices=('files', 'lines', 'jsonl'), default='files',
+                             help='input format (default: files)')
+        command.add_argument('--suffix', default='.sig',
+                             help='signature file suffix for --input files (default: .sig)')
+        command.add_argument('--field', default='message',
+                             help="JSONL message field (default: 'message')")
+        command.add_argument('--signature-field', default='signature',
+                             help="JSONL signature field (default: 'signature')")
+        command.add_argument('--prehash', action='store_true',
+                             help='sign or verify SHAKE digests of the messages')
+        command.add_argument('--workers', type=_positive, default=None,
+                             help='worker threads per batch (default: one per CPU)')
+        command.add_argument('--batch', type=_positive, default=DEFAULT_BATCH,
+                             help=f'items per native batch (default: {DEFAULT_BATCH})')
+        command.add_argument('--batch-bytes', type=_positive, default=DEFAULT_BATCH_BYTES,
+                             help='message bytes per batch (default: 64 MiB)')
+        command.add_argument('--progress', action='store_true', default=sys.stderr.isatty(),
+                             help='show live progress (default: if stderr is a terminal)')
+        command.add_argument('-q', '--quiet', action='store_true',
+                             help='no progress or summary')
+        command.set_defaults(run=run)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Entry point of the `faest` command"""
+    args = _build_parser().parse_args(argv)
+    try:
+        return args.run(args)
+    except KeyboardInterrupt:
+        return 130
+    except (OSError, FaestError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+
+__all__ = ['main']
+
+
+if __name__ == '__main__':
+    sys.exit(main())
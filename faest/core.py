@@ -3,14 +3,34 @@ PyFAEST - Python wrapper for FAEST post-quantum signature scheme
 
 This module provides a Pythonic interface to the FAEST C library.
 Handles memory management, error handling, and type conversions.
+
+Thread safety: sign(), verify() and key generation take no locks and share
+no mutable state, so they may be called concurrently from any number of
+threads, including on free-threaded (no-GIL) Python builds. PARAMETER_SETS
+is built once at import and must be treated as read-only. Key objects are
+immutable once constructed; an UnpackedPrivateKey must not be clear()ed
+while another thread is signing with it.
 """
 
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Union
+import sys
+import sysconfig
+import time
 import weakref
 
 try:
+    import _cffi_backend
+    import _faest_cffi
     from _faest_cffi import ffi, lib
-except ImportError:
+except ImportError as e:
+    if 'subinterpreters' in str(e):
+        # cffi modules use single-phase init and cannot be loaded in
+        # sub-interpreters that have their own GIL
+        raise ImportError(
+            "The FAEST bindings cannot be loaded in a sub-interpreter with its "
+            "own GIL. Use threads instead: faest.batching releases the GIL "
+            "around libfaest"
+        ) from e
     raise ImportError(
         "FAEST C library bindings not found. "
         "Please run 'python faest_build.py' to generate the bindings, "
@@ -43,9 +63,10 @@ class InvalidKeyPairError(FaestError):
     pass
 
 
-# Parameter set configurations
+# Parameter set configurations (param_id is faest_paramid_t from instances.h)
 PARAMETER_SETS = {
     '128f': {
+        'param_id': 2,
         'pk_size': lib.FAEST_128F_PUBLIC_KEY_SIZE,
         'sk_size': lib.FAEST_128F_PRIVATE_KEY_SIZE,
         'sig_size': lib.FAEST_128F_SIGNATURE_SIZE,
@@ -54,8 +75,13 @@ PARAMETER_SETS = {
         'verify': lib.faest_128f_verify,
         'validate': lib.faest_128f_validate_keypair,
         'clear': lib.faest_128f_clear_private_key,
+        'unpacked_type': 'faest_128f_unpacked_private_key_t',
+        'unpack': lib.faest_128f_unpack_private_key,
+        'unpacked_sign': lib.faest_128f_unpacked_sign,
+        'clear_unpacked': lib.faest_128f_clear_unpacked_private_key,
     },
     '128s': {
+        'param_id': 1,
         'pk_size': lib.FAEST_128S_PUBLIC_KEY_SIZE,
         'sk_size': lib.FAEST_128S_PRIVATE_KEY_SIZE,
         'sig_size': lib.FAEST_128S_SIGNATURE_SIZE,
@@ -64,8 +90,13 @@ PARAMETER_SETS = {
         'verify': lib.faest_128s_verify,
         'validate': lib.faest_128s_validate_keypair,
         'clear': lib.faest_128s_clear_private_key,
+        'unpacked_type': 'faest_128s_unpacked_private_key_t',
+        'unpack': lib.faest_128s_unpack_private_key,
+        'unpacked_sign': lib.faest_128s_unpacked_sign,
+        'clear_unpacked': lib.faest_128s_clear_unpacked_private_key,
     },
     '192f': {
+        'param_id': 4,
         'pk_size': lib.FAEST_192F_PUBLIC_KEY_SIZE,
         'sk_size': lib.FAEST_192F_PRIVATE_KEY_SIZE,
         'sig_size': lib.FAEST_192F_SIGNATURE_SIZE,
@@ -74,8 +105,13 @@ PARAMETER_SETS = {
         'verify': lib.faest_192f_verify,
         'validate': lib.faest_192f_validate_keypair,
         'clear': lib.faest_192f_clear_private_key,
+        'unpacked_type': 'faest_192f_unpacked_private_key_t',
+        'unpack': lib.faest_192f_unpack_private_key,
+        'unpacked_sign': lib.faest_192f_unpacked_sign,
+        'clear_unpacked': lib.faest_192f_clear_unpacked_private_key,
     },
     '192s': {
+        'param_id': 3,
         'pk_size': lib.FAEST_192S_PUBLIC_KEY_SIZE,
         'sk_size': lib.FAEST_192S_PRIVATE_KEY_SIZE,
         'sig_size': lib.FAEST_192S_SIGNATURE_SIZE,
@@ -84,8 +120,13 @@ PARAMETER_SETS = {
         'verify': lib.faest_192s_verify,
         'validate': lib.faest_192s_validate_keypair,
         'clear': lib.faest_192s_clear_private_key,
+        'unpacked_type': 'faest_192s_unpacked_private_key_t',
+        'unpack': lib.faest_192s_unpack_private_key,
+        'unpacked_sign': lib.faest_192s_unpacked_sign,
+        'clear_unpacked': lib.faest_192s_clear_unpacked_private_key,
     },
     '256f': {
+        'param_id': 6,
         'pk_size': lib.FAEST_256F_PUBLIC_KEY_SIZE,
         'sk_size': lib.FAEST_256F_PRIVATE_KEY_SIZE,
         'sig_size': lib.FAEST_256F_SIGNATURE_SIZE,
@@ -94,8 +135,13 @@ PARAMETER_SETS = {
         'verify': lib.faest_256f_verify,
         'validate': lib.faest_256f_validate_keypair,
         'clear': lib.faest_256f_clear_private_key,
+        'unpacked_type': 'faest_256f_unpacked_private_key_t',
+        'unpack': lib.faest_256f_unpack_private_key,
+        'unpacked_sign': lib.faest_256f_unpacked_sign,
+        'clear_unpacked': lib.faest_256f_clear_unpacked_private_key,
     },
     '256s': {
+        'param_id': 5,
         'pk_size': lib.FAEST_256S_PUBLIC_KEY_SIZE,
         'sk_size': lib.FAEST_256S_PRIVATE_KEY_SIZE,
         'sig_size': lib.FAEST_256S_SIGNATURE_SIZE,
@@ -104,8 +150,13 @@ PARAMETER_SETS = {
         'verify': lib.faest_256s_verify,
         'validate': lib.faest_256s_validate_keypair,
         'clear': lib.faest_256s_clear_private_key,
+        'unpacked_type': 'faest_256s_unpacked_private_key_t',
+        'unpack': lib.faest_256s_unpack_private_key,
+        'unpacked_sign': lib.faest_256s_unpacked_sign,
+        'clear_unpacked': lib.faest_256s_clear_unpacked_private_key,
     },
     'em_128f': {
+        'param_id': 8,
         'pk_size': lib.FAEST_EM_128F_PUBLIC_KEY_SIZE,
         'sk_size': lib.FAEST_EM_128F_PRIVATE_KEY_SIZE,
         'sig_size': lib.FAEST_EM_128F_SIGNATURE_SIZE,
@@ -114,8 +165,13 @@ PARAMETER_SETS = {
         'verify': lib.faest_em_128f_verify,
         'validate': lib.faest_em_128f_validate_keypair,
         'clear': lib.faest_em_128f_clear_private_key,
+        'unpacked_type': 'faest_em_128f_unpacked_private_key_t',
+        'unpack': lib.faest_em_128f_unpack_private_key,
+        'unpacked_sign': lib.faest_em_128f_unpacked_sign,
+        'clear_unpacked': lib.faest_em_128f_clear_unpacked_private_key,
     },
     'em_128s': {
+        'param_id': 7,
         'pk_size': lib.FAEST_EM_128S_PUBLIC_KEY_SIZE,
         'sk_size': lib.FAEST_EM_128S_PRIVATE_KEY_SIZE,
         'sig_size': lib.FAEST_EM_128S_SIGNATURE_SIZE,
@@ -124,8 +180,13 @@ PARAMETER_SETS = {
         'verify': lib.faest_em_128s_verify,
         'validate': lib.faest_em_128s_validate_keypair,
         'clear': lib.faest_em_128s_clear_private_key,
+        'unpacked_type': 'faest_em_128s_unpacked_private_key_t',
+        'unpack': lib.faest_em_128s_unpack_private_key,
+        'unpacked_sign': lib.faest_em_128s_unpacked_sign,
+        'clear_unpacked': lib.faest_em_128s_clear_unpacked_private_key,
     },
     'em_192f': {
+        'param_id': 10,
         'pk_size': lib.FAEST_EM_192F_PUBLIC_KEY_SIZE,
         'sk_size': lib.FAEST_EM_192F_PRIVATE_KEY_SIZE,
         'sig_size': lib.FAEST_EM_192F_SIGNATURE_SIZE,
@@ -134,8 +195,13 @@ PARAMETER_SETS = {
         'verify': lib.faest_em_192f_verify,
         'validate': lib.faest_em_192f_validate_keypair,
         'clear': lib.faest_em_192f_clear_private_key,
+        'unpacked_type': 'faest_em_192f_unpacked_private_key_t',
+        'unpack': lib.faest_em_192f_unpack_private_key,
+        'unpacked_sign': lib.faest_em_192f_unpacked_sign,
+        'clear_unpacked': lib.faest_em_192f_clear_unpacked_private_key,
     },
     'em_192s': {
+        'param_id': 9,
         'pk_size': lib.FAEST_EM_192S_PUBLIC_KEY_SIZE,
         'sk_size': lib.FAEST_EM_192S_PRIVATE_KEY_SIZE,
         'sig_size': lib.FAEST_EM_192S_SIGNATURE_SIZE,
@@ -144,8 +210,13 @@ PARAMETER_SETS = {
         'verify': lib.faest_em_192s_verify,
         'validate': lib.faest_em_192s_validate_keypair,
         'clear': lib.faest_em_192s_clear_private_key,
+        'unpacked_type': 'faest_em_192s_unpacked_private_key_t',
+        'unpack': lib.faest_em_192s_unpack_private_key,
+        'unpacked_sign': lib.faest_em_192s_unpacked_sign,
+        'clear_unpacked': lib.faest_em_192s_clear_unpacked_private_key,
     },
     'em_256f': {
+        'param_id': 12,
         'pk_size': lib.FAEST_EM_256F_PUBLIC_KEY_SIZE,
         'sk_size': lib.FAEST_EM_256F_PRIVATE_KEY_SIZE,
         'sig_size': lib.FAEST_EM_256F_SIGNATURE_SIZE,
@@ -154,8 +225,13 @@ PARAMETER_SETS = {
         'verify': lib.faest_em_256f_verify,
         'validate': lib.faest_em_256f_validate_keypair,
         'clear': lib.faest_em_256f_clear_private_key,
+        'unpacked_type': 'faest_em_256f_unpacked_private_key_t',
+        'unpack': lib.faest_em_256f_unpack_private_key,
+        'unpacked_sign': lib.faest_em_256f_unpacked_sign,
+        'clear_unpacked': lib.faest_em_256f_clear_unpacked_private_key,
     },
     'em_256s': {
+        'param_id': 11,
         'pk_size': lib.FAEST_EM_256S_PUBLIC_KEY_SIZE,
         'sk_size': lib.FAEST_EM_256S_PRIVATE_KEY_SIZE,
         'sig_size': lib.FAEST_EM_256S_SIGNATURE_SIZE,
@@ -164,6 +240,10 @@ PARAMETER_SETS = {
         'verify': lib.faest_em_256s_verify,
         'validate': lib.faest_em_256s_validate_keypair,
         'clear': lib.faest_em_256s_clear_private_key,
+        'unpacked_type': 'faest_em_256s_unpacked_private_key_t',
+        'unpack': lib.faest_em_256s_unpack_private_key,
+        'unpacked_sign': lib.faest_em_256s_unpacked_sign,
+        'clear_unpacked': lib.faest_em_256s_clear_unpacked_private_key,
     },
 }
 
@@ -224,12 +304,117 @@ class PrivateKey:
         """Get the parameter set identifier"""
         return self._param_set
     
+    def unpack(self) -> 'UnpackedPrivateKey':
+        """
+        Precompute the signing witness for this key.
+        
+        Returns:
+            An UnpackedPrivateKey that signs faster than this key
+        """
+        return UnpackedPrivateKey(self)
+    
+    def public_key(self) -> 'PublicKey':
+        """
+        Derive the public key of this private key.
+        
+        The public key is the OWF input and output, which unpacking
+        computes; the unpacked key is cleared again before returning.
+        
+        Returns:
+            The matching PublicKey
+        
+        Raises:
+            InvalidKeyPairError: If the private key is invalid
+        """
+        unpacked = UnpackedPrivateKey(self)
+        try:
+            public_key = unpacked.public_key()
+        finally:
+            unpacked.clear()
+        if self._params['validate'](public_key.to_bytes(), self._sk_buf) != 0:
+            raise InvalidKeyPairError("Invalid private key")
+        return public_key
+    
     def __del__(self):
         """Ensure cleanup happens"""
         if hasattr(self, '_finalizer'):
             self._finalizer()
 
 
+class UnpackedPrivateKey:
+    """
+    A FAEST private key with its OWF witness precomputed.
+    
+    Signing with an unpacked key skips recomputing the witness on every
+    signature. Unpacked keys are larger than packed ones and are never
+    serialized; the unpacked data is cleared from memory when the object
+    is garbage collected.
+    
+    Example:
+        >>> unpacked = keypair.private_key.unpack()
+        >>> signature = sign(message, unpacked)
+    """
+    
+    def __init__(self, private_key: PrivateKey):
+        """
+        Unpack a private key.
+        
+        Args:
+            private_key: The private key to unpack
+        
+        Raises:
+            FaestError: If unpacking fails
+        """
+        if not isinstance(private_key, PrivateKey):
+            raise TypeError("private_key must be a PrivateKey")
+        
+        self._params = private_key._params
+        self._param_set = private_key.param_set
+        self._sk_buf = ffi.new(f"{self._params['unpacked_type']} *")
+        
+        result = self._params['unpack'](self._sk_buf, private_key._sk_buf)
+        if result != 0:
+            self._params['clear_unpacked'](self._sk_buf)
+            raise FaestError(f"Private key unpacking failed with error code {result}")
+        
+        # Register cleanup to clear key on deletion
+        self._finalizer = weakref.finalize(self, PrivateKey._clear_key,
+                                          self._sk_buf, self._params['clear_unpacked'])
+    
+    @property
+    def param_set(self) -> str:
+        """Get the parameter set identifier"""
+        return self._param_set
+    
+    @property
+    def size(self) -> int:
+        """Size of the unpacked key data in bytes"""
+        return ffi.sizeof(self._params['unpacked_type'])
+    
+    def public_key(self) -> 'PublicKey':
+        """
+        Get the public key of this private key.
+        
+        Returns:
+            The matching PublicKey
+        
+        Raises:
+            FaestError: If the unpacked key has been cleared
+        """
+        if not self._finalizer.alive:
+            raise FaestError("Unpacked private key has been cleared")
+        pk_bytes = (bytes(ffi.buffer(self._sk_buf.owf_input)) +
+                    bytes(ffi.buffer(self._sk_buf.owf_output)))
+        return PublicKey(pk_bytes, self._param_set)
+    
+    def clear(self) -> None:
+        """Clear the unpacked key from memory now (the key is unusable afterwards)"""
+        self._finalizer()
+    
+    def __repr__(self) -> str:
+        return f"UnpackedPrivateKey(param_set='{self._param_set}')"
+
+
 class PublicKey:
     """Represents a FAEST public key"""
     
@@ -370,10 +555,8 @@ class Keypair:
         """
         params = PARAMETER_SETS[self.public_key.param_set]
         
-        pk_buf = ffi.new(f"uint8_t[{params['pk_size']}]")
-        ffi.memmove(pk_buf, self.public_key.to_bytes(), params['pk_size'])
-        
-        result = params['validate'](pk_buf, self.private_key._sk_buf)
+        # cffi passes the bytes object's buffer directly, without a copy
+        result = params['validate'](self.public_key.to_bytes(), self.private_key._sk_buf)
         
         return result == 0
     
@@ -383,13 +566,17 @@ class Keypair:
         return self.public_key.param_set
 
 
-def sign(message: bytes, private_key: PrivateKey) -> bytes:
+# Set by faest.stats.enable(); called as observer(param_set, seconds, signature)
+_sign_observer = None
+
+
+def sign(message: bytes, private_key: Union[PrivateKey, UnpackedPrivateKey]) -> bytes:
     """
     Sign a message with a private key.
     
     Args:
         message: The message to sign (as bytes)
-        private_key: The private key to sign with
+        private_key: The private key to sign with (packed or unpacked)
     
     Returns:
         The signature as bytes
@@ -402,14 +589,24 @@ def sign(message: bytes, private_key: PrivateKey) -> bytes:
         raise TypeError("Message must be bytes")
     
     params = private_key._params
+    if isinstance(private_key, UnpackedPrivateKey):
+        if not private_key._finalizer.alive:
+            raise SignatureError("Unpacked private key has been cleared")
+        sign_func = params['unpacked_sign']
+    else:
+        sign_func = params['sign']
     
     # Allocate buffer for signature
     sig_buf = ffi.new(f"uint8_t[{params['sig_size']}]")
     sig_len = ffi.new("size_t*")
     sig_len[0] = params['sig_size']
     
+    observer = _sign_observer
+    if observer is not None:
+        start = time.perf_counter()
+    
     # Call C sign function
-    result = params['sign'](
+    result = sign_func(
         private_key._sk_buf,
         message,
         len(message),
@@ -422,7 +619,10 @@ def sign(message: bytes, private_key: PrivateKey) -> bytes:
     
     # Return only the actual signature bytes (not the full buffer)
     actual_sig_len = sig_len[0]
-    return bytes(ffi.buffer(sig_buf, actual_sig_len))
+    signature = bytes(ffi.buffer(sig_buf, actual_sig_len))
+    if observer is not None:
+        observer(private_key.param_set, time.perf_counter() - start, signature)
+    return signature
 
 
 def verify(message: bytes, signature: bytes, public_key: PublicKey) -> bool:
@@ -447,13 +647,10 @@ def verify(message: bytes, signature: bytes, public_key: PublicKey) -> bool:
     
     params = PARAMETER_SETS[public_key.param_set]
     
-    # Prepare public key buffer
-    pk_buf = ffi.new(f"uint8_t[{params['pk_size']}]")
-    ffi.memmove(pk_buf, public_key.to_bytes(), params['pk_size'])
-    
-    # Call C verify function
+    # Call C verify function (the immutable key bytes are passed directly,
+    # so concurrent verifications share no buffers)
     result = params['verify'](
-        pk_buf,
+        public_key.to_bytes(),
         message,
         len(message),
         signature,
@@ -464,10 +661,39 @@ def verify(message: bytes, signature: bytes, public_key: PublicKey) -> bool:
     return result == 0
 
 
+def backend_info() -> dict:
+    """
+    Describe the loaded FAEST backend and interpreter threading mode.
+    
+    Returns:
+        Dictionary with:
+            'extension': path of the compiled _faest_cffi module
+            'build_profile': FAEST_BUILD_PROFILE the extension was built with
+            'build_flags': host-specific optimization flags of the build
+                           ('' unless built with the native profile)
+            'cffi_version': version of the cffi backend
+            'free_threaded': True if Python was built without the GIL
+            'gil_enabled': True if the GIL is active at runtime
+            'parameter_sets': list of available parameter sets
+    """
+    free_threaded = bool(sysconfig.get_config_var('Py_GIL_DISABLED'))
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return {
+        'extension': _faest_cffi.__file__,
+        'build_profile': ffi.string(lib.pyfaest_build_profile()).decode(),
+        'build_flags': ffi.string(lib.pyfaest_build_flags()).decode(),
+        'cffi_version': _cffi_backend.__version__,
+        'free_threaded': free_threaded,
+        'gil_enabled': is_gil_enabled() if is_gil_enabled is not None else True,
+        'parameter_sets': list(PARAMETER_SETS),
+    }
+
+
 __all__ = [
     'Keypair',
     'PublicKey',
     'PrivateKey',
+    'UnpackedPrivateKey',
     'sign',
     'verify',
     'FaestError',
@@ -476,4 +702,5 @@ __all__ = [
     'VerificationError',
     'InvalidKeyPairError',
     'PARAMETER_SETS',
+    'backend_info',
 ]
@@ -0,0 +1,543 @@
+"""
+PyFAEST - Local signing daemon
+
+Holds FAEST keys (unpacked for faster signing) in one long-lived process and
+serves sign/verify requests over a Unix domain socket, so short-lived
+processes do not each pay for loading the library and keys. Requests that
+arrive close together are coalesced and executed as native batches.
+
+Run the daemon:
+    python -m faest.daemon --socket /run/faest.sock \\
+        --key host:128f:/etc/faest/host.sk:/etc/faest/host.pk
+
+Use it from another process:
+    >>> from faest.daemon import DaemonClient
+    >>> with DaemonClient('/run/faest.sock') as client:
+    ...     signature = client.sign('host', b"artifact digest")
+    ...     assert client.verify('host', b"artifact digest", signature)
+
+Wire protocol (all integers big-endian):
+    frame    = length:u32 | body
+    request  = op:u8 | request_id:u32 | key_len:u8 | key_name | payload
+        OP_SIGN        payload = message
+        OP_VERIFY      payload = sig_len:u32 | signature | message
+        OP_PUBLIC_KEY  payload = (empty)
+    response = request_id:u32 | status:u8 | payload
+        STATUS_OK      SIGN: signature; VERIFY: 0x01 valid / 0x00 invalid;
+                       PUBLIC_KEY: param_len:u8 | param_set | public_key
+        STATUS_ERROR   UTF-8 error message
+Responses to pipelined requests may arrive out of order.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import argparse
+import itertools
+import os
+import queue
+import signal
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import threading
+
+from .core import FaestError, Keypair, PrivateKey, PublicKey, PARAMETER_SETS
+from .batching import Coalescer
+
+
+OP_SIGN = 1
+OP_VERIFY = 2
+OP_PUBLIC_KEY = 3
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+_FRAME = struct.Struct('>I')
+_REQUEST = struct.Struct('>BIB')
+_RESPONSE = struct.Struct('>IB')
+
+
+class DaemonError(FaestError):
+    """Raised when the signing daemon rejects or fails a request"""
+    pass
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """Read exactly `size` bytes, or None on a clean end of stream"""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(remaining)
+        if not chunk:
+            if remaining == size:
+                return None
+            raise ConnectionError("Connection closed mid-frame")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def _recv_frame(sock: socket.socket) -> Optional[bytes]:
+    header = _recv_exact(sock, _FRAME.size)
+    if header is None:
+        return None
+    (length,) = _FRAME.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise ConnectionError(f"Frame of {length} bytes exceeds limit")
+    body = _recv_exact(sock, length)
+    if body is None:
+        raise ConnectionError("Connection closed mid-frame")
+    return body
+
+
+def _frame(body: bytes) -> bytes:
+    return _FRAME.pack(len(body)) + body
+
+
+class _HostedKey:
+    """A key held by the daemon"""
+
+    def __init__(self, private_key: Optional[PrivateKey], public_key: Optional[PublicKey]):
+        if private_key is None and public_key is None:
+            raise ValueError("A hosted key needs a private or a public key")
+        if (private_key is not None and public_key is not None
+                and private_key.param_set != public_key.param_set):
+            raise ValueError("Public and private keys must use the same parameter set")
+        self.private_key = private_key
+        self.public_key = public_key
+        self.signer = None
+        if private_key is not None:
+            try:
+                self.signer = private_key.unpack()
+            except FaestError:
+                self.signer = private_key
+
+
+class _ConnectionHandler(socketserver.BaseRequestHandler):
+    """
+    Reads pipelined requests from one client connection.
+
+    Replies are queued and sent by a writer thread, so neither the reader
+    nor the coalescer blocks on a client that is still sending and not yet
+    reading its replies.
+    """
+
+    def setup(self) -> None:
+        self._replies: queue.Queue = queue.Queue()
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._writer = threading.Thread(target=self._write_replies, daemon=True)
+        self._writer.start()
+
+    def _write_replies(self) -> None:
+        while True:
+            data = self._replies.get()
+            if data is None:
+                return
+            try:
+                self.request.sendall(data)
+            except OSError:
+                pass  # Client went away; nothing to report to
+            finally:
+                with self._idle:
+                    self._pending -= 1
+                    self._idle.notify_all()
+
+    @staticmethod
+    def _when_done(future, reply, encode) -> None:
+        def done(f) -> None:
+            try:
+                result = f.result()
+            except Exception as e:
+                reply(STATUS_ERROR, str(e).encode('utf-8'))
+            else:
+                reply(STATUS_OK, encode(result))
+        future.add_done_callback(done)
+
+    def _make_reply(self, request_id: int):
+        def reply(status: int, payload: bytes) -> None:
+            self._replies.put(_frame(_RESPONSE.pack(request_id, status) + payload))
+        return reply
+
+    def handle(self) -> None:
+        daemon = self.server.signing_daemon
+        try:
+            while True:
+                body = _recv_frame(self.request)
+                if body is None:
+                    break
+                self._handle_request(daemon, body)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            with self._idle:
+                self._idle.wait_for(lambda: self._pending == 0)
+            self._replies.put(None)
+            self._writer.join()
+
+    def _handle_request(self, daemon: 'SigningDaemon', body: bytes) -> None:
+        if len(body) < _REQUEST.size:
+            raise ConnectionError("Truncated request")
+        op, request_id, key_len = _REQUEST.unpack_from(body)
+        with self._idle:
+            self._pending += 1
+        reply = self._make_reply(request_id)
+
+        offset = _REQUEST.size + key_len
+        if offset > len(body):
+            reply(STATUS_ERROR, b"Truncated key name")
+            return
+        name = body[_REQUEST.size:offset].decode('utf-8', 'replace')
+        key = daemon.keys.get(name)
+        if key is None:
+            reply(STATUS_ERROR, f"Unknown key: {name}".encode('utf-8'))
+            return
+
+        if op == OP_SIGN:
+            if key.signer is None:
+                reply(STATUS_ERROR, f"Key {name} has no private key".encode('utf-8'))
+                return
+            try:
+                future = daemon.coalescer.submit_sign(body[offset:], key.signer)
+            except RuntimeError as e:  # Coalescer closed during shutdown
+                reply(STATUS_ERROR, str(e).encode('utf-8'))
+                return
+            self._when_done(future, reply, bytes)
+        elif op == OP_VERIFY:
+            if key.public_key is None:
+                reply(STATUS_ERROR, f"Key {name} has no public key".encode('utf-8'))
+                return
+            if len(body) < offset + 4:
+                reply(STATUS_ERROR, b"Truncated verify request")
+                return
+            (sig_len,) = struct.unpack_from('>I', body, offset)
+            sig_start = offset + 4
+            if len(body) < sig_start + sig_len:
+                reply(STATUS_ERROR, b"Truncated verify request")
+                return
+            signature = body[sig_start:sig_start + sig_len]
+            message = body[sig_start + sig_len:]
+            try:
+                future = daemon.coalescer.submit_verify(message, signature, key.public_key)
+            except RuntimeError as e:
+                reply(STATUS_ERROR, str(e).encode('utf-8'))
+                return
+            self._when_done(future, reply, lambda valid: b'\x01' if valid else b'\x00')
+        elif op == OP_PUBLIC_KEY:
+            if key.public_key is None:
+                reply(STATUS_ERROR, f"Key {name} has no public key".encode('utf-8'))
+                return
+            param_set = key.public_key.param_set.encode('ascii')
+            reply(STATUS_OK, bytes([len(param_set)]) + param_set + key.public_key.to_bytes())
+        else:
+            reply(STATUS_ERROR, f"Unknown operation {op}".encode('utf-8'))
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class SigningDaemon:
+    """
+    Unix-socket signing service for keys held in memory.
+
+    Example:
+        >>> daemon = SigningDaemon('/tmp/faest.sock', {'host': keypair})
+        >>> daemon.start()
+        >>> ...
+        >>> daemon.shutdown()
+    """
+
+    def __init__(self, socket_path: str, keys: Dict[str, object],
+                 max_batch: int = 64, max_delay: float = 0.0005,
+                 workers: Optional[int] = None, mode: int = 0o600):
+        """
+        Initialize a signing daemon.
+
+        Args:
+            socket_path: Filesystem path of the Unix socket to listen on
+            keys: Mapping of key name to a Keypair, PrivateKey or PublicKey
+            max_batch: Maximum number of requests coalesced into one batch
+            max_delay: Maximum time in seconds a request waits for others
+                       to join its batch
+            workers: Worker threads per batch (default: one per CPU)
+            mode: Permission bits of the socket file
+        """
+        if max_batch <= 0:
+            raise ValueError("max_batch must be positive")
+        if max_delay < 0:
+            raise ValueError("max_delay must not be negative")
+
+        self.keys: Dict[str, _HostedKey] = {}
+        for name, key in keys.items():
+            if len(name.encode('utf-8')) > 255:
+                raise ValueError(f"Key name too long: {name}")
+            if isinstance(key, PrivateKey):
+                self.keys[name] = _HostedKey(key, None)
+            elif isinstance(key, PublicKey):
+                self.keys[name] = _HostedKey(None, key)
+            else:
+                self.keys[name] = _HostedKey(key.private_key, key.public_key)
+
+        self.socket_path = socket_path
+        self.coalescer = Coalescer(max_delay=max_delay, max_batch=max_batch,
+                                   workers=workers)
+
+        _remove_stale_socket(socket_path)
+        # Create the socket file with `mode` already applied, so it never
+        # accepts connections under looser umask-derived permissions
+        umask = os.umask(0o777 & ~mode)
+        try:
+            self._server = _Server(socket_path, _ConnectionHandler)
+        finally:
+            os.umask(umask)
+        self._server.signing_daemon = self
+        os.chmod(socket_path, mode)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start serving in a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='faest-daemon', daemon=True)
+        self._thread.start()
+
+    def serve_forever(self) -> None:
+        """Serve requests in the calling thread until shutdown() is called"""
+        self._server.serve_forever()
+
+    def shutdown(self) -> None:
+        """Stop serving and remove the socket file"""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+        self._server.server_close()
+        self.coalescer.close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> dict:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            Dictionary with 'requests' and 'batches' counts
+        """
+        stats = self.coalescer.stats()
+        return {'requests': stats['calls'], 'batches': stats['batches']}
+
+    def __enter__(self) -> 'SigningDaemon':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Remove a socket file left behind by a daemon that is no longer running"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise FileExistsError(f"{path} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise FileExistsError(f"Another daemon is already listening on {path}")
+
+
+class DaemonClient:
+    """
+    Client for a running signing daemon.
+
+    A client holds one connection; use one client per thread.
+    """
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        """
+        Connect to a signing daemon.
+
+        Args:
+            socket_path: Path of the daemon's Unix socket
+            timeout: Socket timeout in seconds (default: no timeout)
+        """
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(socket_path)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _encode(op: int, request_id: int, key: str, payload: bytes) -> bytes:
+        name = key.encode('utf-8')
+        if len(name) > 255:
+            raise ValueError(f"Key name too long: {key}")
+        return _frame(_REQUEST.pack(op, request_id, len(name)) + name + payload)
+
+    def _call_many(self, op: int, key: str, payloads: Sequence[bytes]) -> List[bytes]:
+        """Send pipelined requests and return payloads in request order"""
+        with self._lock:
+            ids = [next(self._ids) & 0xFFFFFFFF for _ in payloads]
+            self._sock.sendall(b''.join(
+                self._encode(op, request_id, key, payload)
+                for request_id, payload in zip(ids, payloads)
+            ))
+            responses = {}
+            while len(responses) < len(ids):
+                body = _recv_frame(self._sock)
+                if body is None:
+                    raise DaemonError("Daemon closed the connection")
+                request_id, status = _RESPONSE.unpack_from(body)
+                responses[request_id] = (status, body[_RESPONSE.size:])
+
+        out = []
+        for request_id in ids:
+            status, payload = responses[request_id]
+            if status != STATUS_OK:
+                raise DaemonError(payload.decode('utf-8', 'replace'))
+            out.append(payload)
+        return out
+
+    def sign(self, key: str, message: bytes) -> bytes:
+        """
+        Sign a message with a key held by the daemon.
+
+        Raises:
+            DaemonError: If the daemon cannot sign the message
+            TypeError: If message is not bytes
+        """
+        return self.sign_many(key, [message])[0]
+
+    def sign_many(self, key: str, messages: Sequence[bytes]) -> List[bytes]:
+        """Sign many messages in one round trip"""
+        for message in messages:
+            if not isinstance(message, bytes):
+                raise TypeError("Message must be bytes")
+        return self._call_many(OP_SIGN, key, messages)
+
+    def verify(self, key: str, message: bytes, signature: bytes) -> bool:
+        """
+        Verify a signature against a key held by the daemon.
+
+        Raises:
+            DaemonError: If the daemon cannot verify with this key
+            TypeError: If inputs are not bytes
+        """
+        return self.verify_many(key, [message], [signature])[0]
+
+    def verify_many(self, key: str, messages: Sequence[bytes],
+                    signatures: Sequence[bytes]) -> List[bool]:
+        """Verify many signatures in one round trip"""
+        if len(messages) != len(signatures):
+            raise ValueError("Number of messages and signatures must match")
+        payloads = []
+        for message, signature in zip(messages, signatures):
+            if not isinstance(message, bytes):
+                raise TypeError("Message must be bytes")
+            if not isinstance(signature, bytes):
+                raise TypeError("Signature must be bytes")
+            payloads.append(struct.pack('>I', len(signature)) + signature + message)
+        return [r == b'\x01' for r in self._call_many(OP_VERIFY, key, payloads)]
+
+    def public_key(self, key: str) -> PublicKey:
+        """Fetch the public key of a key held by the daemon"""
+        (payload,) = self._call_many(OP_PUBLIC_KEY, key, [b''])
+        param_len = payload[0]
+        param_set = payload[1:1 + param_len].decode('ascii')
+        return PublicKey(payload[1 + param_len:], param_set)
+
+    def close(self) -> None:
+        """Close the connection"""
+        self._sock.close()
+
+    def __enter__(self) -> 'DaemonClient':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _load_key(spec: str) -> Tuple[str, object]:
+    """Parse NAME:PARAM_SET:SK_FILE[:PK_FILE] (SK_FILE may be empty)"""
+    parts = spec.split(':')
+    if len(parts) not in (3, 4):
+        raise ValueError(f"Invalid key specification: {spec}")
+    name, param_set, sk_path = parts[:3]
+    pk_path = parts[3] if len(parts) == 4 else ''
+    if param_set not in PARAMETER_SETS:
+        raise ValueError(f"Invalid parameter set: {param_set}")
+
+    private_key = public_key = None
+    if sk_path:
+        with open(sk_path, 'rb') as f:
+            private_key = PrivateKey(f.read(), param_set)
+    if pk_path:
+        with open(pk_path, 'rb') as f:
+            public_key = PublicKey(f.read(), param_set)
+    if private_key is None:
+        return name, public_key
+    if public_key is None:
+        return name, private_key
+    return name, Keypair(public_key, private_key)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m faest.daemon',
+        description='Serve FAEST sign/verify requests over a Unix socket.',
+    )
+    parser.add_argument('--socket', required=True, help='Path of the Unix socket')
+    parser.add_argument('--key', action='append', required=True, metavar='SPEC',
+                        help='NAME:PARAM_SET:SK_FILE[:PK_FILE] with raw key bytes; '
+                             'leave SK_FILE empty for a verify-only key')
+    parser.add_argument('--max-batch', type=int, default=64,
+                        help='Maximum requests per native batch (default: 64)')
+    parser.add_argument('--max-delay-us', type=int, default=500,
+                        help='Maximum coalescing delay in microseconds (default: 500)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker threads per batch (default: one per CPU)')
+    args = parser.parse_args(argv)
+
+    try:
+        keys = dict(_load_key(spec) for spec in args.key)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+    daemon = SigningDaemon(args.socket, keys, max_batch=args.max_batch,
+                           max_delay=args.max_delay_us / 1e6, workers=args.workers)
+    print(f"Serving {len(keys)} key(s) on {args.socket}")
+
+    def _terminate(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _terminate)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.shutdown()
+    return 0
+
+
+__all__ = [
+    'SigningDaemon',
+    'DaemonClient',
+    'DaemonError',
+]
+
+
+if __name__ == '__main__':
+    sys.exit(main())
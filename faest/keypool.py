@@ -0,0 +1,278 @@
+"""
+PyFAEST - Pool of unpacked signing keys
+
+Unpacking a private key precomputes its OWF witness, which makes every
+later signature cheaper but costs a full key expansion and several
+kilobytes of memory per key. UnpackedKeyPool keeps the unpacked keys of
+recently used tenants resident, evicting the least recently used ones once
+a byte budget is exceeded. Evicted keys are cleared with
+faest_<set>_clear_unpacked_private_key as soon as no signer is using them.
+
+Example:
+    >>> from faest.keypool import UnpackedKeyPool
+    >>>
+    >>> pool = UnpackedKeyPool(max_bytes=64 << 20, loader=load_tenant_key)
+    >>> signature = pool.sign('tenant-42', message)
+    >>> pool.stats()['hit_rate']
+    0.97
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Sequence
+import hashlib
+import os
+import threading
+import weakref
+
+from .core import ffi, PrivateKey, UnpackedPrivateKey, sign
+from . import batching
+
+
+class _Entry:
+    """A resident unpacked key and the number of signers using it"""
+
+    __slots__ = ('key', 'fingerprint', 'users', 'retired')
+
+    def __init__(self, key: UnpackedPrivateKey, fingerprint: bytes):
+        self.key = key
+        self.fingerprint = fingerprint
+        self.users = 0
+        self.retired = False
+
+
+class UnpackedKeyPool:
+    """
+    LRU pool of unpacked private keys, bounded by total unpacked size.
+
+    Keys are identified by a caller-chosen tenant identifier. They are
+    either passed in with each call or fetched with the loader on a miss;
+    a key passed in that differs from the resident one replaces it. Keys
+    rotated behind the loader must be dropped with evict().
+
+    Concurrent misses for the same tenant share a single unpack. The pool
+    may exceed its budget by at most the keys currently leased.
+    """
+
+    def __init__(self, max_bytes: int = 64 << 20,
+                 loader: Optional[Callable[[Hashable], PrivateKey]] = None):
+        """
+        Initialize a key pool.
+
+        Args:
+            max_bytes: Budget for the unpacked key data kept resident
+            loader: Called with a tenant id to fetch its packed private key
+                    when it is not resident and no key was passed in
+        """
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self._max_bytes = max_bytes
+        self._loader = loader
+        # Per-pool secret so fingerprints cannot be linked to keys offline
+        self._salt = os.urandom(32)
+        self._lock = threading.Lock()
+        # tenant -> _Entry, least recently used first
+        self._entries: 'OrderedDict[Hashable, _Entry]' = OrderedDict()
+        self._pending: Dict[Hashable, Future] = {}
+        self._fingerprints: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._unpacks = 0
+        self._evictions = 0
+
+    def _fingerprint(self, private_key: PrivateKey) -> bytes:
+        """Keyed fingerprint of a private key, computed once per key object"""
+        with self._lock:
+            fingerprint = self._fingerprints.get(private_key)
+        if fingerprint is not None:
+            return fingerprint
+        h = hashlib.blake2b(key=self._salt, digest_size=16)
+        h.update(private_key.param_set.encode('ascii'))
+        h.update(b'\x00')
+        # Hash the key buffer in place rather than copying it with to_bytes()
+        h.update(ffi.buffer(private_key._sk_buf))
+        fingerprint = h.digest()
+        with self._lock:
+            self._fingerprints[private_key] = fingerprint
+        return fingerprint
+
+    def _remove(self, tenant: Hashable) -> None:
+        """Drop a resident entry, clearing it now or when released (lock held)"""
+        entry = self._entries.pop(tenant)
+        self._bytes -= entry.key.size
+        entry.retired = True
+        if entry.users == 0:
+            entry.key.clear()
+
+    def _enforce_budget(self, keep: Hashable) -> None:
+        """Evict least recently used entries until within budget (lock held)"""
+        for tenant in list(self._entries):
+            if self._bytes <= self._max_bytes:
+                break
+            if tenant != keep:
+                self._remove(tenant)
+                self._evictions += 1
+
+    def _acquire(self, tenant: Hashable, private_key: Optional[PrivateKey]) -> _Entry:
+        fingerprint = self._fingerprint(private_key) if private_key is not None else None
+        while True:
+            with self._lock:
+                entry = self._entries.get(tenant)
+                if entry is not None and fingerprint not in (None, entry.fingerprint):
+                    # The caller holds a different key for this tenant
+                    self._remove(tenant)
+                    entry = None
+                if entry is not None:
+                    self._entries.move_to_end(tenant)
+                    entry.users += 1
+                    self._hits += 1
+                    return entry
+                pending = self._pending.get(tenant)
+                if pending is None:
+                    self._misses += 1
+                    future = Future()
+                    self._pending[tenant] = future
+                    break
+            # Another thread is unpacking this tenant's key; use its result
+            pending.exception()
+
+        try:
+            if private_key is None:
+                if self._loader is None:
+                    raise KeyError(f"No private key for tenant {tenant!r}")
+                private_key = self._loader(tenant)
+                fingerprint = self._fingerprint(private_key)
+            unpacked = private_key.unpack()
+        except BaseException as e:
+            with self._lock:
+                del self._pending[tenant]
+            future.set_exception(e)
+            raise
+
+        entry = _Entry(unpacked, fingerprint)
+        entry.users = 1
+        with self._lock:
+            self._unpacks += 1
+            self._entries[tenant] = entry
+            self._bytes += unpacked.size
+            del self._pending[tenant]
+            self._enforce_budget(keep=tenant)
+        future.set_result(None)
+        return entry
+
+    def _release(self, entry: _Entry) -> None:
+        with self._lock:
+            entry.users -= 1
+            if entry.retired and entry.users == 0:
+                entry.key.clear()
+
+    @contextmanager
+    def lease(self, tenant: Hashable,
+              private_key: Optional[PrivateKey] = None) -> Iterator[UnpackedPrivateKey]:
+        """
+        Borrow a tenant's unpacked key.
+
+        The key is not cleared while the lease is held, even if it is
+        evicted in the meantime. Do not keep it after the block ends.
+
+        Args:
+            tenant: Tenant identifier
+            private_key: The tenant's packed key (default: use the loader)
+
+        Raises:
+            KeyError: If the key is not resident and there is no loader
+            FaestError: If unpacking fails
+        """
+        entry = self._acquire(tenant, private_key)
+        try:
+            yield entry.key
+        finally:
+            self._release(entry)
+
+    def sign(self, tenant: Hashable, message: bytes,
+             private_key: Optional[PrivateKey] = None) -> bytes:
+        """
+        Sign a message with a tenant's key.
+
+        Returns:
+            The signature as bytes
+
+        Raises:
+            SignatureError: If signing fails
+            TypeError: If message is not bytes
+        """
+        with self.lease(tenant, private_key) as key:
+            return sign(message, key)
+
+    def sign_many(self, tenant: Hashable, messages: Sequence[bytes],
+                  private_key: Optional[PrivateKey] = None,
+                  workers: Optional[int] = None) -> List[bytes]:
+        """
+        Sign many messages with a tenant's key (see batching.sign_many).
+
+        Returns:
+            List of signatures, in the same order as the messages
+        """
+        with self.lease(tenant, private_key) as key:
+            return batching.sign_many(messages, key, workers)
+
+    def evict(self, tenant: Hashable) -> bool:
+        """
+        Drop a tenant's unpacked key, e.g. after the key was rotated.
+
+        Returns:
+            True if the tenant's key was resident
+        """
+        with self._lock:
+            if tenant not in self._entries:
+                return False
+            self._remove(tenant)
+            return True
+
+    def clear(self) -> None:
+        """Drop all unpacked keys"""
+        with self._lock:
+            for tenant in list(self._entries):
+                self._remove(tenant)
+
+    def stats(self) -> dict:
+        """
+        Get pool statistics.
+
+        Returns:
+            Dictionary with 'hits', 'misses', 'hit_rate', 'unpacks',
+            'evictions', 'size' (resident keys), 'bytes' and 'max_bytes'
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'unpacks': self._unpacks,
+                'evictions': self._evictions,
+                'size': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self._max_bytes,
+            }
+
+    @property
+    def max_bytes(self) -> int:
+        """Budget for resident unpacked key data"""
+        return self._max_bytes
+
+    def __contains__(self, tenant: Hashable) -> bool:
+        with self._lock:
+            return tenant in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"UnpackedKeyPool(max_bytes={self._max_bytes})"
+
+
+__all__ = ['UnpackedKeyPool']
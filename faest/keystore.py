@@ -0,0 +1,364 @@
+"""
+PyFAEST - Memory-mapped public key directory
+
+A key directory maps fixed-width key IDs to public keys in a single file
+that is opened with mmap, so a verifier with millions of registered keys
+starts instantly and only pages in the records it looks up.
+
+File layout (all integers little-endian):
+
+    header    magic 'PYFAESTK', version, key ID size, section count,
+              index slot count, index offset, total key count
+    sections  one entry per parameter set: param_id, public key size,
+              key count, record offset
+    records   per section, sorted by key ID: key ID || public key bytes
+    index     open-addressing hash table (linear probing, load <= 1/2) of
+              (key ID hash, section, record number + 1); record 0 = empty
+
+build() works in bounded memory, so it scales to millions of keys: records
+are buffered up to `buffer_records` at a time, spilled as sorted runs to
+temporary files next to the destination and merged into the output, and
+the index is filled in place through an mmap of the output file (which is
+also where repeated key IDs are detected).
+
+Example:
+    >>> from faest.keystore import KeyDirectory
+    >>>
+    >>> KeyDirectory.build('keys.pfk', ((key_id, pk) for key_id, pk in registry))
+    >>> with KeyDirectory('keys.pfk') as directory:
+    ...     directory.verify(key_id, message, signature)
+"""
+
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+
+from .core import PARAMETER_SETS, PublicKey, verify
+
+MAGIC = b'PYFAESTK'
+VERSION = 1
+
+_HEADER = struct.Struct('<8sIIIQQQ')
+_SECTION = struct.Struct('<IIQQ')
+_SLOT = struct.Struct('<QII')
+_HEADER_SIZE = 64
+_PARAM_SETS_BY_ID = {params['param_id']: name for name, params in PARAMETER_SETS.items()}
+
+
+# Records read from a spill file at a time during the merge
+_READ_RECORDS = 1024
+
+
+def _hash(key_id: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key_id, digest_size=8).digest(), 'little')
+
+
+def _read_run(f: BinaryIO, start: int, count: int, record_size: int) -> Iterator[bytes]:
+    """Yield the records of one sorted run in a spill file"""
+    end = start + count * record_size
+    while start < end:
+        f.seek(start)
+        data = f.read(min(_READ_RECORDS * record_size, end - start))
+        if not data:
+            raise ValueError("Truncated spill file")
+        start += len(data)
+        for i in range(0, len(data), record_size):
+            yield data[i:i + record_size]
+
+
+class KeyDirectory:
+    """
+    Read-only, memory-mapped directory of public keys by key ID.
+
+    Lookups hash the key ID and probe the on-disk index, so they take
+    constant time and do not load the rest of the file. The directory
+    can be shared by threads.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a key directory.
+
+        Args:
+            path: Path of a file written by KeyDirectory.build()
+
+        Raises:
+            ValueError: If the file is not a valid key directory
+        """
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER_SIZE:
+                raise ValueError(f"Not a key directory: {path}")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._load_header(path, size)
+        except Exception:
+            self._map.close()
+            raise
+
+    def _load_header(self, path: str, size: int) -> None:
+        magic, version, key_id_size, sections, slots, index_offset, total = \
+            _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a key directory: {path}")
+        if version != VERSION:
+            raise ValueError(f"Unsupported key directory version: {version}")
+        if slots & (slots - 1) or index_offset + slots * _SLOT.size > size:
+            raise ValueError(f"Corrupt key directory index: {path}")
+
+        self._key_id_size = key_id_size
+        self._slots = slots
+        self._index_offset = index_offset
+        self._len = total
+        # (param_set, PARAMETER_SETS entry, key count, record offset, record size)
+        self._sections: List[Tuple[str, dict, int, int, int]] = []
+        for i in range(sections):
+            param_id, pk_size, count, offset = \
+                _SECTION.unpack_from(self._map, _HEADER_SIZE + i * _SECTION.size)
+            param_set = _PARAM_SETS_BY_ID.get(param_id)
+            if param_set is None or PARAMETER_SETS[param_set]['pk_size'] != pk_size:
+                raise ValueError(f"Unknown parameter set in key directory: {param_id}")
+            record_size = key_id_size + pk_size
+            if offset + count * record_size > size:
+                raise ValueError(f"Corrupt key directory section: {path}")
+            self._sections.append((param_set, PARAMETER_SETS[param_set], count, offset,
+                                   record_size))
+
+    @classmethod
+    def build(cls, path: str, keys: Iterable[Tuple[bytes, PublicKey]],
+              key_id_size: int = 32, buffer_records: int = 1 << 16) -> 'KeyDirectory':
+        """
+        Write a key directory and open it.
+
+        The file is written next to path and renamed into place, so
+        readers never see a partial directory. Memory use is bounded by
+        `buffer_records` records; beyond that, sorted runs are spilled to
+        temporary files in the destination directory, which needs free
+        space for about twice the records.
+
+        Args:
+            path: Destination path
+            keys: Iterable of (key_id, public_key) pairs
+            key_id_size: Length of every key ID in bytes
+            buffer_records: Records held in memory before a run is spilled
+
+        Returns:
+            The opened KeyDirectory
+
+        Raises:
+            TypeError: If a key ID is not bytes or a key is not a PublicKey
+            ValueError: If a key ID has the wrong length or is repeated
+        """
+        if key_id_size <= 0:
+            raise ValueError("key_id_size must be positive")
+        if buffer_records <= 0:
+            raise ValueError("buffer_records must be positive")
+        directory = os.path.dirname(os.path.abspath(path))
+        buffers: Dict[str, List[bytes]] = {}
+        spills: Dict[str, BinaryIO] = {}
+        # param_set -> [(start, count)] of the sorted runs in its spill file
+        runs: Dict[str, List[Tuple[int, int]]] = {}
+        counts: Dict[str, int] = {}
+        buffered = 0
+
+        def spill() -> None:
+            for param_set, records in buffers.items():
+                if not records:
+                    continue
+                records.sort()
+                f = spills.get(param_set)
+                if f is None:
+                    f = spills[param_set] = tempfile.TemporaryFile(dir=directory)
+                start = f.seek(0, os.SEEK_END)
+                f.write(b''.join(records))
+                runs.setdefault(param_set, []).append((start, len(records)))
+                records.clear()
+
+        tmp = f"{path}.tmp{os.getpid()}"
+        try:
+            for key_id, public_key in keys:
+                if not isinstance(key_id, bytes):
+                    raise TypeError("Key ID must be bytes")
+                if len(key_id) != key_id_size:
+                    raise ValueError(
+                        f"Invalid key ID size: expected {key_id_size}, got {len(key_id)}"
+                    )
+                if not isinstance(public_key, PublicKey):
+                    raise TypeError("Expected a PublicKey")
+                param_set = public_key.param_set
+                buffers.setdefault(param_set, []).append(key_id + public_key.to_bytes())
+                counts[param_set] = counts.get(param_set, 0) + 1
+                buffered += 1
+                if buffered >= buffer_records:
+                    spill()
+                    buffered = 0
+            spill()
+            cls._write(tmp, key_id_size, counts, spills, runs)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        finally:
+            for f in spills.values():
+                f.close()
+        return cls(path)
+
+    @staticmethod
+    def _write(tmp: str, key_id_size: int, counts: Dict[str, int],
+               spills: Dict[str, BinaryIO], runs: Dict[str, List[Tuple[int, int]]]) -> None:
+        """Merge the spilled runs into a directory file and fill its index"""
+        total = sum(counts.values())
+        slots = 1
+        while slots < 2 * total:
+            slots <<= 1
+        mask = slots - 1
+
+        # Sections in PARAMETER_SETS order so builds are reproducible
+        param_sets = [p for p in PARAMETER_SETS if p in counts]
+        offset = _HEADER_SIZE + len(param_sets) * _SECTION.size
+        header = bytearray(offset)
+        # (record offset, record size, key count) per section
+        sections = []
+        for section, param_set in enumerate(param_sets):
+            params = PARAMETER_SETS[param_set]
+            _SECTION.pack_into(header, _HEADER_SIZE + section * _SECTION.size,
+                               params['param_id'], params['pk_size'], counts[param_set], offset)
+            record_size = key_id_size + params['pk_size']
+            sections.append((offset, record_size, counts[param_set]))
+            offset += counts[param_set] * record_size
+        index_offset = offset
+        _HEADER.pack_into(header, 0, MAGIC, VERSION, key_id_size, len(param_sets),
+                          slots, index_offset, total)
+
+        with open(tmp, 'w+b') as f:
+            f.write(header)
+            for param_set, (_, record_size, _) in zip(param_sets, sections):
+                spill = spills[param_set]
+                f.writelines(heapq.merge(*[_read_run(spill, start, count, record_size)
+                                           for start, count in runs[param_set]]))
+            f.truncate(index_offset + slots * _SLOT.size)
+            f.flush()
+
+            with mmap.mmap(f.fileno(), 0) as data:
+                for section, (offset, record_size, count) in enumerate(sections):
+                    for number in range(count):
+                        start = offset + number * record_size
+                        key_id = data[start:start + key_id_size]
+                        h = _hash(key_id)
+                        slot = h & mask
+                        while True:
+                            pos = index_offset + slot * _SLOT.size
+                            stored_hash, stored_section, stored_number = \
+                                _SLOT.unpack_from(data, pos)
+                            if not stored_number:
+                                break
+                            if stored_hash == h:
+                                other_offset, other_size, _ = sections[stored_section]
+                                other = other_offset + (stored_number - 1) * other_size
+                                if data[other:other + key_id_size] == key_id:
+                                    raise ValueError(f"Duplicate key ID: {key_id.hex()}")
+                            slot = (slot + 1) & mask
+                        _SLOT.pack_into(data, pos, h, section, number + 1)
+                data.flush()
+            os.fsync(f.fileno())
+
+    @property
+    def key_id_size(self) -> int:
+        """Length of every key ID in bytes"""
+        return self._key_id_size
+
+    def param_sets(self) -> Dict[str, int]:
+        """Get the number of keys stored for each parameter set"""
+        return {param_set: count for param_set, _, count, _, _ in self._sections}
+
+    def _find(self, key_id: bytes) -> Optional[Tuple[int, int]]:
+        """Locate a key ID, returning (section, record offset)"""
+        if not isinstance(key_id, bytes) or len(key_id) != self._key_id_size:
+            return None
+        h = _hash(key_id)
+        mask = self._slots - 1
+        slot = h & mask
+        data = self._map
+        for _ in range(self._slots):
+            stored_hash, section, number = \
+                _SLOT.unpack_from(data, self._index_offset + slot * _SLOT.size)
+            if not number:
+                return None
+            if stored_hash == h:
+                if section >= len(self._sections) or number > self._sections[section][2]:
+                    raise ValueError("Corrupt key directory index")
+                _, _, _, offset, record_size = self._sections[section]
+                start = offset + (number - 1) * record_size
+                if data[start:start + self._key_id_size] == key_id:
+                    return section, start
+            slot = (slot + 1) & mask
+        return None
+
+    def get(self, key_id: bytes, default: Optional[PublicKey] = None) -> Optional[PublicKey]:
+        """
+        Look up the public key for a key ID.
+
+        Returns:
+            The PublicKey, or default if the key ID is not registered
+        """
+        found = self._find(key_id)
+        if found is None:
+            return default
+        section, start = found
+        param_set, _, _, _, record_size = self._sections[section]
+        return PublicKey(self._map[start + self._key_id_size:start + record_size], param_set)
+
+    def verify(self, key_id: bytes, message: bytes, signature: bytes) -> bool:
+        """
+        Verify a signature with the public key registered for a key ID.
+
+        Returns:
+            True if the key ID is registered and the signature is valid
+
+        Raises:
+            KeyError: If the key ID is not registered
+        """
+        public_key = self.get(key_id)
+        if public_key is None:
+            raise KeyError(key_id)
+        return verify(message, signature, public_key)
+
+    def __getitem__(self, key_id: bytes) -> PublicKey:
+        public_key = self.get(key_id)
+        if public_key is None:
+            raise KeyError(key_id)
+        return public_key
+
+    def __contains__(self, key_id: bytes) -> bool:
+        return self._find(key_id) is not None
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[bytes]:
+        """Iterate over key IDs, grouped by parameter set"""
+        for _, _, count, offset, record_size in self._sections:
+            for number in range(count):
+                start = offset + number * record_size
+                yield self._map[start:start + self._key_id_size]
+
+    def close(self) -> None:
+        """Unmap the directory file"""
+        self._map.close()
+
+    def __enter__(self) -> 'KeyDirectory':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"KeyDirectory(keys={self._len}, key_id_size={self._key_id_size})"
+
+
+__all__ = ['KeyDirectory', 'MAGIC', 'VERSION']
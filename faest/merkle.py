@@ -0,0 +1,413 @@
+"""
+PyFAEST - Merkle-batched signing
+
+Signs many messages with a single FAEST signature. The messages are hashed
+into a Merkle tree (SHA-256, with RFC 6962 style domain separation between
+leaves and interior nodes) and only the root is signed. Each message gets a
+compact inclusion proof of O(log n) hashes plus the shared root signature.
+
+Example:
+    >>> from faest import Keypair
+    >>> from faest.merkle import sign_batch, verify_batch
+    >>>
+    >>> keypair = Keypair.generate('128f')
+    >>> events = [b"event-1", b"event-2", b"event-3"]
+    >>> batch_sigs = sign_batch(events, keypair.private_key)
+    >>> verify_batch(events, batch_sigs, keypair.public_key)
+    [True, True, True]
+"""
+
+from collections import OrderedDict
+from typing import List, Sequence, Tuple
+import hashlib
+import struct
+import threading
+
+from .core import PrivateKey, PublicKey, PARAMETER_SETS, sign, verify
+
+
+# Domain separation prefixes
+_LEAF_PREFIX = b'\x00'
+_NODE_PREFIX = b'\x01'
+_ROOT_CONTEXT = b'PyFAEST-Merkle-v1\x00'
+
+HASH_SIZE = 32
+MAX_PATH_LENGTH = 64
+
+_PROOF_HEADER = struct.Struct('>QQB')
+
+
+def _hash_leaf(message: bytes) -> bytes:
+    return hashlib.sha256(_LEAF_PREFIX + message).digest()
+
+
+def _hash_node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(_NODE_PREFIX + left + right).digest()
+
+
+def _root_message(root: bytes, tree_size: int) -> bytes:
+    """The byte string actually signed with FAEST for a tree"""
+    return _ROOT_CONTEXT + struct.pack('>Q', tree_size) + root
+
+
+def _build_levels(messages: Sequence[bytes]) -> List[List[bytes]]:
+    """Build all tree levels, leaves first; a lone last node is promoted"""
+    level = [_hash_leaf(m) for m in messages]
+    levels = [level]
+    while len(level) > 1:
+        parents = [_hash_node(level[i], level[i + 1])
+                   for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        level = parents
+        levels.append(level)
+    return levels
+
+
+class MerkleProof:
+    """Inclusion proof of one message in a Merkle tree"""
+
+    def __init__(self, index: int, tree_size: int, path: Sequence[bytes]):
+        """
+        Initialize an inclusion proof.
+
+        Args:
+            index: Position of the message in the batch
+            tree_size: Number of messages in the batch
+            path: Sibling hashes from the leaf up to the root
+        """
+        if not 0 <= index < tree_size:
+            raise ValueError(f"Invalid leaf index {index} for tree of size {tree_size}")
+        if len(path) > MAX_PATH_LENGTH:
+            raise ValueError("Inclusion proof path too long")
+        for node in path:
+            if not isinstance(node, bytes) or len(node) != HASH_SIZE:
+                raise ValueError(f"Proof nodes must be {HASH_SIZE}-byte hashes")
+
+        self._index = index
+        self._tree_size = tree_size
+        self._path = tuple(path)
+
+    @property
+    def index(self) -> int:
+        """Position of the message in the batch"""
+        return self._index
+
+    @property
+    def tree_size(self) -> int:
+        """Number of messages in the batch"""
+        return self._tree_size
+
+    @property
+    def path(self) -> Tuple[bytes, ...]:
+        """Sibling hashes from the leaf up to the root"""
+        return self._path
+
+    def compute_root(self, message: bytes) -> bytes:
+        """
+        Recompute the tree root implied by this proof and a message.
+
+        Raises:
+            ValueError: If the path length does not match the tree shape
+        """
+        node = _hash_leaf(message)
+        index = self._index
+        width = self._tree_size
+        path = iter(self._path)
+        try:
+            while width > 1:
+                if index % 2:
+                    node = _hash_node(next(path), node)
+                elif index + 1 < width:
+                    node = _hash_node(node, next(path))
+                # else: lone last node, promoted unchanged
+                index //= 2
+                width = (width + 1) // 2
+        except StopIteration:
+            raise ValueError("Inclusion proof path too short") from None
+        if next(path, None) is not None:
+            raise ValueError("Inclusion proof path too long")
+        return node
+
+    def to_bytes(self) -> bytes:
+        """Export the proof as bytes"""
+        return (_PROOF_HEADER.pack(self._index, self._tree_size, len(self._path))
+                + b''.join(self._path))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'MerkleProof':
+        """Import a proof exported with to_bytes()"""
+        if len(data) < _PROOF_HEADER.size:
+            raise ValueError("Truncated inclusion proof")
+        index, tree_size, count = _PROOF_HEADER.unpack_from(data)
+        expected = _PROOF_HEADER.size + count * HASH_SIZE
+        if len(data) != expected:
+            raise ValueError(
+                f"Invalid inclusion proof size: expected {expected}, got {len(data)}"
+            )
+        path = [data[off:off + HASH_SIZE]
+                for off in range(_PROOF_HEADER.size, expected, HASH_SIZE)]
+        return cls(index, tree_size, path)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, MerkleProof):
+            return NotImplemented
+        return (self._index, self._tree_size, self._path) == \
+            (other._index, other._tree_size, other._path)
+
+    def __repr__(self) -> str:
+        return (f"MerkleProof(index={self._index}, tree_size={self._tree_size}, "
+                f"path_length={len(self._path)})")
+
+
+class BatchSignature:
+    """
+    Signature of one message from a Merkle-batched signing operation.
+
+    All BatchSignature objects from the same batch share the same root and
+    root signature; only the inclusion proof differs.
+    """
+
+    def __init__(self, root: bytes, root_signature: bytes, proof: MerkleProof,
+                 param_set: str):
+        """
+        Initialize a batch signature.
+
+        Args:
+            root: The Merkle tree root
+            root_signature: FAEST signature over the root
+            proof: Inclusion proof for the message
+            param_set: The parameter set of the signing key
+        """
+        if not isinstance(root, bytes) or len(root) != HASH_SIZE:
+            raise ValueError(f"Root must be a {HASH_SIZE}-byte hash")
+        if not isinstance(root_signature, bytes):
+            raise TypeError("Root signature must be bytes")
+        if param_set not in PARAMETER_SETS:
+            raise ValueError(f"Invalid parameter set: {param_set}")
+
+        self._root = root
+        self._root_signature = root_signature
+        self._proof = proof
+        self._param_set = param_set
+
+    @property
+    def root(self) -> bytes:
+        """The Merkle tree root"""
+        return self._root
+
+    @property
+    def root_signature(self) -> bytes:
+        """FAEST signature over the root"""
+        return self._root_signature
+
+    @property
+    def proof(self) -> MerkleProof:
+        """Inclusion proof for the message"""
+        return self._proof
+
+    @property
+    def param_set(self) -> str:
+        """Get the parameter set identifier"""
+        return self._param_set
+
+    def to_bytes(self) -> bytes:
+        """
+        Export root, root signature and proof as bytes.
+
+        When many signatures from one batch travel together, send the root
+        signature once and only proof.to_bytes() per message instead.
+        """
+        proof = self._proof.to_bytes()
+        return (self._root + struct.pack('>I', len(self._root_signature))
+                + self._root_signature + proof)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, param_set: str) -> 'BatchSignature':
+        """Import a batch signature exported with to_bytes()"""
+        if len(data) < HASH_SIZE + 4:
+            raise ValueError("Truncated batch signature")
+        root = data[:HASH_SIZE]
+        (sig_len,) = struct.unpack_from('>I', data, HASH_SIZE)
+        sig_end = HASH_SIZE + 4 + sig_len
+        if len(data) < sig_end:
+            raise ValueError("Truncated batch signature")
+        root_signature = data[HASH_SIZE + 4:sig_end]
+        proof = MerkleProof.from_bytes(data[sig_end:])
+        return cls(root, root_signature, proof, param_set)
+
+    def __repr__(self) -> str:
+        return (f"BatchSignature(param_set='{self._param_set}', "
+                f"index={self._proof.index}, tree_size={self._proof.tree_size})")
+
+
+def merkle_root(messages: Sequence[bytes]) -> bytes:
+    """
+    Compute the Merkle root of a batch of messages.
+
+    Args:
+        messages: The messages (as bytes), in batch order
+
+    Returns:
+        The 32-byte root hash
+    """
+    if not messages:
+        raise ValueError("Cannot build a Merkle tree over an empty batch")
+    return _build_levels(messages)[-1][0]
+
+
+def sign_batch(messages: Sequence[bytes], private_key: PrivateKey) -> List[BatchSignature]:
+    """
+    Sign a batch of messages with a single FAEST signature.
+
+    Args:
+        messages: The messages to sign (as bytes)
+        private_key: The private key to sign the root with
+
+    Returns:
+        One BatchSignature per message, in the same order
+
+    Raises:
+        SignatureError: If signing fails
+        TypeError: If a message is not bytes
+        ValueError: If the batch is empty
+    """
+    messages = list(messages)
+    if not messages:
+        raise ValueError("Cannot sign an empty batch")
+    for message in messages:
+        if not isinstance(message, bytes):
+            raise TypeError("Message must be bytes")
+
+    levels = _build_levels(messages)
+    root = levels[-1][0]
+    tree_size = len(messages)
+    root_signature = sign(_root_message(root, tree_size), private_key)
+
+    signatures = []
+    for index in range(tree_size):
+        path = []
+        i = index
+        for level in levels[:-1]:
+            sibling = i ^ 1
+            if sibling < len(level):
+                path.append(level[sibling])
+            i //= 2
+        proof = MerkleProof(index, tree_size, path)
+        signatures.append(
+            BatchSignature(root, root_signature, proof, private_key.param_set)
+        )
+    return signatures
+
+
+class BatchVerifier:
+    """
+    Verifier for Merkle-batched signatures that checks each root only once.
+
+    Verified (root, tree size, root signature) triples are remembered in a
+    bounded LRU, so messages from the same batch arriving separately cost a
+    single FAEST verification plus one inclusion proof each.
+    """
+
+    def __init__(self, public_key: PublicKey, max_roots: int = 1024):
+        """
+        Initialize a batch verifier.
+
+        Args:
+            public_key: The public key to verify root signatures with
+            max_roots: Number of verified roots remembered
+        """
+        if max_roots <= 0:
+            raise ValueError("max_roots must be positive")
+        self._public_key = public_key
+        self._max_roots = max_roots
+        self._roots: 'OrderedDict[tuple, bool]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._root_verifications = 0
+
+    def _check_root(self, batch_signature: BatchSignature) -> bool:
+        key = (batch_signature.root, batch_signature.proof.tree_size,
+               hashlib.sha256(batch_signature.root_signature).digest())
+        with self._lock:
+            cached = self._roots.get(key)
+            if cached is not None:
+                self._roots.move_to_end(key)
+                return cached
+
+        result = verify(
+            _root_message(batch_signature.root, batch_signature.proof.tree_size),
+            batch_signature.root_signature,
+            self._public_key,
+        )
+
+        with self._lock:
+            self._root_verifications += 1
+            self._roots[key] = result
+            while len(self._roots) > self._max_roots:
+                self._roots.popitem(last=False)
+        return result
+
+    def verify(self, message: bytes, batch_signature: BatchSignature) -> bool:
+        """
+        Verify one message against its batch signature.
+
+        Returns:
+            True if the signature is valid, False otherwise
+
+        Raises:
+            TypeError: If message is not bytes
+        """
+        if not isinstance(message, bytes):
+            raise TypeError("Message must be bytes")
+        if batch_signature.param_set != self._public_key.param_set:
+            return False
+        try:
+            root = batch_signature.proof.compute_root(message)
+        except ValueError:
+            return False
+        if root != batch_signature.root:
+            return False
+        return self._check_root(batch_signature)
+
+    def verify_many(self, messages: Sequence[bytes],
+                    batch_signatures: Sequence[BatchSignature]) -> List[bool]:
+        """
+        Verify many messages against their batch signatures.
+
+        Returns:
+            List of booleans, one per message
+        """
+        if len(messages) != len(batch_signatures):
+            raise ValueError("Number of messages and signatures must match")
+        return [self.verify(m, s) for m, s in zip(messages, batch_signatures)]
+
+    @property
+    def root_verifications(self) -> int:
+        """Number of FAEST signature verifications performed"""
+        return self._root_verifications
+
+
+def verify_batch(messages: Sequence[bytes], batch_signatures: Sequence[BatchSignature],
+                 public_key: PublicKey) -> List[bool]:
+    """
+    Verify a batch of messages, checking each distinct root signature once.
+
+    Args:
+        messages: The messages that were signed
+        batch_signatures: The matching batch signatures
+        public_key: The public key to verify with
+
+    Returns:
+        List of booleans, one per message
+    """
+    return BatchVerifier(public_key).verify_many(messages, batch_signatures)
+
+
+__all__ = [
+    'MerkleProof',
+    'BatchSignature',
+    'BatchVerifier',
+    'merkle_root',
+    'sign_batch',
+    'verify_batch',
+]
@@ -0,0 +1,178 @@
+"""
+PyFAEST - Operations over several keys
+
+Co-signing one message with many private keys, k-of-n threshold
+verification and finding which of several public keys made a signature.
+Each operation runs on the shared batch worker pool with at most `workers`
+calls in flight, and verification stops scheduling further checks as soon
+as the outcome is known. Checks already running when the outcome is
+decided finish in the background and are ignored.
+
+Example:
+    >>> from faest.multikey import sign_with_keys, verify_threshold, verify_any
+    >>>
+    >>> signatures = sign_with_keys(message, approver_keys)
+    >>> verify_threshold(message, signatures, approver_pks, k=3)
+    True
+    >>> verify_any(message, signature, candidate_pks)
+    2
+"""
+
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Callable, List, Optional, Sequence, Union
+
+from .core import PrivateKey, UnpackedPrivateKey, PublicKey, sign, verify
+from .batching import _get_executor, default_workers
+
+
+def _race(calls: Sequence[Callable[[], object]], workers: int,
+          decide: Callable[[int, object], bool]) -> None:
+    """
+    Run calls with at most `workers` in flight until decide() returns True.
+
+    decide(index, result) is called in the calling thread as results arrive,
+    in completion order.
+    """
+    if workers <= 1 or len(calls) <= 1:
+        for i, call in enumerate(calls):
+            if decide(i, call()):
+                return
+        return
+
+    executor = _get_executor(workers)
+    pending = {}
+    next_call = 0
+    try:
+        while next_call < len(calls) or pending:
+            while next_call < len(calls) and len(pending) < workers:
+                pending[executor.submit(calls[next_call])] = next_call
+                next_call += 1
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if decide(pending.pop(future), future.result()):
+                    return
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def sign_with_keys(message: bytes, private_keys: Sequence[Union[PrivateKey, UnpackedPrivateKey]],
+                   workers: Optional[int] = None) -> List[bytes]:
+    """
+    Sign one message with each of several private keys in parallel.
+
+    Args:
+        message: The message to sign (as bytes)
+        private_keys: The signing keys (packed or unpacked, any parameter sets)
+        workers: Number of worker threads (default: one per CPU)
+
+    Returns:
+        List of signatures, in the same order as the keys
+
+    Raises:
+        SignatureError: If any signature fails
+        TypeError: If message is not bytes
+    """
+    if not isinstance(message, bytes):
+        raise TypeError("Message must be bytes")
+    private_keys = list(private_keys)
+    signatures: List[bytes] = [b''] * len(private_keys)
+
+    def store(i, signature):
+        signatures[i] = signature
+        return False
+
+    _race([lambda key=key: sign(message, key) for key in private_keys],
+          workers or default_workers(), store)
+    return signatures
+
+
+def verify_threshold(message: bytes, signatures: Sequence[Optional[bytes]],
+                     public_keys: Sequence[PublicKey], k: int,
+                     workers: Optional[int] = None) -> bool:
+    """
+    Check that at least k of the signatures are valid.
+
+    Signature i is checked against public key i; a None signature counts as
+    missing. Checking stops once k signatures are valid or too few remain.
+
+    Args:
+        message: The message that was signed
+        signatures: One signature (or None) per public key
+        public_keys: The co-signers' public keys
+        k: Number of valid signatures required
+        workers: Number of worker threads (default: one per CPU)
+
+    Returns:
+        True if at least k signatures are valid
+
+    Raises:
+        TypeError: If message or a signature is not bytes
+        ValueError: If the counts do not match or k is out of range
+    """
+    if not isinstance(message, bytes):
+        raise TypeError("Message must be bytes")
+    signatures = list(signatures)
+    public_keys = list(public_keys)
+    if len(signatures) != len(public_keys):
+        raise ValueError("Number of signatures and public keys must match")
+    if not 1 <= k <= len(public_keys):
+        raise ValueError(f"k must be between 1 and {len(public_keys)}")
+
+    pairs = [(s, pk) for s, pk in zip(signatures, public_keys) if s is not None]
+    for signature, _ in pairs:
+        if not isinstance(signature, bytes):
+            raise TypeError("Signature must be bytes")
+    if len(pairs) < k:
+        return False
+
+    state = {'valid': 0, 'remaining': len(pairs)}
+
+    def count(i, valid):
+        state['valid'] += valid
+        state['remaining'] -= 1
+        return state['valid'] >= k or state['valid'] + state['remaining'] < k
+
+    _race([lambda s=s, pk=pk: verify(message, s, pk) for s, pk in pairs],
+          workers or default_workers(), count)
+    return state['valid'] >= k
+
+
+def verify_any(message: bytes, signature: bytes, public_keys: Sequence[PublicKey],
+               workers: Optional[int] = None) -> Optional[int]:
+    """
+    Find a public key under which a signature is valid.
+
+    Candidates are checked in list order (several at a time) and checking
+    stops at the first match, so put the likeliest keys first.
+
+    Args:
+        message: The message that was signed
+        signature: The signature
+        public_keys: Candidate public keys
+        workers: Number of worker threads (default: one per CPU)
+
+    Returns:
+        The index of a matching public key, or None if none match
+
+    Raises:
+        TypeError: If message or signature is not bytes
+    """
+    if not isinstance(message, bytes):
+        raise TypeError("Message must be bytes")
+    if not isinstance(signature, bytes):
+        raise TypeError("Signature must be bytes")
+    public_keys = list(public_keys)
+    found: List[int] = []
+
+    def match(i, valid):
+        if valid:
+            found.append(i)
+        return valid
+
+    _race([lambda pk=pk: verify(message, signature, pk) for pk in public_keys],
+          workers or default_workers(), match)
+    return found[0] if found else None
+
+
+__all__ = ['sign_with_keys', 'verify_threshold', 'verify_any']
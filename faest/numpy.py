@@ -0,0 +1,159 @@
+"""
+PyFAEST - NumPy array interface
+
+Signs and verifies the rows of NumPy arrays in place: each row of a 2-D
+uint8 array, or each record of a 1-D structured (or fixed-size bytes)
+array, is one message. The native batch helpers read the rows through the
+array's own data pointer and row stride, so rows are never converted to
+bytes, and the work is split across the batch worker threads.
+
+Records of a structured array are signed as their raw bytes, including
+any alignment padding in the dtype.
+
+NumPy is optional; importing this module without it raises ImportError.
+
+Example:
+    >>> import numpy as np
+    >>> from faest.numpy import sign_array, verify_array
+    >>>
+    >>> rows = np.zeros((1000, 64), dtype=np.uint8)
+    >>> signatures = sign_array(rows, private_key)      # (1000, sig_size) uint8
+    >>> ok = verify_array(rows, signatures, public_key)  # (1000,) bool
+"""
+
+from typing import Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        "faest.numpy requires NumPy; install it with 'pip install pyfaest[numpy]'"
+    ) from e
+
+from .core import ffi, SignatureError, PrivateKey, UnpackedPrivateKey, PublicKey, PARAMETER_SETS
+from .batching import sign_arena, verify_arena
+
+
+def _rows(arr, name: str):
+    """
+    Locate the rows of an array without copying them.
+
+    Returns:
+        Tuple (array, data, offsets, lengths); the array (possibly a
+        contiguous copy) and the index arrays must outlive the cdata
+    """
+    if not isinstance(arr, np.ndarray):
+        raise TypeError(f"{name} must be a NumPy array")
+    if arr.ndim == 2 and arr.dtype == np.uint8:
+        width = arr.shape[1]
+        if arr.strides[1] != 1 or arr.strides[0] < 0:
+            arr = np.ascontiguousarray(arr)
+    elif arr.ndim == 1 and arr.dtype.kind in 'SV':
+        width = arr.itemsize
+        if arr.strides[0] < 0:
+            arr = np.ascontiguousarray(arr)
+    else:
+        raise TypeError(f"{name} must be a 2-D uint8 array or a 1-D structured array")
+
+    count = arr.shape[0]
+    offsets = np.arange(count, dtype=np.uintp) * np.uintp(arr.strides[0])
+    lengths = np.full(count, width, dtype=np.uintp)
+    data = ffi.cast('uint8_t *', arr.ctypes.data)
+    return arr, data, offsets, lengths
+
+
+def _size_t(values):
+    return ffi.cast('size_t *', values.ctypes.data)
+
+
+def sign_array(arr, private_key: Union[PrivateKey, UnpackedPrivateKey],
+               workers: Optional[int] = None):
+    """
+    Sign every row of an array.
+
+    Args:
+        arr: 2-D uint8 array (one message per row) or 1-D structured array
+             (one message per record)
+        private_key: The private key to sign with (packed or unpacked)
+        workers: Number of worker threads (default: one per CPU)
+
+    Returns:
+        uint8 array of shape (n, sig_size), one signature per row
+
+    Raises:
+        SignatureError: If any signature fails
+        TypeError: If arr is not a supported array
+    """
+    arr, data, offsets, lengths = _rows(arr, "Messages")
+    count = arr.shape[0]
+    sig_size = private_key._params['sig_size']
+    if count == 0:
+        return np.empty((0, sig_size), dtype=np.uint8)
+    if isinstance(private_key, UnpackedPrivateKey) and not private_key._finalizer.alive:
+        raise SignatureError("Unpacked private key has been cleared")
+
+    signatures, _, results = sign_arena(private_key, data, _size_t(offsets),
+                                        _size_t(lengths), count, workers)
+    codes = np.frombuffer(ffi.buffer(results, count * ffi.sizeof('int')), dtype=np.intc)
+    failed = np.flatnonzero(codes)
+    if failed.size:
+        i = int(failed[0])
+        raise SignatureError(
+            f"Signature generation failed with error code {codes[i]} (message {i})"
+        )
+    return np.frombuffer(ffi.buffer(signatures, count * sig_size),
+                         dtype=np.uint8).reshape(count, sig_size)
+
+
+def verify_array(arr, signatures, public_key: Union[PublicKey, Sequence[PublicKey]],
+                 workers: Optional[int] = None):
+    """
+    Verify a signature for every row of an array.
+
+    Args:
+        arr: Messages, as for sign_array()
+        signatures: 2-D uint8 array with one signature per row
+        public_key: One public key for all rows, or one per row (all with
+                    the same parameter set)
+        workers: Number of worker threads (default: one per CPU)
+
+    Returns:
+        Boolean array of shape (n,)
+
+    Raises:
+        TypeError: If arr or signatures is not a supported array
+        ValueError: If the numbers of rows or the parameter sets do not match
+    """
+    arr, data, offsets, lengths = _rows(arr, "Messages")
+    if not isinstance(signatures, np.ndarray) or signatures.ndim != 2 \
+            or signatures.dtype != np.uint8:
+        raise TypeError("Signatures must be a 2-D uint8 array")
+    signatures, sig_data, sig_offsets, sig_lens = _rows(signatures, "Signatures")
+    count = arr.shape[0]
+    if signatures.shape[0] != count:
+        raise ValueError("Number of messages and signatures must match")
+    if count == 0:
+        return np.empty(0, dtype=bool)
+
+    if isinstance(public_key, PublicKey):
+        param_set = public_key.param_set
+        pk_stride = 0
+        pk_data = public_key.to_bytes()
+    else:
+        public_keys = list(public_key)
+        if len(public_keys) != count:
+            raise ValueError("Number of messages and public keys must match")
+        param_set = public_keys[0].param_set
+        if any(pk.param_set != param_set for pk in public_keys):
+            raise ValueError("All public keys must use the same parameter set")
+        pk_stride = PARAMETER_SETS[param_set]['pk_size']
+        pk_data = b''.join(pk.to_bytes() for pk in public_keys)
+    pks = ffi.from_buffer('uint8_t[]', pk_data)
+
+    results = verify_arena(param_set, pks, pk_stride, data, _size_t(offsets), _size_t(lengths),
+                           sig_data, _size_t(sig_offsets), _size_t(sig_lens), count, workers)
+    codes = np.frombuffer(ffi.buffer(results, count * ffi.sizeof('int')), dtype=np.intc)
+    return codes == 0
+
+
+__all__ = ['sign_array', 'verify_array']
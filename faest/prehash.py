@@ -0,0 +1,195 @@
+"""
+PyFAEST - Message prehashing
+
+Large messages can be reduced to a short digest before signing, so that a
+batch signs or verifies fixed-size digests instead of the messages
+themselves. The digest uses the same hash as the parameter set's security
+level: SHAKE128 with a 32-byte output for 128-bit sets, SHAKE256 with a
+48- or 64-byte output for 192- and 256-bit sets, over a fixed
+domain-separation prefix followed by the message.
+
+prehash_many() hashes batches natively when libfaest is linked statically
+(e.g. the 'phases' build profile): messages are grouped by length and
+runs of four equal-length messages are absorbed together through
+libfaest's 4-way Keccak, the rest one at a time. With the default shared
+library, whose Keccak symbols are not exported, batches are hashed with
+hashlib on the shared batch worker pool instead; hashlib releases the GIL
+for large inputs, so this also runs in parallel.
+
+Both paths produce identical digests.
+
+Example:
+    >>> from faest import prehash
+    >>>
+    >>> signatures = prehash.sign_many(large_messages, keypair.private_key)
+    >>> results = prehash.verify_many(large_messages, signatures, keypair.public_key)
+"""
+
+from typing import List, Optional, Sequence, Union
+import hashlib
+
+from .core import ffi, lib, PARAMETER_SETS, PrivateKey, UnpackedPrivateKey, PublicKey
+from . import batching
+from .batching import _chunks, _run, default_workers, pack_messages
+
+PREFIX = b'PyFAEST-prehash-v1\x00'
+
+# Below this many bytes per batch the thread pool costs more than it saves
+_PARALLEL_MIN_BYTES = 1 << 16
+
+
+def security_level(param_set: str) -> int:
+    """
+    Get the security level (128, 192 or 256) of a parameter set.
+
+    Raises:
+        ValueError: If the parameter set is unknown
+    """
+    if param_set not in PARAMETER_SETS:
+        raise ValueError(f"Invalid parameter set: {param_set}")
+    return int(param_set.rsplit('_', 1)[-1][:3])
+
+
+def digest_size(param_set: str) -> int:
+    """Get the prehash digest size in bytes for a parameter set"""
+    return security_level(param_set) // 4
+
+
+def _hasher(level: int):
+    return hashlib.shake_128 if level == 128 else hashlib.shake_256
+
+
+def native_available() -> bool:
+    """Check whether the extension hashes batches natively"""
+    digest = ffi.new('uint8_t[]', 32)
+    return lib.pyfaest_shake_batch(128, PREFIX, len(PREFIX), ffi.new('uint8_t[]', 1),
+                                   ffi.new('size_t[]', 1), ffi.new('size_t[]', 1), 1,
+                                   digest, 32) == 1
+
+
+_NATIVE = native_available()
+
+
+def prehash(message: bytes, param_set: str) -> bytes:
+    """
+    Hash one message for a parameter set.
+
+    Args:
+        message: The message (as bytes)
+        param_set: Parameter set whose security level selects the hash
+
+    Returns:
+        The digest
+
+    Raises:
+        TypeError: If the message is not bytes
+        ValueError: If the parameter set is unknown
+    """
+    if not isinstance(message, bytes):
+        raise TypeError("Message must be bytes")
+    level = security_level(param_set)
+    h = _hasher(level)(PREFIX)
+    h.update(message)
+    return h.digest(level // 4)
+
+
+def prehash_many(messages: Sequence[bytes], param_set: str,
+                 workers: Optional[int] = None) -> List[bytes]:
+    """
+    Hash many messages for a parameter set.
+
+    Args:
+        messages: Messages (as bytes)
+        param_set: Parameter set whose security level selects the hash
+        workers: Number of worker threads (default: default_workers())
+
+    Returns:
+        List of digests, in the same order as the messages
+
+    Raises:
+        TypeError: If any message is not bytes
+        ValueError: If the parameter set is unknown
+    """
+    messages = list(messages)
+    level = security_level(param_set)
+    size = level // 4
+    count = len(messages)
+    if count == 0:
+        return []
+    for message in messages:
+        if not isinstance(message, bytes):
+            raise TypeError("Message must be bytes")
+    workers = workers or default_workers()
+    if sum(map(len, messages)) < _PARALLEL_MIN_BYTES:
+        workers = 1
+
+    if not _NATIVE:
+        hasher = _hasher(level)
+        digests: List[bytes] = [b''] * count
+
+        def hash_range(start, stop):
+            for i in range(start, stop):
+                h = hasher(PREFIX)
+                h.update(messages[i])
+                digests[i] = h.digest(size)
+
+        _run([(hash_range, chunk) for chunk in _chunks(count, workers)], workers)
+        return digests
+
+    # Equal lengths next to each other, so the native loop finds x4 runs;
+    # chunk boundaries are kept on multiples of four
+    order = sorted(range(count), key=lambda i: len(messages[i]))
+    data, offsets, lengths = pack_messages([messages[i] for i in order])
+    out = ffi.new('uint8_t[]', count * size)
+    groups = -(-count // 4)
+    tasks = [
+        (lib.pyfaest_shake_batch,
+         (level, PREFIX, len(PREFIX), data, offsets + 4 * start, lengths + 4 * start,
+          min(4 * stop, count) - 4 * start, out + 4 * start * size, size))
+        for start, stop in _chunks(groups, workers)
+    ]
+    _run(tasks, workers)
+
+    digests = [b''] * count
+    for position, i in enumerate(order):
+        digests[i] = bytes(ffi.buffer(out + position * size, size))
+    return digests
+
+
+def sign_many(messages: Sequence[bytes], private_key: Union[PrivateKey, UnpackedPrivateKey],
+              workers: Optional[int] = None) -> List[bytes]:
+    """
+    Prehash and sign many messages.
+
+    Returns:
+        List of signatures over the digests, in the same order as the messages
+
+    Raises:
+        SignatureError: If any signature fails
+    """
+    digests = prehash_many(messages, private_key.param_set, workers)
+    return batching.sign_many(digests, private_key, workers)
+
+
+def verify_many(messages: Sequence[bytes], signatures: Sequence[bytes], public_key: PublicKey,
+                workers: Optional[int] = None) -> List[bool]:
+    """
+    Prehash many messages and verify their signatures.
+
+    Returns:
+        List of booleans, one per message
+    """
+    digests = prehash_many(messages, public_key.param_set, workers)
+    return batching.verify_many(digests, signatures, public_key, workers)
+
+
+__all__ = [
+    'PREFIX',
+    'security_level',
+    'digest_size',
+    'native_available',
+    'prehash',
+    'prehash_many',
+    'sign_many',
+    'verify_many',
+]
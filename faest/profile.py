@@ -0,0 +1,188 @@
+"""
+PyFAEST - Phase-level profiling
+
+Reports how signing and verification time divides between the internal
+phases of libfaest. This needs an extension built with the 'phases'
+profile, which links a static faest-ref build with timing wrappers:
+
+    FAEST_BUILD_PROFILE=phases FAEST_SRC_DIR=/path/to/faest-ref python faest_build.py
+
+Phases and what they cover:
+    sign, verify      whole faest_<set>_sign/unpacked_sign and verify calls
+    vole_commit       VOLE commitment (includes bavc_commit)
+    bavc_commit       GGM tree expansion and leaf commitments
+    bavc_open         opening of the vector commitment
+    vole_reconstruct  verifier VOLE reconstruction (includes bavc_reconstruct)
+    bavc_reconstruct  verifier tree reconstruction
+    vole_hash         universal hashing of the VOLE check values
+    zk_hash           ZK hashing of the constraints (inside owf_prove/owf_verify)
+    owf_prove         AES/EM one-way function proof
+    owf_verify        AES/EM one-way function check
+
+Time is counted in ticks of the clock named by clock() (the TSC on x86).
+Nested phases are included in their parent, and every instrumented call
+adds two clock reads, so frequently called phases such as zk_hash are
+somewhat overstated. Compare shares between parameter sets and hosts
+rather than reading them as exact costs.
+
+Example:
+    >>> from faest import profile
+    >>>
+    >>> before = profile.snapshot()
+    >>> ...  # sign as usual
+    >>> profile.phase_stats(since=before)['128f']['owf_prove']['share']
+    0.31
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from .core import ffi, lib, FaestError, PARAMETER_SETS
+
+_SLOTS = lib.PYFAEST_PARAM_SLOTS
+_PHASES = [ffi.string(lib.pyfaest_phase_name(i)).decode()
+           for i in range(lib.pyfaest_phase_count())]
+_PARAM_SETS_BY_ID = {params['param_id']: name for name, params in PARAMETER_SETS.items()}
+
+
+def available() -> bool:
+    """Check whether the extension was built with the 'phases' profile"""
+    return bool(_PHASES)
+
+
+def phases() -> List[str]:
+    """Get the names of the instrumented phases"""
+    return list(_PHASES)
+
+
+def clock() -> str:
+    """Get the name of the clock that phase times are counted in"""
+    return ffi.string(lib.pyfaest_phase_clock()).decode()
+
+
+def _require() -> None:
+    if not _PHASES:
+        raise FaestError(
+            f"libfaest is not instrumented (build profile "
+            f"'{ffi.string(lib.pyfaest_build_profile()).decode()}'); rebuild with "
+            f"FAEST_BUILD_PROFILE=phases"
+        )
+
+
+class PhaseSnapshot:
+    """
+    Cumulative phase counters at one point in time.
+
+    Subtracting two snapshots gives the counters for the interval between
+    them.
+    """
+
+    def __init__(self, cycles: Dict[Tuple[str, str], int],
+                 calls: Dict[Tuple[str, str], int]):
+        self._cycles = cycles
+        self._calls = calls
+
+    def cycles(self, param_set: str, phase: str) -> int:
+        """Clock ticks spent in a phase"""
+        return self._cycles.get((param_set, phase), 0)
+
+    def calls(self, param_set: str, phase: str) -> int:
+        """Number of outermost calls of a phase"""
+        return self._calls.get((param_set, phase), 0)
+
+    def __sub__(self, other: 'PhaseSnapshot') -> 'PhaseSnapshot':
+        if not isinstance(other, PhaseSnapshot):
+            return NotImplemented
+        return PhaseSnapshot(
+            {k: v - other._cycles.get(k, 0) for k, v in self._cycles.items()},
+            {k: v - other._calls.get(k, 0) for k, v in self._calls.items()},
+        )
+
+    def stats(self) -> dict:
+        """
+        Summarise the counters per parameter set.
+
+        Returns:
+            {param_set: {phase: {'calls', 'cycles', 'cycles_per_op', 'share'}}}
+            for every parameter set that signed or verified. 'cycles_per_op'
+            divides by the number of sign and verify calls, and 'share' is
+            the fraction of the sign and verify time spent in the phase.
+        """
+        names = list(dict.fromkeys(phase for _, phase in self._cycles))
+        result = {}
+        for param_set in PARAMETER_SETS:
+            ops = self.calls(param_set, 'sign') + self.calls(param_set, 'verify')
+            if ops <= 0:
+                continue
+            total = self.cycles(param_set, 'sign') + self.cycles(param_set, 'verify')
+            result[param_set] = {
+                phase: {
+                    'calls': self.calls(param_set, phase),
+                    'cycles': self.cycles(param_set, phase),
+                    'cycles_per_op': self.cycles(param_set, phase) / ops,
+                    'share': self.cycles(param_set, phase) / total if total else 0.0,
+                }
+                for phase in names
+            }
+        return result
+
+
+def snapshot() -> PhaseSnapshot:
+    """
+    Read the current phase counters.
+
+    Raises:
+        FaestError: If the extension is not instrumented
+    """
+    _require()
+    count = _SLOTS * len(_PHASES)
+    cycles = ffi.new('uint64_t[]', count)
+    calls = ffi.new('uint64_t[]', count)
+    lib.pyfaest_phase_snapshot(cycles, calls)
+
+    cycle_map, call_map = {}, {}
+    for param_id, param_set in _PARAM_SETS_BY_ID.items():
+        for i, phase in enumerate(_PHASES):
+            cycle_map[param_set, phase] = cycles[param_id * len(_PHASES) + i]
+            call_map[param_set, phase] = calls[param_id * len(_PHASES) + i]
+    return PhaseSnapshot(cycle_map, call_map)
+
+
+def reset() -> None:
+    """
+    Zero all phase counters.
+
+    Raises:
+        FaestError: If the extension is not instrumented
+    """
+    _require()
+    lib.pyfaest_phase_reset()
+
+
+def phase_stats(since: Optional[PhaseSnapshot] = None) -> dict:
+    """
+    Summarise time per phase and parameter set.
+
+    Args:
+        since: Only count work done after this snapshot
+
+    Returns:
+        See PhaseSnapshot.stats()
+
+    Raises:
+        FaestError: If the extension is not instrumented
+    """
+    current = snapshot()
+    if since is not None:
+        current = current - since
+    return current.stats()
+
+
+__all__ = [
+    'PhaseSnapshot',
+    'available',
+    'phases',
+    'clock',
+    'snapshot',
+    'reset',
+    'phase_stats',
+]
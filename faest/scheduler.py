@@ -0,0 +1,435 @@
+"""
+PyFAEST - Cost-aware priority scheduling
+
+A 256s signature costs about a hundred times as much as an em_128f
+verification. When both share a FIFO worker pool, cheap latency-sensitive
+calls queue behind expensive ones.
+Scheduler runs sign/verify calls on its own worker threads in order of:
+
+    1. priority class (INTERACTIVE, then NORMAL, then BULK)
+    2. deadline, earliest first (calls without a deadline last)
+    3. submission order
+
+BULK calls may occupy at most `max_bulk_workers` threads, so that with
+several workers some capacity is always free for interactive work.
+
+A CostModel holds the expected time of each operation per parameter set.
+CostModel.calibrate() measures it on the host; the model then follows
+observed run times, and operations not yet seen count as free. The
+scheduler uses it to shed load: a call whose deadline cannot be met given
+the expected remaining time of the calls already running and the work
+queued ahead of it fails immediately with OverloadError instead of running
+late, and a call still queued when its deadline passes is dropped the same
+way. `max_backlog` additionally bounds the expected wait (in seconds) of
+calls without a deadline.
+
+Example:
+    >>> from faest.scheduler import Scheduler, INTERACTIVE, BULK
+    >>>
+    >>> with Scheduler(workers=4) as scheduler:
+    ...     bulk = [scheduler.submit_sign(m, sk_256s, priority=BULK) for m in batch]
+    ...     ok = scheduler.verify(message, signature, pk_em128f,
+    ...                           priority=INTERACTIVE, timeout=0.005)
+"""
+
+from concurrent.futures import Future
+from typing import Dict, Iterable, Optional, Tuple, Union
+import heapq
+import itertools
+import math
+import threading
+import time
+
+from .core import (
+    FaestError, PARAMETER_SETS, Keypair,
+    PrivateKey, UnpackedPrivateKey, PublicKey,
+    sign, verify,
+)
+from .batching import default_workers
+
+INTERACTIVE = 0
+NORMAL = 1
+BULK = 2
+
+PRIORITIES = (INTERACTIVE, NORMAL, BULK)
+
+_OPS = ('sign', 'verify')
+
+
+class OverloadError(FaestError):
+    """Raised when a scheduled call is shed because it cannot meet its deadline"""
+    pass
+
+
+class CostModel:
+    """
+    Expected duration in seconds of each (parameter set, operation).
+
+    Observed run times are folded in with an exponentially weighted moving
+    average. Operations that were neither calibrated nor observed cost 0.
+    """
+
+    def __init__(self, costs: Optional[Dict[Tuple[str, str], float]] = None,
+                 smoothing: float = 0.1):
+        """
+        Initialize a cost model.
+
+        Args:
+            costs: Initial costs, {(param_set, 'sign' | 'verify'): seconds}
+            smoothing: Weight of each new observation (0 disables updates)
+        """
+        if not 0 <= smoothing <= 1:
+            raise ValueError("smoothing must be between 0 and 1")
+        self._costs: Dict[Tuple[str, str], float] = dict(costs or {})
+        self._smoothing = smoothing
+        self._lock = threading.Lock()
+
+    @classmethod
+    def calibrate(cls, param_sets: Optional[Iterable[str]] = None,
+                  runs: int = 3) -> 'CostModel':
+        """
+        Measure sign and verify times on this host.
+
+        Args:
+            param_sets: Parameter sets to measure (default: all)
+            runs: Calls per operation; the fastest is kept
+
+        Returns:
+            A calibrated CostModel
+        """
+        model = cls()
+        for param_set in (param_sets or PARAMETER_SETS):
+            model._measure(param_set, runs)
+        return model
+
+    def _measure(self, param_set: str, runs: int) -> None:
+        keypair = Keypair.generate(param_set)
+        message = b"PyFAEST scheduler calibration"
+        best = {'sign': math.inf, 'verify': math.inf}
+        for _ in range(runs):
+            start = time.perf_counter()
+            signature = sign(message, keypair.private_key)
+            middle = time.perf_counter()
+            verify(message, signature, keypair.public_key)
+            end = time.perf_counter()
+            best['sign'] = min(best['sign'], middle - start)
+            best['verify'] = min(best['verify'], end - middle)
+        with self._lock:
+            for op in _OPS:
+                self._costs.setdefault((param_set, op), best[op])
+
+    def cost(self, param_set: str, op: str) -> float:
+        """
+        Get the expected duration of an operation in seconds.
+
+        Raises:
+            ValueError: If the parameter set or operation is unknown
+        """
+        if param_set not in PARAMETER_SETS:
+            raise ValueError(f"Invalid parameter set: {param_set}")
+        if op not in _OPS:
+            raise ValueError(f"Invalid operation: {op}")
+        with self._lock:
+            return self._costs.get((param_set, op), 0.0)
+
+    def observe(self, param_set: str, op: str, seconds: float) -> None:
+        """Fold an observed duration into the model"""
+        with self._lock:
+            previous = self._costs.get((param_set, op))
+            if previous is None:
+                self._costs[param_set, op] = seconds
+            else:
+                self._costs[param_set, op] = previous + self._smoothing * (seconds - previous)
+
+    def costs(self) -> Dict[Tuple[str, str], float]:
+        """Get a copy of all known costs"""
+        with self._lock:
+            return dict(self._costs)
+
+
+class _Task:
+    __slots__ = ('op', 'param_set', 'priority', 'deadline', 'cost', 'func', 'args',
+                 'future')
+
+    def __init__(self, op, param_set, priority, deadline, cost, func, args):
+        self.op = op
+        self.param_set = param_set
+        self.priority = priority
+        self.deadline = deadline
+        self.cost = cost
+        self.func = func
+        self.args = args
+        self.future = Future()
+
+
+class Scheduler:
+    """
+    Priority and deadline scheduler for sign/verify calls.
+
+    Every call returns (or waits on) a Future. Calls are dispatched to the
+    scheduler's worker threads by priority class, then deadline, then
+    submission order.
+    """
+
+    def __init__(self, workers: Optional[int] = None, cost_model: Optional[CostModel] = None,
+                 max_bulk_workers: Optional[int] = None, max_backlog: Optional[float] = None):
+        """
+        Initialize a scheduler and start its worker threads.
+
+        Args:
+            workers: Number of worker threads (default: one per CPU)
+            cost_model: Expected operation costs (default: learned from
+                        observed run times only)
+            max_bulk_workers: Most threads running BULK calls at once
+                              (default: all but one, or 1 with one worker)
+            max_backlog: Seconds a new call would wait for a worker (given the
+                         running and queued work) beyond which calls without
+                         a deadline are shed (default: unbounded)
+        """
+        self._workers = workers or default_workers()
+        if self._workers <= 0:
+            raise ValueError("workers must be positive")
+        if max_bulk_workers is None:
+            max_bulk_workers = max(1, self._workers - 1)
+        if not 1 <= max_bulk_workers <= self._workers:
+            raise ValueError("max_bulk_workers must be between 1 and workers")
+        if max_backlog is not None and max_backlog <= 0:
+            raise ValueError("max_backlog must be positive")
+
+        self._cost_model = cost_model or CostModel()
+        self._max_bulk_workers = max_bulk_workers
+        self._max_backlog = max_backlog
+        self._cond = threading.Condition()
+        self._queues: Dict[int, list] = {p: [] for p in PRIORITIES}
+        # Expected seconds of queued work per priority class
+        self._queued_cost = {p: 0.0 for p in PRIORITIES}
+        self._running_bulk = 0
+        # Running task -> expected finish time (time.monotonic())
+        self._busy: Dict[_Task, float] = {}
+        self._counter = itertools.count()
+        self._closed = False
+        self._completed = {p: 0 for p in PRIORITIES}
+        self._shed = {p: 0 for p in PRIORITIES}
+        self._expired = {p: 0 for p in PRIORITIES}
+        self._threads = [
+            threading.Thread(target=self._run, name=f'faest-scheduler-{i}', daemon=True)
+            for i in range(self._workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def cost_model(self) -> CostModel:
+        """The cost model used for load shedding"""
+        return self._cost_model
+
+    def _wait(self, now: float, ahead: float) -> float:
+        """
+        Expected time until a worker can start a call with `ahead` seconds of
+        queued work before it (lock held).
+
+        Each worker is free once its running call is expected to finish;
+        the queued work is poured onto the earliest free workers first.
+        """
+        levels = sorted([max(0.0, finish - now) for finish in self._busy.values()]
+                        + [0.0] * (self._workers - len(self._busy)))
+        level = levels[0]
+        for filled in range(1, len(levels) + 1):
+            next_level = levels[filled] if filled < len(levels) else math.inf
+            room = (next_level - level) * filled
+            if ahead <= room:
+                return level + ahead / filled
+            ahead -= room
+            level = next_level
+        return level
+
+    def _submit(self, op: str, param_set: str, priority: int, timeout: Optional[float],
+                func, args) -> Future:
+        if priority not in PRIORITIES:
+            raise ValueError(f"Invalid priority: {priority}")
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be positive")
+        cost = self._cost_model.cost(param_set, op)
+        now = time.monotonic()
+        deadline = now + timeout if timeout is not None else None
+        task = _Task(op, param_set, priority, deadline, cost, func, args)
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Scheduler is closed")
+            # Running calls plus queued work that will run before this call
+            ahead = sum(self._queued_cost[p] for p in PRIORITIES if p <= priority)
+            wait = self._wait(now, ahead)
+            if deadline is not None:
+                if now + wait + cost > deadline:
+                    self._shed[priority] += 1
+                    task.future.set_exception(OverloadError(
+                        f"{param_set} {op} cannot finish within {timeout * 1e3:.1f} ms "
+                        f"(expected {(wait + cost) * 1e3:.1f} ms)"
+                    ))
+                    return task.future
+            elif self._max_backlog is not None and wait > self._max_backlog:
+                self._shed[priority] += 1
+                task.future.set_exception(OverloadError(
+                    f"Scheduler backlog of {wait:.3f} s exceeds "
+                    f"{self._max_backlog:.3f} s"
+                ))
+                return task.future
+
+            order = deadline if deadline is not None else math.inf
+            heapq.heappush(self._queues[priority], (order, next(self._counter), task))
+            self._queued_cost[priority] += cost
+            self._cond.notify()
+        return task.future
+
+    def submit_sign(self, message: bytes, private_key: Union[PrivateKey, UnpackedPrivateKey],
+                    priority: int = NORMAL, timeout: Optional[float] = None) -> Future:
+        """
+        Queue a message for signing.
+
+        Args:
+            message: The message to sign (as bytes)
+            private_key: The private key to sign with (packed or unpacked)
+            priority: INTERACTIVE, NORMAL or BULK
+            timeout: Seconds from now by which the call must complete
+
+        Returns:
+            A Future resolving to the signature bytes, or failing with
+            OverloadError if the call was shed
+        """
+        if not isinstance(message, bytes):
+            raise TypeError("Message must be bytes")
+        return self._submit('sign', private_key.param_set, priority, timeout,
+                            sign, (message, private_key))
+
+    def submit_verify(self, message: bytes, signature: bytes, public_key: PublicKey,
+                      priority: int = NORMAL, timeout: Optional[float] = None) -> Future:
+        """
+        Queue a signature for verification.
+
+        Args:
+            message: The message that was signed
+            signature: The signature to verify
+            public_key: The public key to verify with
+            priority: INTERACTIVE, NORMAL or BULK
+            timeout: Seconds from now by which the call must complete
+
+        Returns:
+            A Future resolving to True if the signature is valid, or failing
+            with OverloadError if the call was shed
+        """
+        if not isinstance(message, bytes):
+            raise TypeError("Message must be bytes")
+        if not isinstance(signature, bytes):
+            raise TypeError("Signature must be bytes")
+        return self._submit('verify', public_key.param_set, priority, timeout,
+                            verify, (message, signature, public_key))
+
+    def sign(self, message: bytes, private_key: Union[PrivateKey, UnpackedPrivateKey],
+             priority: int = NORMAL, timeout: Optional[float] = None) -> bytes:
+        """Sign a message through the scheduler and wait for the signature"""
+        return self.submit_sign(message, private_key, priority, timeout).result()
+
+    def verify(self, message: bytes, signature: bytes, public_key: PublicKey,
+               priority: int = NORMAL, timeout: Optional[float] = None) -> bool:
+        """Verify a signature through the scheduler and wait for the result"""
+        return self.submit_verify(message, signature, public_key, priority, timeout).result()
+
+    def _next_task(self) -> Optional[_Task]:
+        """Pop the next runnable task, waiting if there is none (lock held)"""
+        while True:
+            for priority in PRIORITIES:
+                queue = self._queues[priority]
+                if not queue:
+                    continue
+                if priority == BULK and self._running_bulk >= self._max_bulk_workers:
+                    continue
+                _, _, task = heapq.heappop(queue)
+                self._queued_cost[priority] -= task.cost
+                if not any(self._queues.values()):
+                    # Reset float drift once the queues are empty
+                    self._queued_cost = {p: 0.0 for p in PRIORITIES}
+                if task.deadline is not None and time.monotonic() + task.cost > task.deadline:
+                    self._expired[priority] += 1
+                    task.future.set_exception(OverloadError(
+                        f"{task.param_set} {task.op} missed its deadline while queued"
+                    ))
+                    # Rescan from INTERACTIVE: the same queue may hold more work
+                    break
+                if priority == BULK:
+                    self._running_bulk += 1
+                self._busy[task] = time.monotonic() + task.cost
+                return task
+            else:
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                task = self._next_task()
+            if task is None:
+                return
+            if task.future.set_running_or_notify_cancel():
+                start = time.perf_counter()
+                try:
+                    result = task.func(*task.args)
+                except BaseException as e:
+                    task.future.set_exception(e)
+                else:
+                    task.future.set_result(result)
+                self._cost_model.observe(task.param_set, task.op, time.perf_counter() - start)
+            with self._cond:
+                del self._busy[task]
+                if task.priority == BULK:
+                    self._running_bulk -= 1
+                    self._cond.notify()
+                self._completed[task.priority] += 1
+
+    def stats(self) -> dict:
+        """
+        Get scheduling statistics.
+
+        Returns:
+            Dictionary keyed by priority class, each with 'queued',
+            'queued_seconds' (expected), 'completed', 'shed' (rejected on
+            submission) and 'expired' (dropped while queued)
+        """
+        with self._cond:
+            return {
+                priority: {
+                    'queued': len(self._queues[priority]),
+                    'queued_seconds': max(0.0, self._queued_cost[priority]),
+                    'completed': self._completed[priority],
+                    'shed': self._shed[priority],
+                    'expired': self._expired[priority],
+                }
+                for priority in PRIORITIES
+            }
+
+    def close(self) -> None:
+        """Run all queued calls, then stop the worker threads"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self) -> 'Scheduler':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+__all__ = [
+    'Scheduler',
+    'CostModel',
+    'OverloadError',
+    'INTERACTIVE',
+    'NORMAL',
+    'BULK',
+]
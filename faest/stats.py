@@ -0,0 +1,309 @@
+"""
+PyFAEST - Signing latency and grinding statistics
+
+FAEST signing repeats its final challenge step until the challenge passes
+a proof-of-work check (the parameter set's w_grind bits plus the opening
+size bound), so sign latency has a long tail. The number of attempts is
+not random noise: it is stored as the little-endian 32-bit counter at the
+end of every signature, so it can be read back after the fact.
+
+When recording is enabled, every faest.sign() call records its wall time
+and grinding attempts into per-parameter-set histograms. Batch APIs
+(faest.batching, the daemon) sign in native loops and are not recorded.
+
+Example:
+    >>> from faest import stats
+    >>>
+    >>> stats.enable()
+    >>> ...  # sign as usual
+    >>> stats.summary('128f')
+    {'count': 1000, 'mean_ms': 4.1, 'p50_ms': 3.6, 'p99_ms': 14.0, ...}
+    >>>
+    >>> signature, sample = stats.sign_with_stats(message, private_key)
+    >>> sample.attempts, sample.seconds
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+import struct
+import threading
+import time
+
+from . import core
+from .core import PrivateKey, UnpackedPrivateKey, PARAMETER_SETS
+
+# Histogram buckets are exact below 16 and then split every power of two
+# into 8 sub-buckets, bounding the relative error of percentiles at 12.5%.
+_SUB_BUCKET_BITS = 3
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+_EXACT_LIMIT = 2 * _SUB_BUCKETS
+
+
+def grinding_attempts(signature: bytes) -> int:
+    """
+    Get the number of grinding attempts used to produce a signature.
+
+    Args:
+        signature: A FAEST signature
+
+    Returns:
+        Number of challenge attempts (the stored counter plus one)
+
+    Raises:
+        ValueError: If the signature is too short
+    """
+    if len(signature) < 4:
+        raise ValueError("Signature is too short")
+    return struct.unpack_from('<I', signature, len(signature) - 4)[0] + 1
+
+
+def _bucket_index(value: int) -> int:
+    if value < _EXACT_LIMIT:
+        return value
+    shift = value.bit_length() - _SUB_BUCKET_BITS - 1
+    return shift * _SUB_BUCKETS + (value >> shift)
+
+
+def _bucket_upper(index: int) -> int:
+    if index < _EXACT_LIMIT:
+        return index
+    shift = index // _SUB_BUCKETS - 1
+    mantissa = index % _SUB_BUCKETS + _SUB_BUCKETS
+    return ((mantissa + 1) << shift) - 1
+
+
+class Histogram:
+    """
+    Log-linear histogram of non-negative integers.
+
+    Memory grows with the number of distinct buckets (about 8 per power of
+    two), not with the number of recorded values.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[int, int] = {}
+        self._count = 0
+        self._total = 0
+        self._min: Optional[int] = None
+        self._max: Optional[int] = None
+
+    def record(self, value: int) -> None:
+        """Record one value"""
+        if value < 0:
+            raise ValueError("Histogram values must be non-negative")
+        index = _bucket_index(value)
+        with self._lock:
+            self._counts[index] = self._counts.get(index, 0) + 1
+            self._count += 1
+            self._total += value
+            if self._min is None or value < self._min:
+                self._min = value
+            if self._max is None or value > self._max:
+                self._max = value
+
+    @property
+    def count(self) -> int:
+        """Number of recorded values"""
+        return self._count
+
+    @property
+    def min(self) -> Optional[int]:
+        """Smallest recorded value, or None if empty"""
+        return self._min
+
+    @property
+    def max(self) -> Optional[int]:
+        """Largest recorded value, or None if empty"""
+        return self._max
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Mean of the recorded values, or None if empty"""
+        with self._lock:
+            return self._total / self._count if self._count else None
+
+    def percentile(self, p: float) -> Optional[int]:
+        """
+        Get an upper bound for the p-th percentile.
+
+        Args:
+            p: Percentile between 0 and 100 (e.g. 99.9)
+
+        Returns:
+            Upper edge of the bucket holding the percentile, capped at the
+            largest recorded value, or None if the histogram is empty
+        """
+        if not 0 <= p <= 100:
+            raise ValueError("Percentile must be between 0 and 100")
+        with self._lock:
+            if not self._count:
+                return None
+            rank = max(1, -(-self._count * p // 100))
+            seen = 0
+            for index in sorted(self._counts):
+                seen += self._counts[index]
+                if seen >= rank:
+                    return min(_bucket_upper(index), self._max)
+            return self._max
+
+    def buckets(self) -> List[Tuple[int, int]]:
+        """Get (bucket upper bound, count) pairs in ascending order"""
+        with self._lock:
+            return [(_bucket_upper(i), self._counts[i]) for i in sorted(self._counts)]
+
+    def reset(self) -> None:
+        """Discard all recorded values"""
+        with self._lock:
+            self._counts.clear()
+            self._count = 0
+            self._total = 0
+            self._min = None
+            self._max = None
+
+
+class SignSample(NamedTuple):
+    """Measurements for one signature"""
+    param_set: str
+    seconds: float
+    attempts: int
+
+
+class SignStats:
+    """Latency and grinding-attempt histograms for one parameter set"""
+
+    def __init__(self, param_set: str):
+        self.param_set = param_set
+        self.latency_ns = Histogram()
+        self.attempts = Histogram()
+
+    def record(self, sample: SignSample) -> None:
+        """Record one signature"""
+        self.latency_ns.record(int(sample.seconds * 1e9))
+        self.attempts.record(sample.attempts)
+
+    def summary(self) -> dict:
+        """
+        Summarise the recorded signatures.
+
+        Returns:
+            Dictionary with 'count', 'mean_ms', 'p50_ms', 'p90_ms', 'p99_ms',
+            'p999_ms', 'max_ms', 'mean_attempts', 'p99_attempts' and
+            'max_attempts' (latency and attempt entries are None if empty)
+        """
+        def ms(ns):
+            return None if ns is None else ns / 1e6
+
+        latency = self.latency_ns
+        return {
+            'count': latency.count,
+            'mean_ms': ms(latency.mean),
+            'p50_ms': ms(latency.percentile(50)),
+            'p90_ms': ms(latency.percentile(90)),
+            'p99_ms': ms(latency.percentile(99)),
+            'p999_ms': ms(latency.percentile(99.9)),
+            'max_ms': ms(latency.max),
+            'mean_attempts': self.attempts.mean,
+            'p99_attempts': self.attempts.percentile(99),
+            'max_attempts': self.attempts.max,
+        }
+
+    def reset(self) -> None:
+        """Discard all recorded signatures"""
+        self.latency_ns.reset()
+        self.attempts.reset()
+
+
+_stats = {param_set: SignStats(param_set) for param_set in PARAMETER_SETS}
+
+
+def _observe(param_set: str, seconds: float, signature: bytes) -> None:
+    _stats[param_set].record(SignSample(param_set, seconds, grinding_attempts(signature)))
+
+
+def enable() -> None:
+    """Start recording every faest.sign() call"""
+    core._sign_observer = _observe
+
+
+def disable() -> None:
+    """Stop recording faest.sign() calls (recorded data is kept)"""
+    core._sign_observer = None
+
+
+def is_enabled() -> bool:
+    """Check whether faest.sign() calls are being recorded"""
+    return core._sign_observer is _observe
+
+
+def get(param_set: str) -> SignStats:
+    """
+    Get the statistics for a parameter set.
+
+    Raises:
+        ValueError: If the parameter set is unknown
+    """
+    if param_set not in _stats:
+        raise ValueError(f"Invalid parameter set: {param_set}")
+    return _stats[param_set]
+
+
+def summary(param_set: Optional[str] = None) -> dict:
+    """
+    Summarise recorded signatures.
+
+    Args:
+        param_set: Parameter set to summarise, or None for all parameter
+                   sets that have recorded signatures
+
+    Returns:
+        SignStats.summary() for one parameter set, or a dictionary of them
+        keyed by parameter set
+    """
+    if param_set is not None:
+        return get(param_set).summary()
+    return {name: s.summary() for name, s in _stats.items() if s.latency_ns.count}
+
+
+def reset() -> None:
+    """Discard all recorded signatures"""
+    for s in _stats.values():
+        s.reset()
+
+
+def sign_with_stats(message: bytes,
+                    private_key: Union[PrivateKey, UnpackedPrivateKey]
+                    ) -> Tuple[bytes, SignSample]:
+    """
+    Sign a message and measure the signature.
+
+    Args:
+        message: The message to sign (as bytes)
+        private_key: The private key to sign with (packed or unpacked)
+
+    Returns:
+        Tuple of (signature, SignSample)
+
+    Raises:
+        SignatureError: If signing fails
+        TypeError: If inputs are not bytes
+    """
+    start = time.perf_counter()
+    signature = core.sign(message, private_key)
+    seconds = time.perf_counter() - start
+    return signature, SignSample(private_key.param_set, seconds,
+                                 grinding_attempts(signature))
+
+
+__all__ = [
+    'Histogram',
+    'SignSample',
+    'SignStats',
+    'grinding_attempts',
+    'sign_with_stats',
+    'enable',
+    'disable',
+    'is_enabled',
+    'get',
+    'summary',
+    'reset',
+]
@@ -0,0 +1,254 @@
+"""
+PyFAEST - Compact wire format for keys and signatures
+
+Each record is a one-byte tag followed by the payload. The tag carries the
+parameter set as its faest_paramid_t value (see include/instances.h) and
+the record kind, so records can be stored and routed without passing the
+parameter set separately:
+
+    bits 0-3  faest_paramid_t (1-12)
+    bits 4-6  kind: 1 = public key, 2 = private key, 3 = signature
+    bit 7     a LEB128 varint payload length follows the tag
+
+Payloads of the parameter set's fixed size are written without a length.
+Only signatures may carry a length, for payloads shorter than sig_size.
+
+decode_many() parses a buffer of concatenated records into Record tuples
+whose payloads are memoryview slices of the buffer, without copying. A
+buffer of fixed-size records of one kind and parameter set is split with a
+single strided comparison of the tag bytes instead of a per-record parse.
+
+Example:
+    >>> from faest import wire
+    >>>
+    >>> blob = wire.encode_many(signatures, param_set='128f')
+    >>> for record in wire.decode_many(blob):
+    ...     record.param_set, record.payload
+"""
+
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .core import PARAMETER_SETS, PrivateKey, PublicKey
+
+PUBLIC_KEY = 1
+PRIVATE_KEY = 2
+SIGNATURE = 3
+
+_KIND_NAMES = {PUBLIC_KEY: 'public key', PRIVATE_KEY: 'private key', SIGNATURE: 'signature'}
+_SIZE_FIELDS = {PUBLIC_KEY: 'pk_size', PRIVATE_KEY: 'sk_size', SIGNATURE: 'sig_size'}
+_LENGTH_FLAG = 0x80
+_PARAM_SETS_BY_ID = {params['param_id']: name for name, params in PARAMETER_SETS.items()}
+
+# tag -> (kind, param_set, fixed payload size) for every valid tag without a length
+_TAGS = {
+    (kind << 4) | params['param_id']: (kind, name, params[field])
+    for kind, field in _SIZE_FIELDS.items()
+    for name, params in PARAMETER_SETS.items()
+}
+
+
+class Record(NamedTuple):
+    """A decoded record; payload is a view into the decoded buffer"""
+
+    kind: int
+    param_set: str
+    payload: memoryview
+
+    def value(self) -> Union[PublicKey, PrivateKey, bytes]:
+        """
+        Copy the payload into a key object, or bytes for a signature.
+        """
+        if self.kind == PUBLIC_KEY:
+            return PublicKey(bytes(self.payload), self.param_set)
+        if self.kind == PRIVATE_KEY:
+            return PrivateKey(bytes(self.payload), self.param_set)
+        return bytes(self.payload)
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _read_varint(data: memoryview, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Truncated record length")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+        if shift > 63:
+            raise ValueError("Record length too large")
+
+
+def _tag_and_payload(item, param_set: Optional[str]) -> Tuple[int, bytes]:
+    if isinstance(item, PublicKey):
+        kind, payload, param_set = PUBLIC_KEY, item.to_bytes(), item.param_set
+    elif isinstance(item, PrivateKey):
+        kind, payload, param_set = PRIVATE_KEY, item.to_bytes(), item.param_set
+    elif isinstance(item, bytes):
+        if param_set is None:
+            raise ValueError("param_set is required to encode a signature")
+        if param_set not in PARAMETER_SETS:
+            raise ValueError(f"Invalid parameter set: {param_set}")
+        kind, payload = SIGNATURE, item
+    else:
+        raise TypeError("Expected a PublicKey, PrivateKey or signature bytes")
+
+    params = PARAMETER_SETS[param_set]
+    tag = (kind << 4) | params['param_id']
+    size = params[_SIZE_FIELDS[kind]]
+    if len(payload) == size:
+        return tag, payload
+    if kind != SIGNATURE or len(payload) > size:
+        raise ValueError(
+            f"Invalid {_KIND_NAMES[kind]} size: expected {size}, got {len(payload)}"
+        )
+    return tag | _LENGTH_FLAG, _varint(len(payload)) + payload
+
+
+def encode(item: Union[PublicKey, PrivateKey, bytes], param_set: Optional[str] = None) -> bytes:
+    """
+    Encode a key or signature as a tagged record.
+
+    Args:
+        item: A PublicKey, PrivateKey, or a signature as bytes
+        param_set: Parameter set of a signature (ignored for keys)
+
+    Returns:
+        The encoded record
+
+    Raises:
+        TypeError: If item is not a key or bytes
+        ValueError: If param_set is missing or the payload has the wrong size
+    """
+    tag, payload = _tag_and_payload(item, param_set)
+    return bytes((tag,)) + payload
+
+
+def encode_many(items: Iterable[Union[PublicKey, PrivateKey, bytes]],
+                param_set: Optional[str] = None) -> bytes:
+    """
+    Encode keys and signatures as one buffer of concatenated records.
+
+    Args:
+        items: PublicKeys, PrivateKeys or signatures (as bytes)
+        param_set: Parameter set of the signatures (ignored for keys)
+
+    Returns:
+        The encoded buffer
+
+    Raises:
+        TypeError: If an item is not a key or bytes
+        ValueError: If param_set is missing or a payload has the wrong size
+    """
+    parts = []
+    for item in items:
+        tag, payload = _tag_and_payload(item, param_set)
+        parts.append(bytes((tag,)))
+        parts.append(payload)
+    return b''.join(parts)
+
+
+def _decode_one(data: memoryview, pos: int) -> Tuple[Record, int]:
+    tag = data[pos]
+    flagged = tag & _LENGTH_FLAG
+    entry = _TAGS.get(tag & ~_LENGTH_FLAG)
+    if entry is None:
+        raise ValueError(f"Invalid record tag 0x{tag:02x} at offset {pos}")
+    kind, param_set, size = entry
+    pos += 1
+    if flagged:
+        if kind != SIGNATURE:
+            raise ValueError(f"Unexpected length in {_KIND_NAMES[kind]} record at offset {pos - 1}")
+        length, pos = _read_varint(data, pos)
+        if length > size:
+            raise ValueError(f"Invalid signature size: expected at most {size}, got {length}")
+        size = length
+    if pos + size > len(data):
+        raise ValueError(f"Truncated {_KIND_NAMES[kind]} record at offset {pos - 1}")
+    return Record(kind, param_set, data[pos:pos + size]), pos + size
+
+
+def decode(data: Union[bytes, bytearray, memoryview]) -> Record:
+    """
+    Decode a single record.
+
+    Raises:
+        ValueError: If the data is not exactly one valid record
+    """
+    view = memoryview(data).cast('B')
+    if not view:
+        raise ValueError("Empty record")
+    record, end = _decode_one(view, 0)
+    if end != len(view):
+        raise ValueError(f"Trailing data after record ({len(view) - end} bytes)")
+    return record
+
+
+def decode_many(data: Union[bytes, bytearray, memoryview],
+                kind: Optional[int] = None) -> List[Record]:
+    """
+    Decode a buffer of concatenated records without copying payloads.
+
+    The returned payload views keep the buffer alive; a mutable buffer
+    must not be changed while they are in use.
+
+    Args:
+        data: Buffer of records, e.g. from encode_many()
+        kind: If given, require every record to be of this kind
+
+    Returns:
+        List of Records in buffer order
+
+    Raises:
+        ValueError: If the buffer contains an invalid or truncated record,
+                    or a record of another kind
+    """
+    view = memoryview(data).cast('B')
+    total = len(view)
+    if total == 0:
+        return []
+
+    # Fast path: fixed-size records of one tag
+    entry = _TAGS.get(view[0])
+    if entry is not None:
+        stride = entry[2] + 1
+        count, rest = divmod(total, stride)
+        if not rest and view[::stride] == bytes((view[0],)) * count:
+            if kind is not None and entry[0] != kind:
+                raise ValueError(f"Expected {_KIND_NAMES.get(kind, kind)} records, "
+                                 f"got {_KIND_NAMES[entry[0]]}")
+            return [Record(entry[0], entry[1], view[pos + 1:pos + stride])
+                    for pos in range(0, total, stride)]
+
+    records = []
+    pos = 0
+    while pos < total:
+        record, pos = _decode_one(view, pos)
+        if kind is not None and record.kind != kind:
+            raise ValueError(f"Expected {_KIND_NAMES.get(kind, kind)} records, "
+                             f"got {_KIND_NAMES[record.kind]}")
+        records.append(record)
+    return records
+
+
+__all__ = [
+    'PUBLIC_KEY',
+    'PRIVATE_KEY',
+    'SIGNATURE',
+    'Record',
+    'encode',
+    'encode_many',
+    'decode',
+    'decode_many',
+]
@@ -30,6 +30,13 @@ ffibuilder.cdef("""
     int faest_128f_validate_keypair(const uint8_t* pk, const uint8_t* sk);
     void faest_128f_clear_private_key(uint8_t* key);
 
+    typedef struct { uint8_t owf_input[...]; uint8_t owf_output[...]; ...; } faest_128f_unpacked_private_key_t;
+    int faest_128f_unpack_private_key(faest_128f_unpacked_private_key_t* unpacked_sk, const uint8_t* sk);
+    int faest_128f_unpacked_sign(const faest_128f_unpacked_private_key_t* unpacked_sk,
+                                 const uint8_t* message, size_t message_len,
+                                 uint8_t* signature, size_t* signature_len);
+    void faest_128f_clear_unpacked_private_key(faest_128f_unpacked_private_key_t* unpacked_sk);
+
     /* FAEST-128S Parameter Set */
     #define FAEST_128S_PUBLIC_KEY_SIZE 32
     #define FAEST_128S_PRIVATE_KEY_SIZE 32
@@ -43,6 +50,13 @@ ffibuilder.cdef("""
     int faest_128s_validate_keypair(const uint8_t* pk, const uint8_t* sk);
     void faest_128s_clear_private_key(uint8_t* key);
 
+    typedef struct { uint8_t owf_input[...]; uint8_t owf_output[...]; ...; } faest_128s_unpacked_private_key_t;
+    int faest_128s_unpack_private_key(faest_128s_unpacked_private_key_t* unpacked_sk, const uint8_t* sk);
+    int faest_128s_unpacked_sign(const faest_128s_unpacked_private_key_t* unpacked_sk,
+                                 const uint8_t* message, size_t message_len,
+                                 uint8_t* signature, size_t* signature_len);
+    void faest_128s_clear_unpacked_private_key(faest_128s_unpacked_private_key_t* unpacked_sk);
+
     /* FAEST-192F Parameter Set */
     #define FAEST_192F_PUBLIC_KEY_SIZE 48
     #define FAEST_192F_PRIVATE_KEY_SIZE 40
@@ -56,6 +70,13 @@ ffibuilder.cdef("""
     int faest_192f_validate_keypair(const uint8_t* pk, const uint8_t* sk);
     void faest_192f_clear_private_key(uint8_t* key);
 
+    typedef struct { uint8_t owf_input[...]; uint8_t owf_output[...]; ...; } faest_192f_unpacked_private_key_t;
+    int faest_192f_unpack_private_key(faest_192f_unpacked_private_key_t* unpacked_sk, const uint8_t* sk);
+    int faest_192f_unpacked_sign(const faest_192f_unpacked_private_key_t* unpacked_sk,
+                                 const uint8_t* message, size_t message_len,
+                                 uint8_t* signature, size_t* signature_len);
+    void faest_192f_clear_unpacked_private_key(faest_192f_unpacked_private_key_t* unpacked_sk);
+
     /* FAEST-192S Parameter Set */
     #define FAEST_192S_PUBLIC_KEY_SIZE 48
     #define FAEST_192S_PRIVATE_KEY_SIZE 40
@@ -69,6 +90,13 @@ ffibuilder.cdef("""
     int faest_192s_validate_keypair(const uint8_t* pk, const uint8_t* sk);
     void faest_192s_clear_private_key(uint8_t* key);
 
+    typedef struct { uint8_t owf_input[...]; uint8_t owf_output[...]; ...; } faest_192s_unpacked_private_key_t;
+    int faest_192s_unpack_private_key(faest_192s_unpacked_private_key_t* unpacked_sk, const uint8_t* sk);
+    int faest_192s_unpacked_sign(const faest_192s_unpacked_private_key_t* unpacked_sk,
+                                 const uint8_t* message, size_t message_len,
+                                 uint8_t* signature, size_t* signature_len);
+    void faest_192s_clear_unpacked_private_key(faest_192s_unpacked_private_key_t* unpacked_sk);
+
     /* FAEST-256F Parameter Set */
     #define FAEST_256F_PUBLIC_KEY_SIZE 48
     #define FAEST_256F_PRIVATE_KEY_SIZE 48
@@ -82,6 +110,13 @@ ffibuilder.cdef("""
     int faest_256f_validate_keypair(const uint8_t* pk, const uint8_t* sk);
     void faest_256f_clear_private_key(uint8_t* key);
 
+    typedef struct { uint8_t owf_input[...]; uint8_t owf_output[...]; ...; } faest_256f_unpacked_private_key_t;
+    int faest_256f_unpack_private_key(faest_256f_unpacked_private_key_t* unpacked_sk, const uint8_t* sk);
+    int faest_256f_unpacked_sign(const faest_256f_unpacked_private_key_t* unpacked_sk,
+                                 const uint8_t* message, size_t message_len,
+                                 uint8_t* signature, size_t* signature_len);
+    void faest_256f_clear_unpacked_private_key(faest_256f_unpacked_private_key_t* unpacked_sk);
+
     /* FAEST-256S Parameter Set */
     #define FAEST_256S_PUBLIC_KEY_SIZE 48
     #define FAEST_256S_PRIVATE_KEY_SIZE 48
@@ -95,6 +130,13 @@ ffibuilder.cdef("""
     int faest_256s_validate_keypair(const uint8_t* pk, const uint8_t* sk);
     void faest_256s_clear_private_key(uint8_t* key);
 
+    typedef struct { uint8_t owf_input[...]; uint8_t owf_output[...]; ...; } faest_256s_unpacked_private_key_t;
+    int faest_256s_unpack_private_key(faest_256s_unpacked_private_key_t* unpacked_sk, const uint8_t* sk);
+    int faest_256s_unpacked_sign(const faest_256s_unpacked_private_key_t* unpacked_sk,
+                                 const uint8_t* message, size_t message_len,
+                                 uint8_t* signature, size_t* signature_len);
+    void faest_256s_clear_unpacked_private_key(faest_256s_unpacked_private_key_t* unpacked_sk);
+
     /* EM (Extended Mode) Parameter Sets */
 
     /* FAEST-EM-128F */
@@ -110,6 +152,13 @@ ffibuilder.cdef("""
     int faest_em_128f_validate_keypair(const uint8_t* pk, const uint8_t* sk);
     void faest_em_128f_clear_private_key(uint8_t* key);
 
+    typedef struct { uint8_t owf_input[...]; uint8_t owf_output[...]; ...; } faest_em_128f_unpacked_private_key_t;
+    int faest_em_128f_unpack_private_key(faest_em_128f_unpacked_private_key_t* unpacked_sk, const uint8_t* sk);
+    int faest_em_128f_unpacked_sign(const faest_em_128f_unpacked_private_key_t* unpacked_sk,
+                                    const uint8_t* message, size_t message_len,
+                                    uint8_t* signature, size_t* signature_len);
+    void faest_em_128f_clear_unpacked_private_key(faest_em_128f_unpacked_private_key_t* unpacked_sk);
+
     /* FAEST-EM-128S */
     #define FAEST_EM_128S_PUBLIC_KEY_SIZE 32
     #define FAEST_EM_128S_PRIVATE_KEY_SIZE 32
@@ -123,6 +172,13 @@ ffibuilder.cdef("""
     int faest_em_128s_validate_keypair(const uint8_t* pk, const uint8_t* sk);
     void faest_em_128s_clear_private_key(uint8_t* key);
 
+    typedef struct { uint8_t owf_input[...]; uint8_t owf_output[...]; ...; } faest_em_128s_unpacked_private_key_t;
+    int faest_em_128s_unpack_private_key(faest_em_128s_unpacked_private_key_t* unpacked_sk, const uint8_t* sk);
+    int faest_em_128s_unpacked_sign(const faest_em_128s_unpacked_private_key_t* unpacked_sk,
+                                    const uint8_t* message, size_t message_len,
+                                    uint8_t* signature, size_t* signature_len);
+    void faest_em_128s_clear_unpacked_private_key(faest_em_128s_unpacked_private_key_t* unpacked_sk);
+
     /* FAEST-EM-192F */
     #define FAEST_EM_192F_PUBLIC_KEY_SIZE 48
     #define FAEST_EM_192F_PRIVATE_KEY_SIZE 48
@@ -136,6 +192,13 @@ ffibuilder.cdef("""
     int faest_em_192f_validate_keypair(const uint8_t* pk, const uint8_t* sk);
     void faest_em_192f_clear_private_key(uint8_t* key);
 
+    typedef struct { uint8_t owf_input[...]; uint8_t owf_output[...]; ...; } faest_em_192f_unpacked_private_key_t;
+    int faest_em_192f_unpack_private_key(faest_em_192f_unpacked_private_key_t* unpacked_sk, const uint8_t* sk);
+    int faest_em_192f_unpacked_sign(const faest_em_192f_unpacked_private_key_t* unpacked_sk,
+                                    const uint8_t* message, size_t message_len,
+                                    uint8_t* signature, size_t* signature_len);
+    void faest_em_192f_clear_unpacked_private_key(faest_em_192f_unpacked_private_key_t* unpacked_sk);
+
     /* FAEST-EM-192S */
     #define FAEST_EM_192S_PUBLIC_KEY_SIZE 48
     #define FAEST_EM_192S_PRIVATE_KEY_SIZE 48
@@ -149,6 +212,13 @@ ffibuilder.cdef("""
     int faest_em_192s_validate_keypair(const uint8_t* pk, const uint8_t* sk);
     void faest_em_192s_clear_private_key(uint8_t* key);
 
+    typedef struct { uint8_t owf_input[...]; uint8_t owf_output[...]; ...; } faest_em_192s_unpacked_private_key_t;
+    int faest_em_192s_unpack_private_key(faest_em_192s_unpacked_private_key_t* unpacked_sk, const uint8_t* sk);
+    int faest_em_192s_unpacked_sign(const faest_em_192s_unpacked_private_key_t* unpacked_sk,
+                                    const uint8_t* message, size_t message_len,
+                                    uint8_t* signature, size_t* signature_len);
+    void faest_em_192s_clear_unpacked_private_key(faest_em_192s_unpacked_private_key_t* unpacked_sk);
+
     /* FAEST-EM-256F */
     #define FAEST_EM_256F_PUBLIC_KEY_SIZE 64
     #define FAEST_EM_256F_PRIVATE_KEY_SIZE 64
@@ -162,6 +232,13 @@ ffibuilder.cdef("""
     int faest_em_256f_validate_keypair(const uint8_t* pk, const uint8_t* sk);
     void faest_em_256f_clear_private_key(uint8_t* key);
 
+    typedef struct { uint8_t owf_input[...]; uint8_t owf_output[...]; ...; } faest_em_256f_unpacked_private_key_t;
+    int faest_em_256f_unpack_private_key(faest_em_256f_unpacked_private_key_t* unpacked_sk, const uint8_t* sk);
+    int faest_em_256f_unpacked_sign(const faest_em_256f_unpacked_private_key_t* unpacked_sk,
+                                    const uint8_t* message, size_t message_len,
+                                    uint8_t* signature, size_t* signature_len);
+    void faest_em_256f_clear_unpacked_private_key(faest_em_256f_unpacked_private_key_t* unpacked_sk);
+
     /* FAEST-EM-256S */
     #define FAEST_EM_256S_PUBLIC_KEY_SIZE 64
     #define FAEST_EM_256S_PRIVATE_KEY_SIZE 64
@@ -174,6 +251,85 @@ ffibuilder.cdef("""
                              const uint8_t* signature, size_t signature_len);
     int faest_em_256s_validate_keypair(const uint8_t* pk, const uint8_t* sk);
     void faest_em_256s_clear_private_key(uint8_t* key);
+
+    typedef struct { uint8_t owf_input[...]; uint8_t owf_output[...]; ...; } faest_em_256s_unpacked_private_key_t;
+    int faest_em_256s_unpack_private_key(faest_em_256s_unpacked_private_key_t* unpacked_sk, const uint8_t* sk);
+    int faest_em_256s_unpacked_sign(const faest_em_256s_unpacked_private_key_t* unpacked_sk,
+                                    const uint8_t* message, size_t message_len,
+                                    uint8_t* signature, size_t* signature_len);
+    void faest_em_256s_clear_unpacked_private_key(faest_em_256s_unpacked_private_key_t* unpacked_sk);
+
+    /* Batch helpers (implemented in the extension module, see set_source below) */
+    typedef int (*pyfaest_sign_fn)(const void* sk, const uint8_t* message, size_t message_len,
+                                   uint8_t* signature, size_t* signature_len);
+    typedef int (*pyfaest_verify_fn)(const uint8_t* pk, const uint8_t* message, size_t message_len,
+                                     const uint8_t* signature, size_t signature_len);
+
+    void pyfaest_sign_batch(pyfaest_sign_fn sign_fn, const void* sk,
+                            const uint8_t* data, const size_t* offsets, const size_t* lengths,
+                            size_t count, uint8_t* signatures, size_t signature_size,
+                            size_t* signature_lens, int* results);
+    void pyfaest_verify_batch(pyfaest_verify_fn verify_fn, const uint8_t* pks, size_t pk_stride,
+                              const uint8_t* data, const size_t* offsets, const size_t* lengths,
+                              const uint8_t* signatures, const size_t* sig_offsets,
+                              const size_t* sig_lens, size_t count, int* results);
+
+    /*
+     * Public key derivation: unpack each private key into `unpacked` and
+     * copy out owf_input || owf_output, which is the public key. Unpacking
+     * does not reject invalid keys, so each result is checked with
+     * validate_keypair.
+     */
+    typedef int (*pyfaest_unpack_fn)(void* unpacked_sk, const uint8_t* sk);
+    typedef void (*pyfaest_clear_unpacked_fn)(void* unpacked_sk);
+    typedef int (*pyfaest_validate_fn)(const uint8_t* pk, const uint8_t* sk);
+
+    void pyfaest_derive_batch(pyfaest_unpack_fn unpack_fn, pyfaest_clear_unpacked_fn clear_fn,
+                              pyfaest_validate_fn validate_fn,
+                              void* unpacked, size_t input_offset, size_t input_size,
+                              size_t output_offset, size_t output_size,
+                              const uint8_t* sks, size_t sk_size, size_t count,
+                              uint8_t* pks, int* results);
+
+    /*
+     * Faster derivation when libfaest is linked statically: compute only
+     * the OWF (pyfaest_owf returns NULL for shared builds). A private key
+     * is owf_input || owf_key.
+     */
+    typedef void (*pyfaest_owf_fn)(const uint8_t* key, const uint8_t* input, uint8_t* output);
+
+    pyfaest_owf_fn pyfaest_owf(int param_id);
+
+    /* Keypair validation: sets bit i of `failures` (LSB first) if pair i is invalid */
+    void pyfaest_validate_batch(pyfaest_validate_fn validate_fn, const uint8_t* pks, size_t pk_size,
+                                const uint8_t* sks, size_t sk_size, size_t count, uint8_t* failures);
+    void pyfaest_owf_derive_batch(pyfaest_owf_fn owf_fn, pyfaest_validate_fn validate_fn,
+                                  size_t input_size, size_t key_size, size_t output_size,
+                                  const uint8_t* sks, size_t count, uint8_t* pks, int* results);
+
+    /*
+     * SHAKE over many messages (SHAKE128 if security_param is 128, else
+     * SHAKE256), prefix || message -> digests + i * digest_size. Returns 0
+     * without hashing if libfaest's Keccak is not linked in (shared builds).
+     */
+    int pyfaest_shake_batch(unsigned int security_param, const uint8_t* prefix, size_t prefix_len,
+                            const uint8_t* data, const size_t* offsets, const size_t* lengths,
+                            size_t count, uint8_t* digests, size_t digest_size);
+
+    /* Cycle clock: TSC on x86, cntvct on arm64, nanoseconds elsewhere */
+    uint64_t pyfaest_clock(void);
+    const char* pyfaest_clock_name(void);
+
+    /* Build profile and phase counters (see BUILD_PROFILES below) */
+    #define PYFAEST_PARAM_SLOTS 13
+
+    const char* pyfaest_build_profile(void);
+    const char* pyfaest_build_flags(void);
+    int pyfaest_phase_count(void);
+    const char* pyfaest_phase_name(int phase);
+    const char* pyfaest_phase_clock(void);
+    void pyfaest_phase_snapshot(uint64_t* cycles, uint64_t* calls);
+    void pyfaest_phase_reset(void);
 """)
 
 # Note: When running sdist, cffi_modules is empty so this script won't be executed
@@ -455,6 +611,477 @@ if archflags:
     extra_link_args.extend(archflags.split())
     print(f"Cross-compile: Using ARCHFLAGS = {archflags}")
 
+# Build profiles, selected with FAEST_BUILD_PROFILE:
+#   release - link against the bundled or prebuilt libfaest (default)
+#   phases  - build faest-ref as a static library and link it with timing
+#             wrappers around its internal phases (Linux/GNU ld only). The
+#             counters are read with faest.profile.phase_stats().
+#   native  - build faest-ref and the extension for the build host only
+#             (-march=native, LTO). With FAEST_PGO=1, libfaest is first
+#             built instrumented, trained on a sign/verify workload and
+#             rebuilt with the recorded profile.
+#   static  - compile faest-ref into the extension itself: one module with
+#             no libfaest.so to load, and LTO across the cffi wrappers and
+#             the library (Linux and macOS).
+BUILD_PROFILES = ('release', 'phases', 'native', 'static')
+
+build_profile = os.environ.get('FAEST_BUILD_PROFILE', 'release').lower()
+if build_profile not in BUILD_PROFILES:
+    print(f"ERROR: Unknown FAEST_BUILD_PROFILE '{build_profile}' "
+          f"(expected one of: {', '.join(BUILD_PROFILES)})", file=sys.stderr)
+    sys.exit(1)
+print(f"Build profile: {build_profile}")
+
+# Instrumented phases: (phase, return type, function, parameters). Calls made
+# from another translation unit are redirected to __wrap_<function> by
+# `ld --wrap`; phases nest, and a phase's time includes its callees.
+PHASE_HOOKS = [
+    ('vole_commit', 'void', 'vole_commit',
+     'const uint8_t* rootKey, const uint8_t* iv, unsigned int ellhat, const faest_paramset_t* params, '
+     'bavc_t* vecCom, uint8_t* c, uint8_t* u, uint8_t** v'),
+    ('bavc_commit', 'void', 'bavc_commit',
+     'bavc_t* bavc, const uint8_t* root_key, const uint8_t* iv, const faest_paramset_t* params'),
+    ('bavc_open', 'bool', 'bavc_open',
+     'uint8_t* decom_i, const bavc_t* vc, const uint16_t* i_delta, const faest_paramset_t* params'),
+    ('vole_reconstruct', 'bool', 'vole_reconstruct',
+     'uint8_t* com, uint8_t** q, const uint8_t* iv, const uint8_t* chall_3, const uint8_t* decom_i, '
+     'const uint8_t* c, unsigned int ellhat, const faest_paramset_t* params'),
+    ('bavc_reconstruct', 'bool', 'bavc_reconstruct',
+     'bavc_rec_t* bavc_rec, const uint8_t* decom_i, const uint16_t* i_delta, const uint8_t* iv, '
+     'const faest_paramset_t* params'),
+    ('vole_hash', 'void', 'vole_hash',
+     'uint8_t* h, const uint8_t* sd, const uint8_t* x, unsigned int ell, uint32_t lambda'),
+]
+for _bits in (128, 192, 256):
+    PHASE_HOOKS += [
+        ('vole_hash', 'void', f'vole_hash_{_bits}',
+         'uint8_t* h, const uint8_t* sd, const uint8_t* x, unsigned int ell'),
+        ('zk_hash', 'void', f'zk_hash_{_bits}_update', f'zk_hash_{_bits}_ctx* ctx, bf{_bits}_t v'),
+        ('zk_hash', 'void', f'zk_hash_{_bits}_finalize',
+         f'uint8_t* h, zk_hash_{_bits}_ctx* ctx, bf{_bits}_t x1'),
+        ('zk_hash', 'void', f'zk_hash_{_bits}_3_update',
+         f'zk_hash_{_bits}_3_ctx* ctx, bf{_bits}_t v_0, bf{_bits}_t v_1, bf{_bits}_t v_2'),
+        ('zk_hash', 'void', f'zk_hash_{_bits}_3_raise_and_update',
+         f'zk_hash_{_bits}_3_ctx* ctx, bf{_bits}_t v_1, bf{_bits}_t v_2'),
+        ('zk_hash', 'void', f'zk_hash_{_bits}_3_finalize',
+         f'uint8_t* h_0, uint8_t* h_1, uint8_t* h_2, zk_hash_{_bits}_3_ctx* ctx, '
+         f'bf{_bits}_t x1_0, bf{_bits}_t x1_1, bf{_bits}_t x1_2'),
+        ('owf_prove', 'void', f'aes_{_bits}_prover',
+         'uint8_t* a0_tilde, uint8_t* a1_tilde, uint8_t* a2_tilde, const uint8_t* w, const uint8_t* u, '
+         'uint8_t** V, const uint8_t* owf_in, const uint8_t* owf_out, const uint8_t* chall_2, '
+         'const faest_paramset_t* params'),
+        ('owf_verify', 'void', f'aes_{_bits}_verifier',
+         'uint8_t* a0_tilde, const uint8_t* d, uint8_t** Q, const uint8_t* owf_in, '
+         'const uint8_t* owf_out, const uint8_t* chall_2, const uint8_t* chall_3, '
+         'const uint8_t* a1_tilde, const uint8_t* a2_tilde, const faest_paramset_t* params'),
+    ]
+
+# Public entry points per faest_paramid_t (instances.h); these set the
+# parameter set that internal phases are charged to.
+PHASE_PARAM_IDS = {
+    '128s': 1, '128f': 2, '192s': 3, '192f': 4, '256s': 5, '256f': 6,
+    'em_128s': 7, 'em_128f': 8, 'em_192s': 9, 'em_192f': 10, 'em_256s': 11, 'em_256f': 12,
+}
+PHASE_ENTRY_POINTS = [
+    ('sign', 'sign',
+     'const uint8_t* sk, const uint8_t* message, size_t message_len, uint8_t* signature, '
+     'size_t* signature_len'),
+    ('sign', 'unpacked_sign',
+     'const {prefix}_unpacked_private_key_t* unpacked_sk, const uint8_t* message, size_t message_len, '
+     'uint8_t* signature, size_t* signature_len'),
+    ('verify', 'verify',
+     'const uint8_t* pk, const uint8_t* message, size_t message_len, const uint8_t* signature, '
+     'size_t signature_len'),
+]
+
+
+def _argument_names(parameters):
+    """Extract the argument names from a C parameter list"""
+    return ', '.join(p.split()[-1].lstrip('*') for p in parameters.split(','))
+
+
+def phase_profile_source():
+    """Generate the C source for the 'phases' build profile"""
+    phases = ['sign', 'verify']
+    for phase, _, _, _ in PHASE_HOOKS:
+        if phase not in phases:
+            phases.append(phase)
+    index = {phase: i for i, phase in enumerate(phases)}
+
+    lines = [
+        '#include "vole.h"',
+        '#include "universal_hashing.h"',
+        '#include "faest_aes.h"',
+        '',
+        f'#define PYFAEST_PHASES {len(phases)}',
+        'static const char* const pyfaest_phase_names[PYFAEST_PHASES] = {',
+        '    ' + ', '.join(f'"{phase}"' for phase in phases),
+        '};',
+        'static uint64_t pyfaest_cycles[PYFAEST_PARAM_SLOTS][PYFAEST_PHASES];',
+        'static uint64_t pyfaest_calls[PYFAEST_PARAM_SLOTS][PYFAEST_PHASES];',
+        'static __thread int pyfaest_param;',
+        'static __thread unsigned int pyfaest_depth[PYFAEST_PHASES];',
+        '',
+        '/* Only the outermost call of a phase on each thread is timed */',
+        '#define PYFAEST_ENTER(phase) \\',
+        '    const int pyfaest_outer = pyfaest_depth[phase]++ == 0; \\',
+        '    const uint64_t pyfaest_start = pyfaest_outer ? pyfaest_clock() : 0',
+        '#define PYFAEST_LEAVE(phase) \\',
+        '    pyfaest_depth[phase]--; \\',
+        '    if (pyfaest_outer) { \\',
+        '        __atomic_fetch_add(&pyfaest_cycles[pyfaest_param][phase], \\',
+        '                           pyfaest_clock() - pyfaest_start, __ATOMIC_RELAXED); \\',
+        '        __atomic_fetch_add(&pyfaest_calls[pyfaest_param][phase], 1, __ATOMIC_RELAXED); \\',
+        '    }',
+        '',
+        'static const char* pyfaest_phase_clock(void) { return pyfaest_clock_name(); }',
+        'static int pyfaest_phase_count(void) { return PYFAEST_PHASES; }',
+        'static const char* pyfaest_phase_name(int phase) {',
+        '    return phase >= 0 && phase < PYFAEST_PHASES ? pyfaest_phase_names[phase] : NULL;',
+        '}',
+        'static void pyfaest_phase_snapshot(uint64_t* cycles, uint64_t* calls) {',
+        '    for (int p = 0; p < PYFAEST_PARAM_SLOTS; ++p) {',
+        '        for (int i = 0; i < PYFAEST_PHASES; ++i) {',
+        '            cycles[p * PYFAEST_PHASES + i] = __atomic_load_n(&pyfaest_cycles[p][i], __ATOMIC_RELAXED);',
+        '            calls[p * PYFAEST_PHASES + i] = __atomic_load_n(&pyfaest_calls[p][i], __ATOMIC_RELAXED);',
+        '        }',
+        '    }',
+        '}',
+        'static void pyfaest_phase_reset(void) {',
+        '    for (int p = 0; p < PYFAEST_PARAM_SLOTS; ++p) {',
+        '        for (int i = 0; i < PYFAEST_PHASES; ++i) {',
+        '            __atomic_store_n(&pyfaest_cycles[p][i], 0, __ATOMIC_RELAXED);',
+        '            __atomic_store_n(&pyfaest_calls[p][i], 0, __ATOMIC_RELAXED);',
+        '        }',
+        '    }',
+        '}',
+        '',
+    ]
+
+    def wrapper(phase, ret, func, parameters, param_id=None):
+        call = f'__real_{func}({_argument_names(parameters)})'
+        body = [f'    PYFAEST_ENTER({index[phase]});']
+        if param_id is not None:
+            body = [f'    const int saved_param = pyfaest_param;',
+                    f'    pyfaest_param = {param_id};'] + body
+        if ret == 'void':
+            body.append(f'    {call};')
+        else:
+            body.append(f'    {ret} ret = {call};')
+        body.append(f'    PYFAEST_LEAVE({index[phase]});')
+        if param_id is not None:
+            body.append('    pyfaest_param = saved_param;')
+        if ret != 'void':
+            body.append('    return ret;')
+        return [f'{ret} __real_{func}({parameters});',
+                f'{ret} __wrap_{func}({parameters});',
+                f'{ret} __wrap_{func}({parameters}) {{'] + body + ['}', '']
+
+    wrapped = []
+    for phase, ret, func, parameters in PHASE_HOOKS:
+        lines += wrapper(phase, ret, func, parameters)
+        wrapped.append(func)
+    for name, param_id in PHASE_PARAM_IDS.items():
+        prefix = f'faest_{name}'
+        for phase, suffix, parameters in PHASE_ENTRY_POINTS:
+            func = f'{prefix}_{suffix}'
+            lines += wrapper(phase, 'int', func, parameters.format(prefix=prefix), param_id)
+            wrapped.append(func)
+    return '\n'.join(lines), wrapped
+
+
+def find_meson(profile):
+    """Locate meson for a profile that builds faest-ref itself"""
+    import shutil
+    meson = shutil.which('meson')
+    if meson is None:
+        print(f"ERROR: The {profile} build profile needs meson and ninja "
+              "(pip install meson ninja)", file=sys.stderr)
+        sys.exit(1)
+    return meson
+
+
+def faest_source_dir(profile):
+    """Locate the faest-ref checkout for a profile that builds it"""
+    src = os.environ.get('FAEST_SRC_DIR', os.path.join(script_dir, '..', 'faest-ref'))
+    if not os.path.exists(os.path.join(src, 'meson.build')):
+        print(f"ERROR: The {profile} build profile needs a faest-ref source checkout "
+              f"(set FAEST_SRC_DIR, tried {src})", file=sys.stderr)
+        sys.exit(1)
+    return src
+
+
+def build_static_faest(src, lto=False):
+    """
+    Build faest-ref as a static PIC library.
+
+    The phases profile needs plain objects: --wrap only sees calls between
+    object files, so LTO must be off. The static profile keeps LTO objects
+    in the archive and optimizes them together with the extension.
+    """
+    meson = find_meson('static' if lto else 'phases')
+    out = os.path.join(src, 'build-static' if lto else 'build-phases')
+    if not os.path.exists(os.path.join(out, 'build.ninja')):
+        subprocess.run([meson, 'setup', out, '--buildtype=release', '--default-library=static',
+                        f'-Db_lto={str(lto).lower()}', '-Db_staticpic=true'], cwd=src, check=True)
+    subprocess.run([meson, 'compile', '-C', out], cwd=src, check=True)
+    return out
+
+
+def meson_compile_flags(build):
+    """Get the -D and -m flags meson used for the libfaest sources"""
+    import json
+    import shlex
+    try:
+        with open(os.path.join(build, 'compile_commands.json')) as f:
+            commands = json.load(f)
+    except (OSError, ValueError):
+        return []
+    for entry in commands:
+        if os.path.basename(entry.get('file', '')) == 'faest.c':
+            args = entry.get('arguments') or shlex.split(entry.get('command', ''))
+            return [a for a in args if a.startswith(('-D', '-m'))]
+    return []
+
+
+# Messages signed and verified per parameter set by the PGO training run.
+# Sizes follow the workloads of our signing hosts: short tokens, log
+# records and file chunks, signed with packed and unpacked keys. The slow
+# 's' sets take the same code paths, so they only sign the first two.
+PGO_MESSAGE_SIZES = (32, 256, 4096, 65536)
+PGO_SMALL_SET_MESSAGES = 2
+
+
+def pgo_training_source():
+    """Generate the C driver run against an instrumented libfaest"""
+    lines = [
+        '#include <stdio.h>',
+        '#include <stdlib.h>',
+        '#include <string.h>',
+    ]
+    lines += [f'#include "faest_{name}.h"' for name in PHASE_PARAM_IDS]
+    sizes = ', '.join(str(size) for size in PGO_MESSAGE_SIZES)
+    lines += [
+        '',
+        f'static const size_t message_sizes[] = {{{sizes}}};',
+        '',
+        '#define TRAIN(prefix, PREFIX, messages) do { \\',
+        '    uint8_t pk[PREFIX##_PUBLIC_KEY_SIZE], sk[PREFIX##_PRIVATE_KEY_SIZE]; \\',
+        '    static uint8_t signature[PREFIX##_SIGNATURE_SIZE]; \\',
+        '    prefix##_unpacked_private_key_t unpacked; \\',
+        '    failures += prefix##_keygen(pk, sk) != 0; \\',
+        '    failures += prefix##_validate_keypair(pk, sk) != 0; \\',
+        '    failures += prefix##_unpack_private_key(&unpacked, sk) != 0; \\',
+        '    for (int i = 0; i < messages; ++i) { \\',
+        '        size_t signature_len = sizeof(signature); \\',
+        '        if (i % 2) \\',
+        '            failures += prefix##_unpacked_sign(&unpacked, message, message_sizes[i], \\',
+        '                                               signature, &signature_len) != 0; \\',
+        '        else \\',
+        '            failures += prefix##_sign(sk, message, message_sizes[i], signature, &signature_len) != 0; \\',
+        '        failures += prefix##_verify(pk, message, message_sizes[i], signature, signature_len) != 0; \\',
+        '        signature[0] ^= 1; \\',
+        '        failures += prefix##_verify(pk, message, message_sizes[i], signature, signature_len) == 0; \\',
+        '    } \\',
+        '    prefix##_clear_unpacked_private_key(&unpacked); \\',
+        '    prefix##_clear_private_key(sk); \\',
+        '} while (0)',
+        '',
+        'int main(void) {',
+        f'    uint8_t* message = malloc({max(PGO_MESSAGE_SIZES)});',
+        '    int failures = 0;',
+        '    if (message == NULL)',
+        '        return 2;',
+        f'    memset(message, 0x5a, {max(PGO_MESSAGE_SIZES)});',
+    ]
+    for name in PHASE_PARAM_IDS:
+        messages = PGO_SMALL_SET_MESSAGES if name.endswith('s') else len(PGO_MESSAGE_SIZES)
+        lines.append(f'    TRAIN(faest_{name}, FAEST_{name.upper()}, {messages});')
+    lines += [
+        '    free(message);',
+        '    if (failures)',
+        '        fprintf(stderr, "PGO training: %d unexpected results\\n", failures);',
+        '    return failures != 0;',
+        '}',
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+def build_native_faest(src, pgo):
+    """
+    Build faest-ref as a shared library tuned for this host.
+
+    With pgo, the library is built with -fprofile-generate, the training
+    driver from pgo_training_source() is run against it, and the library
+    is rebuilt with -fprofile-use.
+    """
+    meson = find_meson('native')
+    out = os.path.join(src, 'build-native')
+    if not os.path.exists(os.path.join(out, 'build.ninja')):
+        subprocess.run([meson, 'setup', out, '--buildtype=release', '--default-library=shared',
+                        '-Db_lto=true', '-Db_ndebug=true', '-Dc_args=-march=native -mtune=native'],
+                       cwd=src, check=True)
+
+    def compile_with(pgo_mode):
+        subprocess.run([meson, 'configure', out, f'-Db_pgo={pgo_mode}'], cwd=src, check=True)
+        subprocess.run([meson, 'compile', '-C', out], cwd=src, check=True)
+
+    if not pgo:
+        compile_with('off')
+        return out
+
+    import glob
+    import sysconfig
+    # Stale counters from an earlier training run would be merged in
+    for stale in glob.glob(os.path.join(out, '**', '*.gcda'), recursive=True):
+        os.remove(stale)
+    compile_with('generate')
+    driver_source = os.path.join(out, 'pyfaest_pgo_train.c')
+    driver = os.path.join(out, 'pyfaest_pgo_train')
+    with open(driver_source, 'w') as f:
+        f.write(pgo_training_source())
+    cc = (sysconfig.get_config_var('CC') or 'cc').split()
+    subprocess.run(cc + ['-O2', f'-I{out}', f'-I{src}', driver_source, '-o', driver,
+                         f'-L{out}', '-lfaest', f'-Wl,-rpath,{out}'], check=True)
+    print("Running PGO training workload...")
+    subprocess.run([driver], cwd=out, check=True)
+    compile_with('use')
+    return out
+
+
+# Native SHAKE for faest.prehash. libfaest keeps its Keccak symbols local,
+# so this is only possible when libfaest is linked statically; the x4 path
+# hashes runs of four equal-length messages with one 4-way Keccak state.
+NATIVE_SHAKE_SOURCE = """
+        #include "hash_shake.h"
+
+        static int pyfaest_shake_batch(unsigned int security_param, const uint8_t* prefix, size_t prefix_len,
+                                       const uint8_t* data, const size_t* offsets, const size_t* lengths,
+                                       size_t count, uint8_t* digests, size_t digest_size) {
+            size_t i = 0;
+            while (i < count) {
+                if (i + 4 <= count && lengths[i] == lengths[i + 1] && lengths[i] == lengths[i + 2] &&
+                    lengths[i] == lengths[i + 3]) {
+                    hash_context_x4 ctx;
+                    hash_init_x4(&ctx, security_param);
+                    hash_update_x4_1(&ctx, prefix, prefix_len);
+                    hash_update_x4_4(&ctx, data + offsets[i], data + offsets[i + 1], data + offsets[i + 2],
+                                     data + offsets[i + 3], lengths[i]);
+                    hash_final_x4(&ctx);
+                    hash_squeeze_x4_4(&ctx, digests + i * digest_size, digests + (i + 1) * digest_size,
+                                      digests + (i + 2) * digest_size, digests + (i + 3) * digest_size,
+                                      digest_size);
+                    hash_clear_x4(&ctx);
+                    i += 4;
+                } else {
+                    hash_context ctx;
+                    hash_init(&ctx, security_param);
+                    hash_update(&ctx, prefix, prefix_len);
+                    hash_update(&ctx, data + offsets[i], lengths[i]);
+                    hash_final(&ctx);
+                    hash_squeeze(&ctx, digests + i * digest_size, digest_size);
+                    hash_clear(&ctx);
+                    i += 1;
+                }
+            }
+            return 1;
+        }
+"""
+
+# Direct OWF access for public key derivation. Like Keccak, the OWF symbols
+# are local to the shared libfaest, so only static builds provide them.
+NATIVE_OWF_SOURCE = """
+        #include "owf.h"
+
+        static pyfaest_owf_fn pyfaest_owf(int param_id) {
+            switch (param_id) {
+""" + ''.join(f"            case {param_id}: return faest_{name}_owf;\n"
+              for name, param_id in PHASE_PARAM_IDS.items()) + """            default: return NULL;
+            }
+        }
+"""
+
+# Default: the stubs report an uninstrumented library
+PHASE_STUB_SOURCE = """
+        static int pyfaest_phase_count(void) { return 0; }
+        static const char* pyfaest_phase_name(int phase) { (void)phase; return NULL; }
+        static const char* pyfaest_phase_clock(void) { return ""; }
+        static void pyfaest_phase_snapshot(uint64_t* cycles, uint64_t* calls) { (void)cycles; (void)calls; }
+        static void pyfaest_phase_reset(void) {}
+"""
+SHAKE_STUB_SOURCE = """
+        static int pyfaest_shake_batch(unsigned int security_param, const uint8_t* prefix, size_t prefix_len,
+                                       const uint8_t* data, const size_t* offsets, const size_t* lengths,
+                                       size_t count, uint8_t* digests, size_t digest_size) {
+            (void)security_param; (void)prefix; (void)prefix_len; (void)data; (void)offsets;
+            (void)lengths; (void)count; (void)digests; (void)digest_size;
+            return 0;
+        }
+"""
+OWF_STUB_SOURCE = """
+        static pyfaest_owf_fn pyfaest_owf(int param_id) { (void)param_id; return NULL; }
+"""
+profile_source = PHASE_STUB_SOURCE + SHAKE_STUB_SOURCE + OWF_STUB_SOURCE
+libraries = ['faest']
+library_dirs = [build_dir]
+include_dirs = [build_dir, src_dir]
+extra_objects = []
+
+build_flags = []
+
+if build_profile == 'phases':
+    if system != 'linux':
+        print("ERROR: The phases build profile requires Linux (GNU ld --wrap)", file=sys.stderr)
+        sys.exit(1)
+    faest_src = faest_source_dir('phases')
+    phases_build_dir = build_static_faest(faest_src)
+    profile_source, wrapped_functions = phase_profile_source()
+    profile_source += NATIVE_SHAKE_SOURCE + NATIVE_OWF_SOURCE
+    libraries = []
+    library_dirs = []
+    include_dirs = [phases_build_dir, faest_src]
+    extra_objects = [os.path.join(phases_build_dir, 'libfaest.a')]
+    extra_link_args.extend(f'-Wl,--wrap={func}' for func in wrapped_functions)
+    # Match libfaest's defines and target flags: the wrappers pass bf192_t/
+    # bf256_t by value and hash_shake.h picks its Keccak backend by macro
+    extra_compile_args.extend(meson_compile_flags(phases_build_dir))
+    extra_compile_args.append('-Wno-psabi')
+    runtime_lib_dirs = None
+elif build_profile == 'native':
+    if system == 'windows':
+        print("ERROR: The native build profile is not supported on Windows", file=sys.stderr)
+        sys.exit(1)
+    faest_src = faest_source_dir('native')
+    pgo = os.environ.get('FAEST_PGO', '').lower() in ('1', 'true', 'yes', 'on')
+    native_build_dir = build_native_faest(faest_src, pgo)
+    library_dirs = [native_build_dir]
+    include_dirs = [native_build_dir, faest_src]
+    # The tuned library is only valid on this host, so it is never bundled
+    runtime_lib_dirs = [native_build_dir]
+    build_flags = ['-march=native', '-flto'] + (['-fprofile-use'] if pgo else [])
+    extra_compile_args.extend(['-O3', '-march=native', '-mtune=native', '-flto'])
+    extra_link_args.extend(['-O3', '-march=native', '-flto'])
+elif build_profile == 'static':
+    if system not in ('linux', 'darwin'):
+        print("ERROR: The static build profile requires Linux or macOS", file=sys.stderr)
+        sys.exit(1)
+    faest_src = faest_source_dir('static')
+    static_build_dir = build_static_faest(faest_src, lto=True)
+    profile_source = PHASE_STUB_SOURCE + NATIVE_SHAKE_SOURCE + NATIVE_OWF_SOURCE
+    libraries = []
+    library_dirs = []
+    include_dirs = [static_build_dir, faest_src]
+    extra_objects = [os.path.join(static_build_dir, 'libfaest.a')]
+    runtime_lib_dirs = None
+    build_flags = ['-flto']
+    # Same defines and target flags as libfaest, so inlined code matches it
+    extra_compile_args.extend(meson_compile_flags(static_build_dir))
+    extra_compile_args.extend(['-O3', '-flto', '-Wno-psabi'])
+    extra_link_args.extend(['-O3', '-flto'])
+    if system == 'linux':
+        # Keep libfaest's symbols private to the module
+        extra_link_args.append('-Wl,--exclude-libs,ALL')
+
 ffibuilder.set_source(
     "_faest_cffi",  # Name of the generated Python module
     """
@@ -470,11 +1097,123 @@ ffibuilder.set_source(
         #include "faest_em_192s.h"
         #include "faest_em_256f.h"
         #include "faest_em_256s.h"
-    """,
-    libraries=['faest'],  # Link to libfaest.so / libfaest.dll / libfaest.a
-    library_dirs=[build_dir],  # Where to find the library at build time
-    include_dirs=[build_dir, src_dir],  # Where to find the headers (both build and source)
+        #include <string.h>
+
+        /*
+         * Batch helpers: run many sign/verify operations in one call so the
+         * GIL is released once per batch instead of once per message.
+         * Messages live in one arena at data + offsets[i] (lengths[i] bytes).
+         */
+        typedef int (*pyfaest_sign_fn)(const void* sk, const uint8_t* message, size_t message_len,
+                                       uint8_t* signature, size_t* signature_len);
+        typedef int (*pyfaest_verify_fn)(const uint8_t* pk, const uint8_t* message, size_t message_len,
+                                         const uint8_t* signature, size_t signature_len);
+
+        static void pyfaest_sign_batch(pyfaest_sign_fn sign_fn, const void* sk,
+                                       const uint8_t* data, const size_t* offsets, const size_t* lengths,
+                                       size_t count, uint8_t* signatures, size_t signature_size,
+                                       size_t* signature_lens, int* results) {
+            for (size_t i = 0; i < count; ++i) {
+                signature_lens[i] = signature_size;
+                results[i] = sign_fn(sk, data + offsets[i], lengths[i],
+                                     signatures + i * signature_size, &signature_lens[i]);
+            }
+        }
+
+        static void pyfaest_verify_batch(pyfaest_verify_fn verify_fn, const uint8_t* pks, size_t pk_stride,
+                                         const uint8_t* data, const size_t* offsets, const size_t* lengths,
+                                         const uint8_t* signatures, const size_t* sig_offsets,
+                                         const size_t* sig_lens, size_t count, int* results) {
+            for (size_t i = 0; i < count; ++i) {
+                results[i] = verify_fn(pks + i * pk_stride, data + offsets[i], lengths[i],
+                                       signatures + sig_offsets[i], sig_lens[i]);
+            }
+        }
+
+        typedef int (*pyfaest_unpack_fn)(void* unpacked_sk, const uint8_t* sk);
+        typedef void (*pyfaest_clear_unpacked_fn)(void* unpacked_sk);
+        typedef int (*pyfaest_validate_fn)(const uint8_t* pk, const uint8_t* sk);
+
+        static void pyfaest_derive_batch(pyfaest_unpack_fn unpack_fn, pyfaest_clear_unpacked_fn clear_fn,
+                                         pyfaest_validate_fn validate_fn,
+                                         void* unpacked, size_t input_offset, size_t input_size,
+                                         size_t output_offset, size_t output_size,
+                                         const uint8_t* sks, size_t sk_size, size_t count,
+                                         uint8_t* pks, int* results) {
+            const uint8_t* fields = (const uint8_t*)unpacked;
+            for (size_t i = 0; i < count; ++i) {
+                const uint8_t* sk = sks + i * sk_size;
+                uint8_t* pk = pks + i * (input_size + output_size);
+                results[i] = unpack_fn(unpacked, sk);
+                if (results[i] == 0) {
+                    memcpy(pk, fields + input_offset, input_size);
+                    memcpy(pk + input_size, fields + output_offset, output_size);
+                    results[i] = validate_fn(pk, sk);
+                }
+                if (results[i] != 0) {
+                    memset(pk, 0, input_size + output_size);
+                }
+            }
+            clear_fn(unpacked);
+        }
+
+        static void pyfaest_validate_batch(pyfaest_validate_fn validate_fn, const uint8_t* pks, size_t pk_size,
+                                           const uint8_t* sks, size_t sk_size, size_t count, uint8_t* failures) {
+            for (size_t i = 0; i < count; ++i) {
+                if (validate_fn(pks + i * pk_size, sks + i * sk_size) != 0) {
+                    failures[i >> 3] |= (uint8_t)(1u << (i & 7));
+                }
+            }
+        }
+
+        typedef void (*pyfaest_owf_fn)(const uint8_t* key, const uint8_t* input, uint8_t* output);
+
+        static void pyfaest_owf_derive_batch(pyfaest_owf_fn owf_fn, pyfaest_validate_fn validate_fn,
+                                             size_t input_size, size_t key_size, size_t output_size,
+                                             const uint8_t* sks, size_t count, uint8_t* pks, int* results) {
+            for (size_t i = 0; i < count; ++i) {
+                const uint8_t* sk = sks + i * (input_size + key_size);
+                uint8_t* pk = pks + i * (input_size + output_size);
+                memcpy(pk, sk, input_size);
+                owf_fn(sk + input_size, sk, pk + input_size);
+                results[i] = validate_fn(pk, sk);
+                if (results[i] != 0) {
+                    memset(pk, 0, input_size + output_size);
+                }
+            }
+        }
+
+        #if defined(__x86_64__) || defined(__i386__)
+        #include <x86intrin.h>
+        static inline uint64_t pyfaest_clock(void) { return __rdtsc(); }
+        static const char* pyfaest_clock_name(void) { return "tsc"; }
+        #elif defined(__aarch64__)
+        static inline uint64_t pyfaest_clock(void) {
+            uint64_t t;
+            __asm__ volatile("mrs %0, cntvct_el0" : "=r"(t));
+            return t;
+        }
+        static const char* pyfaest_clock_name(void) { return "cntvct"; }
+        #else
+        #include <time.h>
+        static inline uint64_t pyfaest_clock(void) {
+            struct timespec ts;
+            clock_gettime(CLOCK_MONOTONIC, &ts);
+            return (uint64_t)ts.tv_sec * 1000000000u + (uint64_t)ts.tv_nsec;
+        }
+        static const char* pyfaest_clock_name(void) { return "ns"; }
+        #endif
+
+        #define PYFAEST_PARAM_SLOTS 13
+    """ + f"""
+        static const char* pyfaest_build_profile(void) {{ return "{build_profile}"; }}
+        static const char* pyfaest_build_flags(void) {{ return "{' '.join(build_flags)}"; }}
+    """ + profile_source,
+    libraries=libraries,  # Link to libfaest.so / libfaest.dll / libfaest.a
+    library_dirs=library_dirs,  # Where to find the library at build time
+    include_dirs=include_dirs,  # Where to find the headers (both build and source)
     runtime_library_dirs=runtime_lib_dirs,  # Set rpath for runtime library search
+    extra_objects=extra_objects,  # Static libfaest.a for the phases and static profiles
     extra_compile_args=extra_compile_args if extra_compile_args else None,
     extra_link_args=extra_link_args if extra_link_args else None,
 )
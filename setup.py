@@ -89,13 +89,18 @@ setup(
     ],
     python_requires='>=3.7',
     install_requires=[
-        'cffi>=1.15.0',
+        "cffi>=1.15.0; python_version < '3.13'",
+        "cffi>=2.0.0; python_version >= '3.13'",  # GIL-free extension modules
         'setuptools>=60.0.0',  # Required for Python 3.12+ CFFI compilation
     ],
     setup_requires=[
-        'cffi>=1.15.0',
+        "cffi>=1.15.0; python_version < '3.13'",
+        "cffi>=2.0.0; python_version >= '3.13'",
         'setuptools>=60.0.0',
     ],
     cffi_modules=cffi_modules_list,
+    entry_points={
+        'console_scripts': ['faest=faest.cli:main'],
+    },
     zip_safe=False,
 )
@@ -0,0 +1,119 @@
+"""
+Tests for the Apache Arrow column interface
+
+Run with: pytest tests/
+"""
+
+import pytest
+from faest import Keypair, SignatureError, verify, PARAMETER_SETS
+
+pa = pytest.importorskip('pyarrow')
+from faest.arrow import sign_column, verify_column  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def keypair():
+    return Keypair.generate('em_128f')
+
+
+SIG_SIZE = PARAMETER_SETS['em_128f']['sig_size']
+
+
+class TestArrow:
+    """Test signing and verifying binary columns"""
+
+    @pytest.mark.parametrize('typ', [pa.binary(), pa.large_binary()])
+    def test_roundtrip(self, keypair, typ):
+        """Test binary and large_binary columns"""
+        messages = [b"row %d" % i * (i + 1) for i in range(6)]
+        column = pa.array(messages, typ)
+        signatures = sign_column(column, keypair.private_key, workers=2)
+        assert signatures.type == pa.binary(SIG_SIZE) and len(signatures) == 6
+        assert verify(messages[4], signatures[4].as_py(), keypair.public_key)
+
+        ok = verify_column(column, signatures, keypair.public_key, workers=2)
+        assert ok.type == pa.bool_() and ok.to_pylist() == [True] * 6
+        tampered = pa.array(messages[:2] + [b"x"] + messages[3:], typ)
+        assert verify_column(tampered, signatures, keypair.public_key).to_pylist() == \
+            [True, True, False, True, True, True]
+
+    def test_sliced_and_chunked(self, keypair):
+        """Test columns that start at an offset or span several chunks"""
+        column = pa.array([b"a", b"bb", b"ccc", b"dddd"]).slice(1, 3)
+        signatures = sign_column(column, keypair.private_key.unpack())
+        assert verify(b"bb", signatures[0].as_py(), keypair.public_key)
+        chunked = pa.chunked_array([[b"bb"], [b"ccc", b"dddd"]])
+        assert verify_column(chunked, signatures, keypair.public_key).to_pylist() == \
+            [True, True, True]
+        assert verify_column(column, signatures.slice(0, 3), keypair.public_key,
+                             workers=1).to_pylist() == [True, True, True]
+
+    def test_table_column_is_not_copied(self, keypair, monkeypatch):
+        """Test that a table column is signed from its own data buffer"""
+        import faest.arrow
+        from faest.core import ffi
+
+        table = pa.table({'payload': pa.array([b"alpha", b"beta", b"gamma"])})
+        column = table.column('payload')
+        address = column.chunk(0).buffers()[2].address
+        sign_arena = faest.arrow.sign_arena
+        seen = []
+
+        def spy(private_key, data, *args):
+            seen.append(int(ffi.cast('uintptr_t', data)))
+            return sign_arena(private_key, data, *args)
+
+        monkeypatch.setattr(faest.arrow, 'sign_arena', spy)
+        signatures = sign_column(column, keypair.private_key)
+        assert seen == [address]
+        assert verify(b"gamma", signatures[2].as_py(), keypair.public_key)
+
+    def test_several_chunks(self, keypair):
+        """Test chunked columns whose chunks do not line up"""
+        messages = pa.chunked_array([[b"a", None], [b"c"], [b"d", b"e"]])
+        signatures = sign_column(messages, keypair.private_key)
+        assert len(signatures) == 5 and signatures.null_count == 1
+        assert verify(b"d", signatures[3].as_py(), keypair.public_key)
+        sig_chunks = pa.chunked_array([signatures.slice(0, 3), signatures.slice(3, 2)])
+        assert verify_column(messages, sig_chunks, keypair.public_key).to_pylist() == \
+            [True, None, True, True, True]
+        assert len(sign_column(pa.chunked_array([], pa.binary()), keypair.private_key)) == 0
+
+    def test_nulls(self, keypair):
+        """Test that null messages give null signatures and results"""
+        column = pa.array([b"one", None, b"three"])
+        signatures = sign_column(column, keypair.private_key)
+        assert signatures.null_count == 1 and signatures[1].as_py() is None
+        assert verify(b"three", signatures[2].as_py(), keypair.public_key)
+        assert verify_column(column, signatures, keypair.public_key).to_pylist() == \
+            [True, None, True]
+
+    def test_public_key_column(self, keypair):
+        """Test one public key per row"""
+        other = Keypair.generate('em_128f')
+        column = pa.array([b"first", b"second"])
+        signatures = sign_column(column, keypair.private_key)
+        pk_size = PARAMETER_SETS['em_128f']['pk_size']
+        keys = pa.array([keypair.public_key.to_bytes(), other.public_key.to_bytes()],
+                        pa.binary(pk_size))
+        assert verify_column(column, signatures, keys, param_set='em_128f').to_pylist() == \
+            [True, False]
+        with pytest.raises(ValueError):
+            verify_column(column, signatures, keys)
+        with pytest.raises(ValueError):
+            verify_column(column, signatures, keys, param_set='256f')
+
+    def test_errors(self, keypair):
+        """Test empty columns and invalid input"""
+        empty = sign_column(pa.array([], pa.binary()), keypair.private_key)
+        assert len(empty) == 0 and empty.type == pa.binary(SIG_SIZE)
+        with pytest.raises(TypeError):
+            sign_column(pa.array(["text"]), keypair.private_key)
+        with pytest.raises(TypeError):
+            sign_column([b"abc"], keypair.private_key)
+        with pytest.raises(ValueError):
+            verify_column(pa.array([b"a"]), pa.array([b"s", b"t"]), keypair.public_key)
+        unpacked = keypair.private_key.unpack()
+        unpacked.clear()
+        with pytest.raises(SignatureError):
+            sign_column(pa.array([b"a"]), unpacked)
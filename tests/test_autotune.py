@@ -0,0 +1,86 @@
+"""
+Tests for adaptive batch sizing and worker autotuning
+
+Run with: pytest tests/
+"""
+
+import pytest
+from faest import Keypair, verify
+from faest.autotune import AdaptiveBatcher, _Tuning, _size_class
+
+
+@pytest.fixture(scope='module')
+def keypair():
+    return Keypair.generate('em_128f')
+
+
+class TestTuning:
+    """Test the tuning rules on synthetic timings"""
+
+    def test_batch_size_tracks_target_latency(self):
+        """Test that batches are sized to take about target_latency"""
+        state = _Tuning(workers=2, max_workers=2, max_batch=1000, target_latency=0.1,
+                        smoothing=1.0, explore_every=1000)
+        # 10 messages on 2 workers in 50 ms: 10 ms of CPU per message
+        state.record(10, 2, 0.05)
+        assert state.item_seconds == pytest.approx(0.01)
+        assert state.plan() == (20, 2)
+        state.record(1, 2, 10.0)
+        assert state.batch_size == 1
+
+    def test_worker_hill_climbing(self):
+        """Test that a faster worker count is adopted and a slower one is not"""
+        state = _Tuning(workers=4, max_workers=8, max_batch=100, target_latency=0.1,
+                        smoothing=1.0, explore_every=2)
+        state.record(40, 4, 1.0)                      # 40 msg/s with 4 workers
+        _, workers = state.plan()
+        state.record(40, workers, 1.0)
+        _, workers = state.plan()
+        assert workers == 5
+        state.record(40, 5, 0.5)                      # 80 msg/s with 5 workers
+        assert state.workers == 5
+        state.record(40, 5, 0.5)
+        _, workers = state.plan()
+        assert workers == 4
+        state.record(40, 4, 2.0)                      # 4 workers now slower
+        assert state.workers == 5
+
+    def test_size_class(self):
+        """Test grouping by message size"""
+        assert _size_class([]) == 0
+        assert _size_class([b""]) == 0
+        assert _size_class([b"x" * 100]) == 64
+        assert _size_class([b"x" * 5000, b"x" * 3000]) == 1024
+
+
+class TestAdaptiveBatcher:
+    """Test the adaptive sign/verify APIs"""
+
+    def test_sign_and_verify(self, keypair):
+        """Test that results match and decisions are reported"""
+        batcher = AdaptiveBatcher(target_latency=0.01, max_workers=2)
+        messages = [b"adaptive %d" % i for i in range(12)]
+        signatures = batcher.sign_many(messages, keypair.private_key)
+        assert all(verify(m, s, keypair.public_key) for m, s in zip(messages, signatures))
+        results = batcher.verify_many(messages, signatures, keypair.public_key)
+        assert results == [True] * 12
+        assert batcher.verify_many(messages[:1], signatures[1:2], keypair.public_key) == [False]
+
+        decisions = batcher.decisions()
+        sign_state = decisions[('em_128f', 'sign', 4)]
+        assert sign_state['batches'] >= 1
+        assert 1 <= sign_state['workers'] <= 2
+        assert sign_state['item_seconds'] > 0
+        assert ('em_128f', 'verify', 4) in decisions
+
+    def test_errors(self, keypair):
+        """Test invalid configuration and input"""
+        with pytest.raises(ValueError):
+            AdaptiveBatcher(target_latency=0)
+        with pytest.raises(ValueError):
+            AdaptiveBatcher(max_batch=0)
+        batcher = AdaptiveBatcher()
+        assert batcher.max_workers >= 1
+        assert batcher.sign_many([], keypair.private_key) == []
+        with pytest.raises(ValueError):
+            batcher.verify_many([b"a"], [], keypair.public_key)
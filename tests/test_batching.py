@@ -0,0 +1,252 @@
+"""
+Tests for batch operations and call coalescing
+
+Run with: pytest tests/
+"""
+
+import mmap
+import random
+import threading
+import time
+
+import pytest
+from faest import (InvalidKeyPairError, Keypair, PrivateKey, SignatureError, PARAMETER_SETS,
+                   sign, verify)
+from faest import batching
+from faest.batching import (Coalescer, derive_public_keys, sign_many, validate_many,
+                            verify_many)
+
+
+@pytest.fixture(scope='module')
+def keypair():
+    return Keypair.generate('128f')
+
+
+class TestUnpackedKeys:
+    """Test signing with unpacked private keys"""
+
+    def test_unpacked_sign(self, keypair):
+        """Test that unpacked keys produce valid signatures"""
+        unpacked = keypair.private_key.unpack()
+        assert unpacked.param_set == '128f'
+        assert unpacked.size > len(keypair.private_key.to_bytes())
+        signature = sign(b"message", unpacked)
+        assert verify(b"message", signature, keypair.public_key)
+
+    def test_cleared_key_rejected(self, keypair):
+        """Test that a cleared unpacked key can no longer sign"""
+        unpacked = keypair.private_key.unpack()
+        unpacked.clear()
+        with pytest.raises(SignatureError):
+            sign(b"message", unpacked)
+
+
+class TestBatching:
+    """Test native batch sign/verify"""
+
+    def test_sign_and_verify_many(self, keypair):
+        """Test a batch roundtrip including an empty message"""
+        messages = [b"msg-%d" % i for i in range(9)] + [b""]
+        signatures = sign_many(messages, keypair.private_key, workers=3)
+        assert len(signatures) == len(messages)
+        assert all(verify(m, s, keypair.public_key) for m, s in zip(messages, signatures))
+        assert verify_many(messages, signatures, keypair.public_key) == [True] * 10
+
+    def test_verify_many_detects_failures(self, keypair):
+        """Test per-item results and per-item public keys"""
+        other = Keypair.generate('128f')
+        messages = [b"a", b"b", b"c"]
+        signatures = sign_many(messages, keypair.private_key.unpack())
+        signatures[1] = signatures[1][:-1]
+        keys = [keypair.public_key, keypair.public_key, other.public_key]
+        assert verify_many(messages, signatures, keys) == [True, False, False]
+
+    def test_invalid_inputs(self, keypair):
+        """Test type and length checking"""
+        assert sign_many([], keypair.private_key) == []
+        with pytest.raises(TypeError):
+            sign_many(["text"], keypair.private_key)
+        with pytest.raises(ValueError):
+            verify_many([b"a"], [], keypair.public_key)
+
+
+def _invalid_private_key(param_set):
+    """Find a private key that fails validation (a deterministic search)"""
+    rng = random.Random(0)
+    size = PARAMETER_SETS[param_set]['sk_size']
+    while True:
+        candidate = rng.getrandbits(8 * size).to_bytes(size, "little")
+        try:
+            PrivateKey(candidate, param_set).public_key()
+        except InvalidKeyPairError:
+            return candidate
+
+
+class TestDerivePublicKeys:
+    """Test bulk public key derivation"""
+
+    @pytest.mark.parametrize("param_set", ['128f', '192s', 'em_256f'])
+    def test_derive_arena(self, param_set):
+        """Test that derived keys match keygen, from several buffer types"""
+        keypairs = [Keypair.generate(param_set) for _ in range(7)]
+        secrets = b''.join(kp.private_key.to_bytes() for kp in keypairs)
+        expected = b''.join(kp.public_key.to_bytes() for kp in keypairs)
+        assert derive_public_keys(secrets, param_set, workers=3) == expected
+        assert derive_public_keys(bytearray(secrets), param_set) == expected
+        assert derive_public_keys(memoryview(secrets), param_set, workers=1) == expected
+
+    def test_derive_from_mmap(self, tmp_path):
+        """Test deriving straight from a memory-mapped key file"""
+        keypairs = [Keypair.generate('128f') for _ in range(4)]
+        path = tmp_path / 'secrets.bin'
+        path.write_bytes(b''.join(kp.private_key.to_bytes() for kp in keypairs))
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            derived = derive_public_keys(m, '128f')
+        assert derived == b''.join(kp.public_key.to_bytes() for kp in keypairs)
+
+    def test_invalid_inputs(self):
+        """Test invalid keys, sizes and parameter sets"""
+        good = Keypair.generate('128f').private_key.to_bytes()
+        bad = _invalid_private_key('128f')
+        with pytest.raises(InvalidKeyPairError, match="key 2"):
+            derive_public_keys(good * 2 + bad + good, '128f', workers=2)
+        with pytest.raises(ValueError):
+            derive_public_keys(good[:-1], '128f')
+        with pytest.raises(ValueError):
+            derive_public_keys(good, 'bogus')
+        assert derive_public_keys(b'', '128f') == b''
+
+
+class TestValidateMany:
+    """Test bulk keypair validation"""
+
+    def test_failure_bitmap(self):
+        """Test that exactly the mismatched pairs are flagged"""
+        keypairs = [Keypair.generate('128f') for _ in range(21)]
+        public = [kp.public_key.to_bytes() for kp in keypairs]
+        secret = [kp.private_key.to_bytes() for kp in keypairs]
+        bad = {0, 7, 8, 20}
+        for i in bad:
+            public[i] = public[(i + 1) % len(public)]
+        for workers in (1, 3):
+            bitmap = validate_many(b''.join(public), b''.join(secret), '128f', workers)
+            assert len(bitmap) == 3
+            assert {i for i in range(21) if bitmap[i >> 3] >> (i & 7) & 1} == bad
+
+    def test_validate_mmap(self, tmp_path):
+        """Test validating memory-mapped key files"""
+        keypairs = [Keypair.generate('em_128f') for _ in range(5)]
+        (tmp_path / 'pk').write_bytes(b''.join(kp.public_key.to_bytes() for kp in keypairs))
+        (tmp_path / 'sk').write_bytes(b''.join(kp.private_key.to_bytes() for kp in keypairs))
+        with open(tmp_path / 'pk', 'rb') as fp, open(tmp_path / 'sk', 'rb') as fs, \
+                mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as pks, \
+                mmap.mmap(fs.fileno(), 0, access=mmap.ACCESS_READ) as sks:
+            assert validate_many(pks, sks, 'em_128f') == b'\x00'
+
+    def test_invalid_inputs(self):
+        """Test size, count and parameter set checking"""
+        kp = Keypair.generate('128f')
+        pk, sk = kp.public_key.to_bytes(), kp.private_key.to_bytes()
+        assert validate_many(b'', b'', '128f') == b''
+        with pytest.raises(ValueError):
+            validate_many(pk * 2, sk, '128f')
+        with pytest.raises(ValueError):
+            validate_many(pk[:-1], sk, '128f')
+        with pytest.raises(ValueError):
+            validate_many(pk, sk, 'bogus')
+
+
+class TestCoalescer:
+    """Test coalescing of concurrent calls into batches"""
+
+    def test_concurrent_verify_calls_are_batched(self, keypair):
+        """Test that calls from many threads share batches"""
+        messages = [b"req-%d" % i for i in range(16)]
+        signatures = sign_many(messages, keypair.private_key)
+        signatures[3] = signatures[4]
+        results = {}
+        barrier = threading.Barrier(16)
+
+        with Coalescer(max_delay=0.05, max_batch=64) as coalescer:
+            def worker(i):
+                barrier.wait()
+                results[i] = coalescer.verify(messages[i], signatures[i],
+                                              keypair.public_key)
+
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            stats = coalescer.stats()
+
+        assert results == {i: i != 3 for i in range(16)}
+        assert stats['calls'] == 16
+        assert stats['batches'] < 16
+
+    def test_sign_futures(self, keypair):
+        """Test submitting signing calls and resolving their futures"""
+        unpacked = keypair.private_key.unpack()
+        with Coalescer(max_batch=4) as coalescer:
+            futures = [coalescer.submit_sign(b"m%d" % i, unpacked) for i in range(10)]
+            signatures = [f.result(timeout=30) for f in futures]
+        for i, signature in enumerate(signatures):
+            assert verify(b"m%d" % i, signature, keypair.public_key)
+
+    def test_max_batch_closes_window_early(self, keypair):
+        """Test that a full batch is dispatched without waiting for max_delay"""
+        with Coalescer(max_delay=30.0, max_batch=2) as coalescer:
+            start = time.monotonic()
+            futures = [coalescer.submit_sign(b"x", keypair.private_key) for _ in range(2)]
+            for f in futures:
+                f.result(timeout=30)
+            assert time.monotonic() - start < 10.0
+
+    def test_closed_coalescer_rejects_calls(self, keypair):
+        """Test errors after close and for invalid inputs"""
+        coalescer = Coalescer()
+        with pytest.raises(TypeError):
+            coalescer.submit_sign("text", keypair.private_key)
+        coalescer.close()
+        with pytest.raises(RuntimeError):
+            coalescer.submit_sign(b"x", keypair.private_key)
+        with pytest.raises(ValueError):
+            Coalescer(max_batch=0)
+
+
+class TestAvailableCpus:
+    """Test cgroup-aware CPU counting"""
+
+    @pytest.fixture
+    def cgroup(self, monkeypatch):
+        files = {}
+        monkeypatch.setattr(batching, '_read_first_line', lambda path: files.get(path))
+        monkeypatch.setattr(batching, '_read_lines',
+                            lambda path: files.get(path, '').splitlines())
+        monkeypatch.setattr(batching, '_available_cpus', None)
+        return files
+
+    def test_cgroup_v2_quota(self, cgroup):
+        """Test a cgroup v2 cpu.max limit"""
+        cgroup['/proc/self/cgroup'] = "0::/app.slice"
+        cgroup['/sys/fs/cgroup/app.slice/cpu.max'] = "150000 100000"
+        assert batching._cgroup_cpu_limit() == 1.5
+        cgroup['/sys/fs/cgroup/app.slice/cpu.max'] = "max 100000"
+        assert batching._cgroup_cpu_limit() is None
+
+    def test_cgroup_v1_quota(self, cgroup):
+        """Test a cgroup v1 CFS quota"""
+        cgroup['/proc/self/cgroup'] = "4:cpu,cpuacct:/\n0::/"
+        cgroup['/sys/fs/cgroup/cpu/cpu.cfs_quota_us'] = "200000"
+        cgroup['/sys/fs/cgroup/cpu/cpu.cfs_period_us'] = "100000"
+        assert batching._cgroup_cpu_limit() == 2.0
+        cgroup['/sys/fs/cgroup/cpu/cpu.cfs_quota_us'] = "-1"
+        assert batching._cgroup_cpu_limit() is None
+
+    def test_quota_caps_workers(self, cgroup, monkeypatch):
+        """Test that the quota bounds available_cpus() and default_workers()"""
+        monkeypatch.setattr(batching.os, 'sched_getaffinity', lambda pid: set(range(64)))
+        cgroup['/proc/self/cgroup'] = "0::/"
+        cgroup['/sys/fs/cgroup/cpu.max'] = "250000 100000"
+        assert batching.available_cpus() == 3
+        assert batching.default_workers() == 3
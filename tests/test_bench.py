@@ -0,0 +1,99 @@
+"""
+Tests for the benchmark tool
+
+Run with: pytest tests/
+"""
+
+import os
+import shutil
+
+import pytest
+from faest import bench
+from faest.bench import Measurement, benchmark_parameter_set, format_results, open_counter
+
+
+class TestBench:
+    """Test measurement, counters and report formatting"""
+
+    def test_measurement_statistics(self):
+        """Test median and quartiles"""
+        m = Measurement([5, 1, 4, 2, 3])
+        assert m.samples == [1, 2, 3, 4, 5]
+        assert m.median == 3
+        assert m.quartiles == (2, 4)
+        assert Measurement([7]).quartiles == (7, 7)
+
+    def test_counters(self):
+        """Test that a cycle counter is always available"""
+        counter = open_counter(cycles=True)
+        try:
+            assert counter.unit in ('cycles', 'ns')
+            first = counter.read()
+            assert counter.read() >= first
+        finally:
+            counter.close()
+        assert open_counter(cycles=False).unit == 'ns'
+
+    def test_benchmark_and_format(self):
+        """Test benchmarking one parameter set and formatting the results"""
+        counter = open_counter(cycles=True)
+        try:
+            result = benchmark_parameter_set('em_128f', counter, runs=3, warmup=0,
+                                             long_message_size=4096)
+        finally:
+            counter.close()
+        for op in ('keygen', 'sign', 'verify', 'verify_long'):
+            assert len(result[op].samples) == 3
+            assert result[op].median > 0
+        assert result['per_byte'] >= 0
+
+        results = {'em_128f': result}
+        table = format_results(results, counter, 'table')
+        assert 'FAEST-EM-128F' in table and '5060' in table
+        markdown = format_results(results, counter, 'markdown').splitlines()
+        assert markdown[0].startswith('| parameter set |')
+        assert len(markdown) == 3
+        csv = format_results(results, counter, 'csv').splitlines()
+        assert csv[0].split(',')[0] == 'parameter set'
+
+    def test_main(self, capsys):
+        """Test the command line"""
+        assert bench.main(['--cycles', '--param-set', 'em_128f', '--runs', '1',
+                           '--warmup', '0', '--format', 'csv']) == 0
+        out = capsys.readouterr().out.splitlines()
+        assert out[1].startswith('"FAEST-EM-128F"')
+        assert bench.main(['--runs', '0']) == 2
+        with pytest.raises(SystemExit):
+            bench.main(['--param-set', 'bogus'])
+
+
+_BUNDLED_LIBRARY = os.path.join(os.path.dirname(__file__), '..', 'lib', 'linux', 'x86_64',
+                                'libfaest.so.1')
+
+
+class TestCompare:
+    """Test A/B comparison of libfaest builds"""
+
+    def test_mann_whitney(self):
+        """Test the rank test on separated and identical samples"""
+        assert bench.mann_whitney(range(11), range(20, 31)) == pytest.approx(8.15e-5, rel=0.01)
+        assert bench.mann_whitney([1] * 5, [1] * 5) == 1.0
+        assert bench.mann_whitney([1, 3, 5], [2, 4, 6]) > 0.5
+
+    @pytest.mark.skipif(not os.path.exists(_BUNDLED_LIBRARY),
+                        reason="requires the bundled Linux x86_64 libfaest")
+    def test_compare_same_library(self, tmp_path, capsys):
+        """Test comparing a library with a copy of itself"""
+        shutil.copy(_BUNDLED_LIBRARY, tmp_path / 'libfaest.so.1')
+        results = bench.compare_libraries(_BUNDLED_LIBRARY, str(tmp_path), ['em_128f'],
+                                          runs=2, warmup=0)
+        row = results['em_128f']
+        assert row['cross_verified']
+        for op in bench.COMPARE_OPERATIONS:
+            assert row[op]['baseline'] > 0 and row[op]['candidate'] > 0
+            assert row[op]['verdict'] == 'same'
+        assert 'cross-verification' in bench.format_comparison(results)
+
+        assert bench.main(['compare', '--baseline', _BUNDLED_LIBRARY,
+                           '--candidate', str(tmp_path / 'missing')]) == 2
+        assert 'libfaest not found' in capsys.readouterr().err
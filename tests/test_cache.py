@@ -0,0 +1,131 @@
+"""
+Tests for the idempotent signing cache
+
+Run with: pytest tests/
+"""
+
+import threading
+
+import pytest
+from faest import FaestError, Keypair, PrivateKey, SigningCache, verify
+
+
+class FakeClock:
+    """Manually advanced time source"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(scope='module')
+def keypair():
+    return Keypair.generate('128f')
+
+
+class TestSigningCache:
+    """Test cache hits, expiry and eviction"""
+
+    def test_repeated_sign_returns_same_signature(self, keypair):
+        """Test that a retried request gets the original signature"""
+        cache = SigningCache()
+        message = b"retried request"
+        sig1 = cache.sign(message, keypair.private_key)
+        sig2 = cache.sign(message, keypair.private_key)
+        assert sig1 == sig2
+        assert verify(message, sig1, keypair.public_key)
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_different_messages_and_keys(self, keypair):
+        """Test that the cache key covers both message and key"""
+        cache = SigningCache()
+        other = Keypair.generate('128f')
+        sig_a = cache.sign(b"a", keypair.private_key)
+        sig_b = cache.sign(b"b", keypair.private_key)
+        sig_c = cache.sign(b"a", other.private_key)
+        assert len({sig_a, sig_b, sig_c}) == 3
+        assert verify(b"a", sig_c, other.public_key)
+        assert len(cache) == 3
+
+    def test_ttl_expiry(self, keypair):
+        """Test that entries expire after the TTL"""
+        clock = FakeClock()
+        cache = SigningCache(ttl=10.0, clock=clock)
+        sig1 = cache.sign(b"msg", keypair.private_key)
+        clock.now = 5.0
+        assert cache.sign(b"msg", keypair.private_key) == sig1
+        clock.now = 10.5
+        assert cache.sign(b"msg", keypair.private_key) != sig1
+
+    def test_size_bound(self, keypair):
+        """Test that the cache never exceeds maxsize"""
+        cache = SigningCache(maxsize=2)
+        for i in range(4):
+            cache.sign(bytes([i]), keypair.private_key)
+        assert len(cache) == 2
+        assert cache.stats()['evictions'] == 2
+
+    def test_message_not_stored(self, keypair):
+        """Test that only digests are retained"""
+        cache = SigningCache()
+        message = b"secret payload " * 4
+        cache.sign(message, keypair.private_key)
+        for digest in cache._entries:
+            assert len(digest) == 32
+            assert message not in digest
+
+    def test_concurrent_requests_share_signature(self, keypair):
+        """Test that concurrent identical requests sign only once"""
+        cache = SigningCache()
+        results = []
+
+        def worker():
+            results.append(cache.sign(b"storm", keypair.private_key))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(set(results)) == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_unpacked_key(self, keypair):
+        """Test caching signatures made with an unpacked key"""
+        cache = SigningCache()
+        unpacked = keypair.private_key.unpack()
+        sig1 = cache.sign(b"msg", unpacked)
+        assert cache.sign(b"msg", unpacked) == sig1
+        assert verify(b"msg", sig1, keypair.public_key)
+        assert cache.stats()['hits'] == 1
+        unpacked.clear()
+        with pytest.raises(FaestError):
+            cache.sign(b"other", unpacked)
+
+    def test_key_not_copied(self, keypair, monkeypatch):
+        """Test that key bytes are not copied and each key is fingerprinted once"""
+        cache = SigningCache()
+        same_key = PrivateKey(keypair.private_key.to_bytes(), '128f')
+
+        def refuse(self):
+            raise AssertionError("to_bytes() called")
+
+        monkeypatch.setattr(PrivateKey, 'to_bytes', refuse)
+        sig = cache.sign(b"msg", keypair.private_key)
+        assert cache.sign(b"msg", same_key) == sig
+        cache.sign(b"msg2", keypair.private_key)
+        assert len(cache._fingerprints) == 2
+
+    def test_invalidate_and_type_checking(self, keypair):
+        """Test invalidation and input validation"""
+        cache = SigningCache()
+        cache.sign(b"msg", keypair.private_key)
+        assert cache.invalidate(b"msg", keypair.private_key)
+        assert not cache.invalidate(b"msg", keypair.private_key)
+        with pytest.raises(TypeError):
+            cache.sign("not bytes", keypair.private_key)
+        with pytest.raises(ValueError):
+            SigningCache(maxsize=0)
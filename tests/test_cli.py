@@ -0,0 +1,176 @@
+"""
+Tests for the faest command-line tool
+
+Run with: pytest tests/
+"""
+
+import base64
+import io
+import json
+import os
+import stat
+
+import pytest
+from faest import PrivateKey, PublicKey, verify, wire
+from faest.cli import main
+
+
+@pytest.fixture(scope='module')
+def keys(tmp_path_factory):
+    prefix = str(tmp_path_factory.mktemp('keys') / 'release')
+    assert main(['keygen', '--out', prefix, '-q']) == 0
+    return prefix + '.sk', prefix + '.pk'
+
+
+def _stdin(monkeypatch, data: bytes) -> None:
+    monkeypatch.setattr('sys.stdin', io.TextIOWrapper(io.BytesIO(data)))
+
+
+class TestKeygen:
+    """Test key generation"""
+
+    def test_writes_wire_records(self, keys):
+        """Test that keygen writes a matching keypair as wire records"""
+        sk_path, pk_path = keys
+        assert stat.S_IMODE(os.stat(sk_path).st_mode) == 0o600
+        with open(sk_path, 'rb') as f:
+            private_key = wire.decode(f.read()).value()
+        with open(pk_path, 'rb') as f:
+            public_key = wire.decode(f.read()).value()
+        assert isinstance(private_key, PrivateKey)
+        assert private_key.public_key().to_bytes() == public_key.to_bytes()
+
+    def test_refuses_to_overwrite(self, keys, capsys):
+        """Test that existing key files are kept unless --force is given"""
+        sk_path, _ = keys
+        with open(sk_path, 'rb') as f:
+            before = f.read()
+        assert main(['keygen', '--out', sk_path[:-3]]) == 2
+        with open(sk_path, 'rb') as f:
+            assert f.read() == before
+        assert 'exists' in capsys.readouterr().err
+
+    def test_existing_public_key_leaves_no_private_key(self, tmp_path):
+        """Test that a clash on PREFIX.pk does not create PREFIX.sk"""
+        (tmp_path / 'k.pk').write_bytes(b"old")
+        assert main(['keygen', '--out', str(tmp_path / 'k'), '-q']) == 2
+        assert not (tmp_path / 'k.sk').exists()
+        assert (tmp_path / 'k.pk').read_bytes() == b"old"
+
+    def test_force_resets_mode(self, tmp_path):
+        """Test that --force makes an existing readable PREFIX.sk private"""
+        sk_path = tmp_path / 'k.sk'
+        sk_path.write_bytes(b"old")
+        sk_path.chmod(0o644)
+        assert main(['keygen', '--out', str(tmp_path / 'k'), '--force', '-q']) == 0
+        assert stat.S_IMODE(sk_path.stat().st_mode) == 0o600
+        assert isinstance(wire.decode(sk_path.read_bytes()).value(), PrivateKey)
+
+    def test_raw_keys(self, tmp_path):
+        """Test raw key files, read back with --param-set"""
+        prefix = str(tmp_path / 'raw')
+        assert main(['keygen', '--out', prefix, '--param-set', 'em_128f', '--raw', '-q']) == 0
+        with open(prefix + '.pk', 'rb') as f:
+            PublicKey(f.read(), 'em_128f')
+        (tmp_path / 'm').write_bytes(b"raw")
+        assert main(['sign', '-k', prefix + '.sk', '--param-set', 'em_128f', '-q',
+                     str(tmp_path / 'm')]) == 0
+        assert main(['verify', '-k', prefix + '.pk', '--param-set', 'em_128f', '-q',
+                     str(tmp_path / 'm')]) == 0
+
+
+class TestFiles:
+    """Test signing and verifying files and directories"""
+
+    def test_directory_roundtrip(self, keys, tmp_path, capsys):
+        """Test that a directory tree is signed and verified recursively"""
+        sk_path, pk_path = keys
+        (tmp_path / 'sub').mkdir()
+        paths = [tmp_path / 'a', tmp_path / 'sub' / 'b', tmp_path / 'sub' / 'c']
+        for i, path in enumerate(paths):
+            path.write_bytes(b"artifact %d" % i)
+        assert main(['sign', '-k', sk_path, '--batch', '2', str(tmp_path)]) == 0
+        assert 'Signed 3 items' in capsys.readouterr().err
+
+        with open(pk_path, 'rb') as f:
+            public_key = wire.decode(f.read()).value()
+        for path in paths:
+            signature = path.with_name(path.name + '.sig').read_bytes()
+            assert verify(path.read_bytes(), signature, public_key)
+
+        assert main(['verify', '-k', pk_path, str(tmp_path)]) == 0
+        paths[1].write_bytes(b"tampered")
+        (tmp_path / 'sub' / 'c.sig').unlink()
+        assert main(['verify', '-k', pk_path, str(tmp_path)]) == 1
+        out = capsys.readouterr().out.splitlines()
+        assert out == [f"FAILED {paths[1]}: invalid signature",
+                       f"FAILED {paths[2]}: missing signature"]
+
+    def test_names_from_stdin(self, keys, tmp_path, monkeypatch, capsys):
+        """Test reading file names from stdin, as from find(1)"""
+        sk_path, _ = keys
+        message = tmp_path / 'one'
+        message.write_bytes(b"one")
+        _stdin(monkeypatch, f"{message}\n{tmp_path / 'absent'}\n".encode())
+        assert main(['sign', '-k', sk_path]) == 1
+        assert (tmp_path / 'one.sig').exists()
+        assert f"FAILED {tmp_path / 'absent'}" in capsys.readouterr().err
+
+    def test_wrong_key_kind(self, keys, tmp_path, capsys):
+        """Test that signing with a public key file is a usage error"""
+        _, pk_path = keys
+        assert main(['sign', '-k', pk_path, str(tmp_path)]) == 2
+        assert 'does not contain a private key' in capsys.readouterr().err
+
+
+class TestStreams:
+    """Test line and JSONL streams"""
+
+    def test_lines_pipeline(self, keys, monkeypatch, capsysbinary):
+        """Test signing stdin lines and verifying the output"""
+        sk_path, pk_path = keys
+        lines = [b"GET /index.html 200", b"", b"POST /login 302"]
+        _stdin(monkeypatch, b'\n'.join(lines) + b'\n')
+        assert main(['sign', '-k', sk_path, '--input', 'lines', '-q']) == 0
+        signed = capsysbinary.readouterr().out
+        assert [line.split(b'\t', 1)[1] for line in signed.splitlines()] == lines
+
+        _stdin(monkeypatch, signed)
+        assert main(['verify', '-k', pk_path, '--input', 'lines', '-q']) == 0
+        tampered = signed.replace(b"/login", b"/admin")
+        _stdin(monkeypatch, tampered + b"not-a-signature\n")
+        assert main(['verify', '-k', pk_path, '--input', 'lines', '-q']) == 1
+        out = capsysbinary.readouterr().out.decode().splitlines()
+        assert out[0] == "FAILED <stdin>:3: invalid signature"
+        assert out[1].startswith("FAILED <stdin>:4:")
+
+    def test_jsonl(self, keys, tmp_path, monkeypatch, capsysbinary):
+        """Test signing a JSONL file and verifying the records"""
+        sk_path, pk_path = keys
+        events = tmp_path / 'events.jsonl'
+        events.write_text('{"id": 1, "body": "deploy"}\n\n{"id": 2, "body": 7}\n')
+        assert main(['sign', '-k', sk_path, '--input', 'jsonl', '--field', 'body',
+                     '--signature-field', 'sig', '-q', str(events)]) == 1
+        captured = capsysbinary.readouterr()
+        assert f"FAILED {events}:3: field 'body' must be a string".encode() in captured.err
+        (record,) = [json.loads(line) for line in captured.out.splitlines()]
+        assert record['id'] == 1
+
+        with open(pk_path, 'rb') as f:
+            public_key = wire.decode(f.read()).value()
+        assert verify(b"deploy", base64.b64decode(record['sig']), public_key)
+        _stdin(monkeypatch, captured.out)
+        assert main(['verify', '-k', pk_path, '--input', 'jsonl', '--field', 'body',
+                     '--signature-field', 'sig', '-q']) == 0
+
+    def test_jsonl_unencodable_message(self, keys, tmp_path, capsysbinary):
+        """Test that a lone surrogate fails its record and keeps the rest"""
+        sk_path, _ = keys
+        events = tmp_path / 'events.jsonl'
+        events.write_text('{"id": 1, "body": "a"}\n{"id": 2, "body": "\\ud800"}\n'
+                          '{"id": 3, "body": "b"}\n')
+        assert main(['sign', '-k', sk_path, '--input', 'jsonl', '--field', 'body',
+                     '-q', str(events)]) == 1
+        captured = capsysbinary.readouterr()
+        assert f"FAILED {events}:2: ".encode() in captured.err
+        assert [json.loads(line)['id'] for line in captured.out.splitlines()] == [1, 3]
@@ -0,0 +1,160 @@
+"""
+Tests for the local signing daemon
+
+Run with: pytest tests/
+"""
+
+import os
+import stat
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from faest import Keypair, PublicKey, verify
+from faest import daemon as daemon_module
+from faest.daemon import (DaemonClient, DaemonError, SigningDaemon, OP_SIGN, STATUS_ERROR,
+                          _REQUEST, _RESPONSE, _frame, _recv_frame)
+
+
+@pytest.fixture(scope='module')
+def keypair():
+    return Keypair.generate('128f')
+
+
+@pytest.fixture
+def daemon(keypair, tmp_path):
+    verify_only = Keypair.generate('em_128f')
+    path = str(tmp_path / 'faest.sock')
+    with SigningDaemon(path, {'host': keypair, 'peer': verify_only.public_key},
+                       max_delay=0.002) as d:
+        yield d
+
+
+class TestDaemon:
+    """Test the Unix socket daemon and client"""
+
+    def test_sign_and_verify(self, daemon, keypair):
+        """Test a simple roundtrip through the daemon"""
+        with DaemonClient(daemon.socket_path) as client:
+            signature = client.sign('host', b"artifact")
+            assert verify(b"artifact", signature, keypair.public_key)
+            assert client.verify('host', b"artifact", signature)
+            assert not client.verify('host', b"other", signature)
+
+    def test_pipelined_requests_are_coalesced(self, daemon, keypair):
+        """Test that pipelined requests run in fewer native batches"""
+        messages = [b"event-%d" % i for i in range(20)]
+        with DaemonClient(daemon.socket_path) as client:
+            signatures = client.sign_many('host', messages)
+            assert all(client.verify_many('host', messages, signatures))
+        stats = daemon.stats()
+        assert stats['requests'] == 40
+        assert stats['batches'] < stats['requests']
+
+    def test_concurrent_clients(self, daemon, keypair):
+        """Test several clients signing at once"""
+        results = {}
+
+        def worker(n):
+            with DaemonClient(daemon.socket_path) as client:
+                results[n] = client.sign('host', b"client-%d" % n)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for n, signature in results.items():
+            assert verify(b"client-%d" % n, signature, keypair.public_key)
+
+    def test_public_key_and_errors(self, daemon, keypair):
+        """Test public key lookup and error reporting"""
+        with DaemonClient(daemon.socket_path) as client:
+            public_key = client.public_key('host')
+            assert isinstance(public_key, PublicKey)
+            assert public_key.to_bytes() == keypair.public_key.to_bytes()
+            with pytest.raises(DaemonError):
+                client.sign('missing', b"x")
+            with pytest.raises(DaemonError):
+                client.sign('peer', b"x")
+            # The connection stays usable after errors
+            assert client.public_key('peer').param_set == 'em_128f'
+
+    def test_pipelined_errors_do_not_deadlock(self, daemon):
+        """Test many pipelined requests whose replies are sent immediately"""
+        with DaemonClient(daemon.socket_path, timeout=60) as client:
+            with pytest.raises(DaemonError, match="Unknown key"):
+                client.sign_many('missing', [b"x"] * 50000)
+            assert client.public_key('host').param_set == '128f'
+
+    def test_oversized_key_length(self, daemon):
+        """Test that a key length past the end of the frame is rejected"""
+        with DaemonClient(daemon.socket_path, timeout=10) as client:
+            client._sock.sendall(_frame(_REQUEST.pack(OP_SIGN, 7, 200) + b"host" + b"msg"))
+            request_id, status = _RESPONSE.unpack_from(_recv_frame(client._sock))
+            assert (request_id, status) == (7, STATUS_ERROR)
+            assert client.public_key('host').param_set == '128f'
+
+    def test_requests_after_coalescer_closed(self, daemon):
+        """Test that requests failing to submit get an error reply"""
+        daemon.coalescer.close()
+        with DaemonClient(daemon.socket_path, timeout=10) as client:
+            with pytest.raises(DaemonError, match="closed"):
+                client.sign('host', b"late")
+            with pytest.raises(DaemonError, match="closed"):
+                client.verify('host', b"late", b"sig")
+
+    def test_refuses_running_socket(self, daemon, keypair):
+        """Test that a second daemon does not steal a live socket"""
+        with pytest.raises(FileExistsError):
+            SigningDaemon(daemon.socket_path, {'host': keypair})
+
+
+def test_socket_created_private(keypair, tmp_path, monkeypatch):
+    """Test that the socket is never listening with umask-derived permissions"""
+    modes = []
+    activate = daemon_module._Server.server_activate
+
+    def spy(server):
+        modes.append(stat.S_IMODE(os.stat(server.server_address).st_mode))
+        activate(server)
+
+    monkeypatch.setattr(daemon_module._Server, 'server_activate', spy)
+    umask = os.umask(0o002)
+    try:
+        with SigningDaemon(str(tmp_path / 'faest.sock'), {'host': keypair}):
+            pass
+        assert os.umask(0o002) == 0o002
+    finally:
+        os.umask(umask)
+    assert modes == [0o600]
+
+
+def test_daemon_command_line(keypair, tmp_path):
+    """Test running the daemon with python -m faest.daemon"""
+    sk_path = tmp_path / 'host.sk'
+    pk_path = tmp_path / 'host.pk'
+    sk_path.write_bytes(keypair.private_key.to_bytes())
+    pk_path.write_bytes(keypair.public_key.to_bytes())
+    socket_path = str(tmp_path / 'cli.sock')
+
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'faest.daemon', '--socket', socket_path,
+         '--key', f'host:128f:{sk_path}:{pk_path}'],
+        stdout=subprocess.PIPE,
+    )
+    try:
+        for _ in range(100):
+            if (tmp_path / 'cli.sock').exists():
+                break
+            time.sleep(0.05)
+        with DaemonClient(socket_path, timeout=30) as client:
+            signature = client.sign('host', b"from cli")
+        assert verify(b"from cli", signature, keypair.public_key)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    assert proc.returncode == 0
+    assert not (tmp_path / 'cli.sock').exists()
@@ -0,0 +1,122 @@
+"""
+Tests for the unpacked key pool
+
+Run with: pytest tests/
+"""
+
+import threading
+
+import pytest
+from faest import Keypair, PrivateKey, verify
+from faest.keypool import UnpackedKeyPool
+
+
+@pytest.fixture(scope='module')
+def keypairs():
+    return {f"t{i}": Keypair.generate('em_128f') for i in range(3)}
+
+
+def unpacked_size(keypairs):
+    return next(iter(keypairs.values())).private_key.unpack().size
+
+
+class TestUnpackedKeyPool:
+    """Test LRU pooling of unpacked keys"""
+
+    def test_hits_and_unpacks(self, keypairs):
+        """Test that repeated use of a tenant unpacks its key once"""
+        pool = UnpackedKeyPool(loader=lambda t: keypairs[t].private_key)
+        for i in range(3):
+            signature = pool.sign('t0', b"msg %d" % i)
+            assert verify(b"msg %d" % i, signature, keypairs['t0'].public_key)
+        stats = pool.stats()
+        assert stats['unpacks'] == 1
+        assert stats['hits'] == 2 and stats['misses'] == 1
+        assert stats['hit_rate'] == pytest.approx(2 / 3)
+        assert stats['bytes'] == unpacked_size(keypairs)
+        assert 't0' in pool and len(pool) == 1
+
+    def test_lru_eviction_clears_keys(self, keypairs):
+        """Test that the budget evicts and zeroises the least recently used key"""
+        pool = UnpackedKeyPool(max_bytes=2 * unpacked_size(keypairs),
+                               loader=lambda t: keypairs[t].private_key)
+        with pool.lease('t0') as first:
+            pass
+        pool.sign('t1', b"x")
+        pool.sign('t0', b"x")
+        pool.sign('t2', b"x")
+        assert 't1' not in pool
+        assert 't0' in pool and 't2' in pool
+        assert pool.stats()['evictions'] == 1
+        assert pool.stats()['bytes'] <= pool.max_bytes
+        assert first._finalizer.alive
+
+        pool.clear()
+        assert len(pool) == 0 and pool.stats()['bytes'] == 0
+        assert not first._finalizer.alive
+
+    def test_leased_key_cleared_on_release(self, keypairs):
+        """Test that an evicted key stays usable until its lease ends"""
+        pool = UnpackedKeyPool(loader=lambda t: keypairs[t].private_key)
+        with pool.lease('t0') as key:
+            assert pool.evict('t0')
+            assert key._finalizer.alive
+        assert not key._finalizer.alive
+        assert not pool.evict('t0')
+
+    def test_rotated_key_replaces_resident(self, keypairs):
+        """Test that passing a different key for a tenant replaces the old one"""
+        pool = UnpackedKeyPool()
+        pool.sign('tenant', b"x", keypairs['t0'].private_key)
+        signature = pool.sign('tenant', b"rotated", keypairs['t1'].private_key)
+        assert verify(b"rotated", signature, keypairs['t1'].public_key)
+        assert pool.stats()['unpacks'] == 2 and len(pool) == 1
+
+    def test_key_fingerprinted_once(self, keypairs, monkeypatch):
+        """Test that passed-in keys are fingerprinted once without copying them"""
+        def refuse(self):
+            raise AssertionError("to_bytes() called")
+
+        monkeypatch.setattr(PrivateKey, 'to_bytes', refuse)
+        pool = UnpackedKeyPool()
+        for i in range(3):
+            pool.sign('tenant', b"msg %d" % i, keypairs['t0'].private_key)
+        assert pool.stats()['unpacks'] == 1
+        assert len(pool._fingerprints) == 1
+
+    def test_missing_key(self):
+        """Test tenants without a key or loader"""
+        pool = UnpackedKeyPool()
+        with pytest.raises(KeyError):
+            pool.sign('nobody', b"x")
+        with pytest.raises(ValueError):
+            UnpackedKeyPool(max_bytes=0)
+
+    def test_concurrent_misses_unpack_once(self, keypairs):
+        """Test that threads missing on the same tenant share one unpack"""
+        gate = threading.Event()
+
+        def loader(tenant):
+            gate.wait()
+            return keypairs[tenant].private_key
+
+        pool = UnpackedKeyPool(loader=loader)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(pool.sign('t0', b"c")))
+                   for _ in range(4)]
+        for t in threads:
+            t.start()
+        gate.set()
+        for t in threads:
+            t.join()
+        assert len(results) == 4
+        assert all(verify(b"c", s, keypairs['t0'].public_key) for s in results)
+        assert pool.stats()['unpacks'] == 1
+
+    def test_sign_many(self, keypairs):
+        """Test batch signing with a pooled key"""
+        pool = UnpackedKeyPool(loader=lambda t: keypairs[t].private_key)
+        messages = [b"batch %d" % i for i in range(4)]
+        signatures = pool.sign_many('t2', messages)
+        assert all(verify(m, s, keypairs['t2'].public_key)
+                   for m, s in zip(messages, signatures))
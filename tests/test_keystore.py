@@ -0,0 +1,147 @@
+"""
+Tests for the memory-mapped key directory
+
+Run with: pytest tests/
+"""
+
+import hashlib
+import os
+
+import pytest
+from faest import Keypair, PublicKey, sign
+from faest.keystore import KeyDirectory, _HEADER, _SLOT
+
+
+def key_id(public_key):
+    return hashlib.sha256(public_key.to_bytes()).digest()
+
+
+@pytest.fixture(scope='module')
+def keypairs():
+    return [Keypair.generate(p) for p in ('128f', 'em_128f', '256f', '128f')]
+
+
+@pytest.fixture
+def directory(tmp_path, keypairs):
+    keys = ((key_id(kp.public_key), kp.public_key) for kp in keypairs)
+    with KeyDirectory.build(str(tmp_path / 'keys.pfk'), keys) as d:
+        yield d
+
+
+class TestKeyDirectory:
+    """Test building and reading key directories"""
+
+    def test_lookup(self, directory, keypairs):
+        """Test that every key is found with its parameter set"""
+        assert len(directory) == 4
+        assert directory.param_sets() == {'128f': 2, '256f': 1, 'em_128f': 1}
+        for kp in keypairs:
+            found = directory[key_id(kp.public_key)]
+            assert isinstance(found, PublicKey)
+            assert found.param_set == kp.public_key.param_set
+            assert found.to_bytes() == kp.public_key.to_bytes()
+        assert sorted(directory) == sorted(key_id(kp.public_key) for kp in keypairs)
+
+    def test_missing(self, directory):
+        """Test lookups of unknown or malformed key IDs"""
+        assert directory.get(b"\x00" * 32) is None
+        assert b"short" not in directory
+        with pytest.raises(KeyError):
+            directory[b"\x01" * 32]
+
+    def test_verify(self, directory, keypairs):
+        """Test verifying through the directory"""
+        kp = keypairs[1]
+        signature = sign(b"hello", kp.private_key)
+        assert directory.verify(key_id(kp.public_key), b"hello", signature)
+        assert not directory.verify(key_id(keypairs[0].public_key), b"hello", signature)
+        with pytest.raises(KeyError):
+            directory.verify(b"\x00" * 32, b"hello", signature)
+
+    def test_reopen(self, directory, keypairs, tmp_path):
+        """Test opening an existing file"""
+        with KeyDirectory(str(tmp_path / 'keys.pfk')) as reopened:
+            assert len(reopened) == 4
+            assert key_id(keypairs[2].public_key) in reopened
+
+    def test_many_keys(self, tmp_path, keypairs):
+        """Test an index with many colliding probes"""
+        pk = keypairs[0].public_key
+        ids = [i.to_bytes(8, 'big') for i in range(5000)]
+        d = KeyDirectory.build(str(tmp_path / 'many.pfk'), ((i, pk) for i in ids),
+                               key_id_size=8)
+        assert d.key_id_size == 8
+        assert all(i in d for i in ids)
+        assert (5000).to_bytes(8, 'big') not in d
+        d.close()
+
+    def test_build_errors(self, tmp_path, keypairs):
+        """Test invalid build input and invalid files"""
+        path = str(tmp_path / 'bad.pfk')
+        pk = keypairs[0].public_key
+        with pytest.raises(ValueError):
+            KeyDirectory.build(path, [(b"a" * 32, pk), (b"a" * 32, keypairs[1].public_key)])
+        with pytest.raises(ValueError):
+            KeyDirectory.build(path, [(b"short", pk)])
+        with pytest.raises(TypeError):
+            KeyDirectory.build(path, [(b"a" * 32, pk.to_bytes())])
+        with open(path, 'wb') as f:
+            f.write(b"\x00" * 128)
+        with pytest.raises(ValueError):
+            KeyDirectory(path)
+
+    def test_spilled_build(self, tmp_path, keypairs):
+        """Test that a build merging many spilled runs matches an in-memory one"""
+        entries = [(i.to_bytes(8, 'little'), keypairs[i % 4].public_key)
+                   for i in range(3000)]
+        one = str(tmp_path / 'one.pfk')
+        spilled = str(tmp_path / 'spilled.pfk')
+        KeyDirectory.build(one, entries, key_id_size=8).close()
+        with KeyDirectory.build(spilled, iter(entries), key_id_size=8,
+                                buffer_records=97) as d:
+            assert d.get(entries[1234][0]).to_bytes() == entries[1234][1].to_bytes()
+            ids = list(d)
+            start = 0
+            for count in d.param_sets().values():
+                assert ids[start:start + count] == sorted(ids[start:start + count])
+                start += count
+        with open(one, 'rb') as a, open(spilled, 'rb') as b:
+            assert a.read() == b.read()
+        assert sorted(os.listdir(tmp_path)) == ['one.pfk', 'spilled.pfk']
+
+    def test_duplicate_across_runs(self, tmp_path, keypairs):
+        """Test that repeated key IDs are found in different runs and sections"""
+        path = str(tmp_path / 'dup.pfk')
+        ids = [i.to_bytes(8, 'little') for i in range(50)]
+        entries = [(i, keypairs[0].public_key) for i in ids]
+        with pytest.raises(ValueError, match="Duplicate"):
+            KeyDirectory.build(path, entries + [(ids[3], keypairs[0].public_key)],
+                               key_id_size=8, buffer_records=10)
+        with pytest.raises(ValueError, match="Duplicate"):
+            KeyDirectory.build(path, entries + [(ids[3], keypairs[2].public_key)],
+                               key_id_size=8, buffer_records=10)
+        assert os.listdir(tmp_path) == []
+
+    def test_corrupt_index(self, tmp_path, keypairs):
+        """Test that an index slot naming a missing section raises ValueError"""
+        path = str(tmp_path / 'corrupt.pfk')
+        kid = key_id(keypairs[0].public_key)
+        KeyDirectory.build(path, [(kid, keypairs[0].public_key)]).close()
+        with open(path, 'r+b') as f:
+            data = bytearray(f.read())
+            slots, index_offset = _HEADER.unpack_from(data)[4:6]
+            for slot in range(slots):
+                pos = index_offset + slot * _SLOT.size
+                h, _, number = _SLOT.unpack_from(data, pos)
+                if number:
+                    _SLOT.pack_into(data, pos, h, 99, number)
+            f.seek(0)
+            f.write(data)
+        with KeyDirectory(path) as d:
+            with pytest.raises(ValueError, match="Corrupt"):
+                d.get(kid)
+
+    def test_empty(self, tmp_path):
+        """Test a directory without keys"""
+        with KeyDirectory.build(str(tmp_path / 'empty.pfk'), []) as d:
+            assert len(d) == 0 and d.get(b"\x00" * 32) is None
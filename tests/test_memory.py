@@ -0,0 +1,37 @@
+"""
+Tests for per-object memory overhead against the tracked baseline
+
+Run with: pytest tests/
+"""
+
+import importlib.util
+import os
+
+import pytest
+
+_PATH = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'memory', 'footprint.py')
+_spec = importlib.util.spec_from_file_location('footprint', _PATH)
+footprint = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(footprint)
+
+
+class TestMemoryFootprint:
+    """Test the memory benchmark and the tracked heap costs"""
+
+    def test_measure_objects(self):
+        """Test that heap and RSS costs are reported per object"""
+        result = footprint.measure_objects('public_key', '128f', 1000)
+        assert result['heap_per_object'] > 32
+        assert result['rss_per_object'] is not None
+
+    def test_measure_operations(self):
+        """Test peak memory of sign and verify"""
+        result = footprint.measure_operations('em_128f', 1 << 16)
+        assert result['sign_heap_peak'] > 0
+        assert result['verify_rss_peak'] >= 0
+
+    def test_no_overhead_regression(self):
+        """Test that key and signature objects did not grow past the baseline"""
+        if footprint._python_version() not in footprint.load_baseline():
+            pytest.skip("no memory baseline for this Python version")
+        assert footprint.check(['128f', 'em_256s'], tolerance=0.05) == []
@@ -0,0 +1,82 @@
+"""
+Tests for Merkle-batched signing
+
+Run with: pytest tests/
+"""
+
+import pytest
+from faest import Keypair
+from faest.merkle import (
+    BatchSignature, BatchVerifier, MerkleProof,
+    merkle_root, sign_batch, verify_batch,
+)
+
+
+@pytest.fixture(scope='module')
+def keypair():
+    return Keypair.generate('128f')
+
+
+class TestMerkleBatch:
+    """Test batch signing and verification"""
+
+    @pytest.mark.parametrize('size', [1, 2, 3, 7, 8, 33])
+    def test_sign_and_verify_batch(self, keypair, size):
+        """Test every message of batches of various shapes verifies"""
+        messages = [f"event-{i}".encode() for i in range(size)]
+        batch_sigs = sign_batch(messages, keypair.private_key)
+        assert len(batch_sigs) == size
+        assert all(s.root == merkle_root(messages) for s in batch_sigs)
+        assert verify_batch(messages, batch_sigs, keypair.public_key) == [True] * size
+
+    def test_root_verified_once(self, keypair):
+        """Test that a shared root costs a single FAEST verification"""
+        messages = [bytes([i]) * 10 for i in range(16)]
+        batch_sigs = sign_batch(messages, keypair.private_key)
+        verifier = BatchVerifier(keypair.public_key)
+        assert all(verifier.verify_many(messages, batch_sigs))
+        assert verifier.root_verifications == 1
+        for s in batch_sigs:
+            assert len(s.proof.path) <= 4
+
+    def test_tampered_inputs_rejected(self, keypair):
+        """Test wrong messages, swapped proofs and wrong keys"""
+        messages = [b"a", b"b", b"c", b"d", b"e"]
+        batch_sigs = sign_batch(messages, keypair.private_key)
+        assert verify_batch([b"x"] + messages[1:], batch_sigs,
+                            keypair.public_key)[0] is False
+        swapped = [batch_sigs[1], batch_sigs[0]] + batch_sigs[2:]
+        assert verify_batch(messages, swapped, keypair.public_key)[:2] == [False, False]
+        other = Keypair.generate('128f')
+        assert not any(verify_batch(messages, batch_sigs, other.public_key))
+
+    def test_forged_root_signature_rejected(self, keypair):
+        """Test that a corrupted root signature fails every message"""
+        messages = [b"a", b"b", b"c"]
+        batch_sigs = sign_batch(messages, keypair.private_key)
+        bad_sig = bytearray(batch_sigs[0].root_signature)
+        bad_sig[100] ^= 0xFF
+        forged = [BatchSignature(s.root, bytes(bad_sig), s.proof, s.param_set)
+                  for s in batch_sigs]
+        assert verify_batch(messages, forged, keypair.public_key) == [False] * 3
+
+    def test_serialization_roundtrip(self, keypair):
+        """Test proof and batch signature serialization"""
+        messages = [b"m%d" % i for i in range(6)]
+        batch_sigs = sign_batch(messages, keypair.private_key)
+        for message, s in zip(messages, batch_sigs):
+            proof = MerkleProof.from_bytes(s.proof.to_bytes())
+            assert proof == s.proof
+            restored = BatchSignature.from_bytes(s.to_bytes(), '128f')
+            assert verify_batch([message], [restored], keypair.public_key) == [True]
+        with pytest.raises(ValueError):
+            MerkleProof.from_bytes(batch_sigs[0].proof.to_bytes()[:-1])
+
+    def test_invalid_inputs(self, keypair):
+        """Test empty batches and non-bytes messages"""
+        with pytest.raises(ValueError):
+            sign_batch([], keypair.private_key)
+        with pytest.raises(TypeError):
+            sign_batch(["text"], keypair.private_key)
+        with pytest.raises(ValueError):
+            MerkleProof(3, 3, [])
@@ -0,0 +1,83 @@
+"""
+Tests for multi-key signing and verification
+
+Run with: pytest tests/
+"""
+
+import pytest
+from faest import Keypair, verify
+from faest import multikey
+from faest.multikey import sign_with_keys, verify_threshold, verify_any
+
+
+@pytest.fixture(scope='module')
+def keypairs():
+    return [Keypair.generate('em_128f') for _ in range(4)] + [Keypair.generate('128f')]
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    calls = []
+
+    def counting_verify(message, signature, public_key):
+        calls.append(public_key)
+        return verify(message, signature, public_key)
+
+    monkeypatch.setattr(multikey, 'verify', counting_verify)
+    return calls
+
+
+class TestMultiKey:
+    """Test co-signing, threshold and any-of verification"""
+
+    def test_sign_with_keys(self, keypairs):
+        """Test that every key signs, in key order"""
+        signatures = sign_with_keys(b"approve", [kp.private_key for kp in keypairs], workers=3)
+        assert len(signatures) == 5
+        assert all(verify(b"approve", s, kp.public_key)
+                   for s, kp in zip(signatures, keypairs))
+
+    @pytest.mark.parametrize('workers', [1, 3])
+    def test_verify_threshold(self, keypairs, workers):
+        """Test k-of-n policies with missing and invalid signatures"""
+        pks = [kp.public_key for kp in keypairs]
+        signatures = sign_with_keys(b"policy", [kp.private_key for kp in keypairs])
+        signatures[1] = None
+        signatures[2] = signatures[3]           # valid signature, wrong key
+        assert verify_threshold(b"policy", signatures, pks, 3, workers=workers)
+        assert not verify_threshold(b"policy", signatures, pks, 4, workers=workers)
+        assert not verify_threshold(b"other", signatures, pks, 1, workers=workers)
+
+    def test_threshold_stops_early(self, keypairs, counted):
+        """Test that checking stops once the outcome is decided"""
+        pks = [kp.public_key for kp in keypairs]
+        signatures = sign_with_keys(b"early", [kp.private_key for kp in keypairs])
+        assert verify_threshold(b"early", signatures, pks, 2, workers=1)
+        assert len(counted) == 2
+        counted.clear()
+        # Only the first is valid, so 4-of-5 fails after the third check
+        bad = [signatures[0]] * 5
+        assert not verify_threshold(b"early", bad, pks, 4, workers=1)
+        assert len(counted) == 3
+
+    def test_verify_any(self, keypairs, counted):
+        """Test finding the signer among candidate keys"""
+        pks = [kp.public_key for kp in keypairs]
+        signature = sign_with_keys(b"who", [keypairs[2].private_key])[0]
+        assert verify_any(b"who", signature, pks, workers=1) == 2
+        assert len(counted) == 3
+        assert verify_any(b"who", signature, pks, workers=4) == 2
+        assert verify_any(b"nobody", signature, pks) is None
+        assert verify_any(b"who", signature, []) is None
+
+    def test_errors(self, keypairs):
+        """Test invalid input"""
+        pks = [kp.public_key for kp in keypairs]
+        with pytest.raises(ValueError):
+            verify_threshold(b"m", [None] * 5, pks, 0)
+        with pytest.raises(ValueError):
+            verify_threshold(b"m", [None] * 4, pks, 1)
+        with pytest.raises(TypeError):
+            verify_any("m", b"sig", pks)
+        with pytest.raises(TypeError):
+            sign_with_keys("m", [keypairs[0].private_key])
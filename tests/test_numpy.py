@@ -0,0 +1,74 @@
+"""
+Tests for the NumPy array interface
+
+Run with: pytest tests/
+"""
+
+import pytest
+from faest import Keypair, SignatureError, verify, PARAMETER_SETS
+
+np = pytest.importorskip('numpy')
+from faest.numpy import sign_array, verify_array  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def keypair():
+    return Keypair.generate('em_128f')
+
+
+SIG_SIZE = PARAMETER_SETS['em_128f']['sig_size']
+
+
+class TestNumpy:
+    """Test signing and verifying array rows"""
+
+    def test_uint8_rows(self, keypair):
+        """Test a 2-D uint8 array, one message per row"""
+        rows = np.arange(5 * 40, dtype=np.uint8).reshape(5, 40)
+        signatures = sign_array(rows, keypair.private_key, workers=2)
+        assert signatures.shape == (5, SIG_SIZE) and signatures.dtype == np.uint8
+        assert verify(rows[3].tobytes(), signatures[3].tobytes(), keypair.public_key)
+
+        ok = verify_array(rows, signatures, keypair.public_key, workers=2)
+        assert ok.dtype == bool and ok.all()
+        rows[2, 0] ^= 1
+        assert verify_array(rows, signatures, keypair.public_key).tolist() == \
+            [True, True, False, True, True]
+
+    def test_strided_rows(self, keypair):
+        """Test arrays whose rows are not adjacent in memory"""
+        base = np.arange(8 * 50, dtype=np.uint8).reshape(8, 50)
+        view = base[::2, 5:25]
+        signatures = sign_array(view, keypair.private_key.unpack())
+        assert verify(view[1].tobytes(), signatures[1].tobytes(), keypair.public_key)
+        assert verify_array(view, signatures, [keypair.public_key] * 4).all()
+        reversed_rows = view[::-1]
+        assert verify_array(reversed_rows, signatures[::-1], keypair.public_key).all()
+
+    def test_structured(self, keypair):
+        """Test a structured array, one message per record"""
+        dtype = np.dtype([('id', '<u8'), ('value', '<f4'), ('tag', 'S4')])
+        records = np.zeros(3, dtype=dtype)
+        records['id'] = [1, 2, 3]
+        records['tag'] = [b'a', b'b', b'c']
+        signatures = sign_array(records, keypair.private_key)
+        assert verify(records[0].tobytes(), signatures[0].tobytes(), keypair.public_key)
+        assert verify_array(records, signatures, keypair.public_key).all()
+
+    def test_empty_and_errors(self, keypair):
+        """Test empty arrays and invalid input"""
+        empty = np.zeros((0, 16), dtype=np.uint8)
+        assert sign_array(empty, keypair.private_key).shape == (0, SIG_SIZE)
+        assert verify_array(empty, np.zeros((0, SIG_SIZE), np.uint8),
+                            keypair.public_key).shape == (0,)
+        with pytest.raises(TypeError):
+            sign_array(np.zeros((2, 4), dtype=np.float32), keypair.private_key)
+        with pytest.raises(TypeError):
+            sign_array([b"abc"], keypair.private_key)
+        rows = np.zeros((2, 4), dtype=np.uint8)
+        with pytest.raises(ValueError):
+            verify_array(rows, np.zeros((3, SIG_SIZE), np.uint8), keypair.public_key)
+        unpacked = keypair.private_key.unpack()
+        unpacked.clear()
+        with pytest.raises(SignatureError):
+            sign_array(rows, unpacked)
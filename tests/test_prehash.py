@@ -0,0 +1,65 @@
+"""
+Tests for message prehashing
+
+Run with: pytest tests/
+"""
+
+import hashlib
+import os
+
+import pytest
+from faest import Keypair, sign, verify
+from faest import prehash
+
+
+@pytest.fixture(scope='module')
+def keypair():
+    return Keypair.generate('em_128f')
+
+
+class TestPrehash:
+    """Test prehash digests and batch helpers"""
+
+    def test_digest_sizes(self):
+        """Test that the hash follows the security level"""
+        assert prehash.security_level('128f') == 128
+        assert prehash.security_level('em_192s') == 192
+        assert prehash.digest_size('256f') == 64
+        assert len(prehash.prehash(b"m", 'em_192f')) == 48
+        with pytest.raises(ValueError):
+            prehash.security_level('bogus')
+
+    def test_reference_digest(self):
+        """Test the digest against hashlib"""
+        message = b"reference"
+        assert prehash.prehash(message, '128s') == \
+            hashlib.shake_128(prehash.PREFIX + message).digest(32)
+        assert prehash.prehash(message, '256s') == \
+            hashlib.shake_256(prehash.PREFIX + message).digest(64)
+
+    @pytest.mark.parametrize('param_set', ['128f', '192f', '256f'])
+    def test_many_matches_single(self, param_set):
+        """Test batch digests (x4 runs, remainders, large inputs) against prehash()"""
+        messages = [os.urandom(100) for _ in range(9)]
+        messages += [b"", b"x", os.urandom(50000), os.urandom(50000), os.urandom(3)]
+        digests = prehash.prehash_many(messages, param_set, workers=3)
+        assert digests == [prehash.prehash(m, param_set) for m in messages]
+        assert prehash.prehash_many([], param_set) == []
+
+    def test_type_errors(self):
+        """Test that non-bytes messages are rejected"""
+        with pytest.raises(TypeError):
+            prehash.prehash("text", '128f')
+        with pytest.raises(TypeError):
+            prehash.prehash_many([b"ok", "text"], '128f')
+
+    def test_sign_and_verify_many(self, keypair):
+        """Test signing and verifying prehashed messages"""
+        messages = [os.urandom(20000) for _ in range(5)]
+        signatures = prehash.sign_many(messages, keypair.private_key)
+        assert prehash.verify_many(messages, signatures, keypair.public_key) == [True] * 5
+        digest = prehash.prehash(messages[0], 'em_128f')
+        assert verify(digest, signatures[0], keypair.public_key)
+        assert not prehash.verify_many(messages[1:2], signatures[:1], keypair.public_key)[0]
+        assert prehash.verify_many([messages[0]], [sign(digest, keypair.private_key)],
+                                   keypair.public_key) == [True]
@@ -0,0 +1,89 @@
+"""
+Tests for phase-level profiling
+
+The counter tests need an extension built with FAEST_BUILD_PROFILE=phases
+and are skipped otherwise.
+
+Run with: pytest tests/
+"""
+
+import pytest
+import faest
+from faest import FaestError, Keypair, sign, verify
+from faest import profile
+from faest.profile import PhaseSnapshot
+
+instrumented = pytest.mark.skipif(not profile.available(),
+                                  reason="requires the 'phases' build profile")
+
+
+class TestPhaseSnapshot:
+    """Test snapshot arithmetic and summaries"""
+
+    def make(self, sign_cycles, owf_cycles, sign_calls):
+        cycles = {('128f', 'sign'): sign_cycles, ('128f', 'verify'): 0,
+                  ('128f', 'owf_prove'): owf_cycles}
+        calls = {('128f', 'sign'): sign_calls, ('128f', 'verify'): 0,
+                 ('128f', 'owf_prove'): sign_calls}
+        return PhaseSnapshot(cycles, calls)
+
+    def test_difference_and_stats(self):
+        """Test that subtracting snapshots isolates an interval"""
+        before = self.make(1000, 100, 1)
+        after = self.make(5000, 1100, 3)
+        stats = (after - before).stats()
+        assert list(stats) == ['128f']
+        owf = stats['128f']['owf_prove']
+        assert owf['calls'] == 2
+        assert owf['cycles'] == 1000
+        assert owf['cycles_per_op'] == 500
+        assert owf['share'] == pytest.approx(0.25)
+
+    def test_idle_parameter_sets_omitted(self):
+        """Test that parameter sets without operations are left out"""
+        assert self.make(0, 0, 0).stats() == {}
+
+
+def test_build_profile_reported():
+    """Test that backend_info names the build profile"""
+    info = faest.backend_info()
+    assert info['build_profile'] in ('release', 'phases', 'native', 'static')
+    assert profile.available() == (info['build_profile'] == 'phases')
+    if info['build_profile'] == 'native':
+        assert '-march=native' in info['build_flags'].split()
+    elif info['build_profile'] == 'static':
+        assert info['build_flags'].split() == ['-flto']
+    else:
+        assert info['build_flags'] == ''
+
+
+@pytest.mark.skipif(profile.available(), reason="extension is instrumented")
+def test_uninstrumented_build():
+    """Test that reading counters from a release build fails clearly"""
+    assert profile.phases() == []
+    with pytest.raises(FaestError):
+        profile.snapshot()
+    with pytest.raises(FaestError):
+        profile.phase_stats()
+
+
+@instrumented
+def test_phase_counters():
+    """Test that signing and verifying charge phases to the parameter set"""
+    keypair = Keypair.generate('128f')
+    profile.reset()
+    signature = sign(b"profile", keypair.private_key)
+    after_sign = profile.snapshot()
+    assert verify(b"profile", signature, keypair.public_key)
+
+    stats = profile.phase_stats()['128f']
+    assert stats['sign']['calls'] == 1
+    assert stats['verify']['calls'] == 1
+    assert stats['vole_commit']['cycles'] > 0
+    assert stats['owf_prove']['cycles'] > 0
+    assert stats['owf_verify']['cycles'] > 0
+    assert 0 < stats['owf_prove']['share'] < 1
+
+    verify_only = profile.phase_stats(since=after_sign)['128f']
+    assert verify_only['sign']['calls'] == 0
+    assert verify_only['verify']['calls'] == 1
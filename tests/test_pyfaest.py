@@ -209,6 +209,19 @@ class TestSerialization:
         signature2 = sign(message, keypair2.private_key)
         assert verify(message, signature2, keypair.public_key) == True
 
+    @pytest.mark.parametrize("param_set", list(PARAMETER_SETS))
+    def test_derive_public_key(self, param_set):
+        """Test recomputing the public key from the private key"""
+        keypair = Keypair.generate(param_set)
+        derived = keypair.private_key.public_key()
+        assert derived.param_set == param_set
+        assert derived.to_bytes() == keypair.public_key.to_bytes()
+        unpacked = keypair.private_key.unpack()
+        assert unpacked.public_key().to_bytes() == keypair.public_key.to_bytes()
+        unpacked.clear()
+        with pytest.raises(FaestError):
+            unpacked.public_key()
+
 
 class TestParameterSets:
     """Test all parameter sets"""
@@ -0,0 +1,172 @@
+"""
+Tests for the cost-aware priority scheduler
+
+Run with: pytest tests/
+"""
+
+import threading
+import time
+
+import pytest
+from faest import Keypair, sign, verify
+from faest.scheduler import (
+    Scheduler, CostModel, OverloadError, INTERACTIVE, NORMAL, BULK,
+)
+
+
+@pytest.fixture(scope='module')
+def keypair():
+    return Keypair.generate('em_128f')
+
+
+class TestCostModel:
+    """Test operation cost estimates"""
+
+    def test_calibrate_and_observe(self):
+        """Test measuring costs and folding in observations"""
+        model = CostModel.calibrate(['em_128f'], runs=1)
+        assert model.cost('em_128f', 'sign') > 0
+        assert model.cost('em_128f', 'verify') > 0
+        assert model.cost('256s', 'sign') == 0.0
+
+        model = CostModel({('128f', 'sign'): 1.0}, smoothing=0.5)
+        model.observe('128f', 'sign', 3.0)
+        assert model.cost('128f', 'sign') == pytest.approx(2.0)
+        with pytest.raises(ValueError):
+            model.cost('128f', 'keygen')
+        with pytest.raises(ValueError):
+            model.cost('bogus', 'sign')
+
+
+class TestScheduler:
+    """Test dispatch order and load shedding"""
+
+    def test_sign_and_verify(self, keypair):
+        """Test that calls produce the same results as direct calls"""
+        with Scheduler(workers=2) as scheduler:
+            signature = scheduler.sign(b"scheduled", keypair.private_key)
+            assert verify(b"scheduled", signature, keypair.public_key)
+            assert scheduler.verify(b"scheduled", signature, keypair.public_key,
+                                    priority=INTERACTIVE)
+            assert not scheduler.verify(b"other", signature, keypair.public_key)
+            assert scheduler.cost_model.cost('em_128f', 'verify') > 0
+
+    def test_priority_order(self, keypair):
+        """Test that queued interactive calls run before earlier bulk calls"""
+        signature = sign(b"m", keypair.private_key)
+        order = []
+        lock = threading.Lock()
+
+        def record(name):
+            def callback(future):
+                with lock:
+                    order.append(name)
+            return callback
+
+        with Scheduler(workers=1) as scheduler:
+            bulk = [scheduler.submit_sign(b"bulk", keypair.private_key, priority=BULK)
+                    for _ in range(3)]
+            normal = scheduler.submit_verify(b"m", signature, keypair.public_key)
+            urgent = [scheduler.submit_verify(b"m", signature, keypair.public_key,
+                                              priority=INTERACTIVE) for _ in range(2)]
+            for i, future in enumerate(bulk):
+                future.add_done_callback(record(f"bulk{i}"))
+            normal.add_done_callback(record("normal"))
+            for future in urgent:
+                future.add_done_callback(record("urgent"))
+        # At most the first bulk call started before the others were queued
+        rest = [name for name in order if name != "bulk0"]
+        assert rest == ["urgent", "urgent", "normal", "bulk1", "bulk2"]
+        assert scheduler.stats()[INTERACTIVE]['completed'] == 2
+
+    def test_deadline_shedding(self, keypair):
+        """Test that calls that cannot meet their deadline fail fast"""
+        model = CostModel({('em_128f', 'sign'): 10.0, ('em_128f', 'verify'): 0.001})
+        with Scheduler(workers=1, cost_model=model) as scheduler:
+            future = scheduler.submit_sign(b"late", keypair.private_key, timeout=1.0)
+            with pytest.raises(OverloadError):
+                future.result()
+            assert scheduler.stats()[NORMAL]['shed'] == 1
+            with pytest.raises(ValueError):
+                scheduler.submit_sign(b"x", keypair.private_key, timeout=0)
+            with pytest.raises(ValueError):
+                scheduler.submit_sign(b"x", keypair.private_key, priority=7)
+
+    def test_running_calls_count_towards_wait(self, keypair):
+        """Test that deadlines account for calls already running on every worker"""
+        signature = sign(b"m", keypair.private_key)
+        model = CostModel({('em_128f', 'sign'): 5.0, ('em_128f', 'verify'): 0.001},
+                          smoothing=0)
+        release = threading.Event()
+        with Scheduler(workers=2, cost_model=model) as scheduler:
+            try:
+                first = scheduler._submit('sign', 'em_128f', NORMAL, None, release.wait, ())
+                while not first.running():
+                    time.sleep(0.001)
+                # One worker is still idle
+                assert scheduler.verify(b"m", signature, keypair.public_key,
+                                        priority=INTERACTIVE, timeout=1.0)
+                second = scheduler._submit('sign', 'em_128f', NORMAL, None, release.wait, ())
+                while not second.running():
+                    time.sleep(0.001)
+                urgent = scheduler.submit_verify(b"m", signature, keypair.public_key,
+                                                 priority=INTERACTIVE, timeout=1.0)
+                with pytest.raises(OverloadError):
+                    urgent.result(timeout=0)
+                assert scheduler.stats()[INTERACTIVE]['shed'] == 1
+            finally:
+                release.set()
+
+    def test_expired_while_queued(self, keypair):
+        """Test that calls whose deadline passes in the queue are dropped"""
+        signature = sign(b"m", keypair.private_key)
+        model = CostModel({('em_128f', 'sign'): 0.0, ('em_128f', 'verify'): 0.0},
+                          smoothing=0)
+        with Scheduler(workers=1, cost_model=model) as scheduler:
+            blockers = [scheduler.submit_sign(b"busy", keypair.private_key,
+                                              priority=INTERACTIVE) for _ in range(3)]
+            late = scheduler.submit_verify(b"m", signature, keypair.public_key,
+                                           timeout=0.001)
+            with pytest.raises(OverloadError):
+                late.result()
+            assert all(f.result() for f in blockers)
+        assert scheduler.stats()[NORMAL]['expired'] == 1
+
+    def test_runs_task_behind_expired_one(self, keypair):
+        """Test that a call queued behind an expired one still runs"""
+        signature = sign(b"m", keypair.private_key)
+        model = CostModel({('em_128f', 'verify'): 0.0}, smoothing=0)
+        release = threading.Event()
+        with Scheduler(workers=1, cost_model=model) as scheduler:
+            try:
+                blocker = scheduler._submit('sign', 'em_128f', NORMAL, None, release.wait, ())
+                while not blocker.running():
+                    time.sleep(0.001)
+                late = scheduler.submit_verify(b"m", signature, keypair.public_key,
+                                               priority=INTERACTIVE, timeout=0.02)
+                waiting = scheduler.submit_verify(b"m", signature, keypair.public_key,
+                                                  priority=INTERACTIVE)
+                time.sleep(0.05)
+            finally:
+                release.set()
+            assert waiting.result(timeout=5)
+            with pytest.raises(OverloadError):
+                late.result()
+            assert scheduler.stats()[INTERACTIVE]['expired'] == 1
+
+    def test_backlog_limit(self, keypair):
+        """Test shedding calls without a deadline once the backlog is full"""
+        model = CostModel({('em_128f', 'sign'): 1.0}, smoothing=0)
+        with Scheduler(workers=1, cost_model=model, max_backlog=1.5) as scheduler:
+            futures = [scheduler.submit_sign(b"x", keypair.private_key) for _ in range(5)]
+            shed = [f for f in futures if isinstance(f.exception(), OverloadError)]
+            assert 1 <= len(shed) <= 3
+
+    def test_closed(self, keypair):
+        """Test submitting after close"""
+        scheduler = Scheduler(workers=1)
+        scheduler.close()
+        with pytest.raises(RuntimeError):
+            scheduler.submit_sign(b"x", keypair.private_key)
+        with pytest.raises(ValueError):
+            Scheduler(workers=2, max_bulk_workers=3)
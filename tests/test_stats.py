@@ -0,0 +1,112 @@
+"""
+Tests for signing latency and grinding statistics
+
+Run with: pytest tests/
+"""
+
+import pytest
+from faest import Keypair, sign, verify
+from faest import stats
+from faest.stats import Histogram, grinding_attempts, sign_with_stats
+
+
+@pytest.fixture(scope='module')
+def keypair():
+    return Keypair.generate('em_128f')
+
+
+@pytest.fixture
+def recording():
+    stats.reset()
+    stats.enable()
+    yield
+    stats.disable()
+    stats.reset()
+
+
+class TestHistogram:
+    """Test the log-linear histogram"""
+
+    def test_exact_small_values(self):
+        """Test that values below 16 are counted exactly"""
+        h = Histogram()
+        for v in [1, 2, 2, 3, 15]:
+            h.record(v)
+        assert h.count == 5
+        assert h.min == 1 and h.max == 15
+        assert h.mean == pytest.approx(23 / 5)
+        assert h.percentile(50) == 2
+        assert h.percentile(100) == 15
+        assert h.buckets() == [(1, 1), (2, 2), (3, 1), (15, 1)]
+
+    def test_percentile_error_bound(self):
+        """Test that percentiles are within 12.5% above the true value"""
+        h = Histogram()
+        values = list(range(1, 100001, 7))
+        for v in values:
+            h.record(v)
+        for p in (50, 90, 99, 99.9):
+            true = values[int(-(-len(values) * p // 100)) - 1]
+            estimate = h.percentile(p)
+            assert true <= estimate <= true * 1.125
+
+    def test_empty_and_errors(self):
+        """Test empty histograms and invalid input"""
+        h = Histogram()
+        assert h.percentile(99) is None
+        assert h.mean is None
+        with pytest.raises(ValueError):
+            h.record(-1)
+        with pytest.raises(ValueError):
+            h.percentile(101)
+        h.record(5)
+        h.reset()
+        assert h.count == 0 and h.max is None
+
+
+class TestSignStats:
+    """Test recording of sign() calls"""
+
+    def test_grinding_attempts(self, keypair):
+        """Test reading the grinding counter from a signature"""
+        signature = sign(b"grind", keypair.private_key)
+        attempts = grinding_attempts(signature)
+        assert attempts >= 1
+        # The counter is covered by the signature
+        tampered = signature[:-4] + (attempts + 7).to_bytes(4, 'little')
+        assert not verify(b"grind", tampered, keypair.public_key)
+        with pytest.raises(ValueError):
+            grinding_attempts(b"abc")
+
+    def test_sign_with_stats(self, keypair):
+        """Test returning measurements with a signature"""
+        signature, sample = sign_with_stats(b"measured", keypair.private_key)
+        assert verify(b"measured", signature, keypair.public_key)
+        assert sample.param_set == 'em_128f'
+        assert sample.seconds > 0
+        assert sample.attempts == grinding_attempts(signature)
+
+    def test_recording(self, keypair, recording):
+        """Test that enabled recording captures every sign() call"""
+        assert stats.is_enabled()
+        unpacked = keypair.private_key.unpack()
+        attempts = [grinding_attempts(sign(b"m%d" % i, unpacked)) for i in range(10)]
+
+        s = stats.get('em_128f')
+        assert s.latency_ns.count == 10
+        assert s.attempts.max == max(attempts)
+        assert s.attempts.mean == pytest.approx(sum(attempts) / 10)
+
+        summary = stats.summary('em_128f')
+        assert summary['count'] == 10
+        assert 0 < summary['p50_ms'] <= summary['p99_ms'] <= summary['max_ms']
+        assert list(stats.summary()) == ['em_128f']
+
+    def test_disabled_by_default(self, keypair):
+        """Test that nothing is recorded unless enabled"""
+        stats.reset()
+        assert not stats.is_enabled()
+        sign(b"quiet", keypair.private_key)
+        assert stats.summary() == {}
+        with pytest.raises(ValueError):
+            stats.get('bogus')
@@ -0,0 +1,144 @@
+"""
+Thread-safety stress tests and GIL release checks
+
+These run on any build; on a free-threaded (no-GIL) interpreter they also
+confirm that importing the package does not re-enable the GIL.
+
+Run with: pytest tests/
+"""
+
+import gc
+import threading
+import time
+
+import pytest
+import faest
+from faest import Keypair, PrivateKey, SigningCache, sign, verify
+from faest.batching import Coalescer
+
+
+THREADS = 8
+
+
+def run_threads(target, count=THREADS):
+    """Run target(i) in `count` threads started together; re-raise failures"""
+    errors = []
+    barrier = threading.Barrier(count)
+
+    def wrapper(i):
+        try:
+            barrier.wait()
+            target(i)
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=wrapper, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0]
+
+
+@pytest.fixture(scope='module')
+def keypair():
+    return Keypair.generate('em_128f')
+
+
+class TestFreeThreading:
+    """Test the package's declared threading mode"""
+
+    def test_backend_info(self):
+        """Test that backend_info reports the interpreter mode"""
+        info = faest.backend_info()
+        assert set(info['parameter_sets']) == set(faest.PARAMETER_SETS)
+        assert isinstance(info['free_threaded'], bool)
+
+    @pytest.mark.skipif(not faest.backend_info()['free_threaded'],
+                        reason="requires a free-threaded Python build")
+    def test_import_keeps_gil_disabled(self):
+        """Test that the extension module does not re-enable the GIL"""
+        assert faest.backend_info()['gil_enabled'] is False
+
+
+class TestConcurrentUse:
+    """Stress shared keys, finalizers and caches from many threads"""
+
+    def test_shared_keys_sign_and_verify(self, keypair):
+        """Test concurrent sign/verify with one shared keypair"""
+        unpacked = keypair.private_key.unpack()
+
+        def worker(i):
+            for j in range(5):
+                message = b"thread-%d-%d" % (i, j)
+                signer = unpacked if j % 2 else keypair.private_key
+                signature = sign(message, signer)
+                assert verify(message, signature, keypair.public_key)
+                assert not verify(message + b"!", signature, keypair.public_key)
+
+        run_threads(worker)
+
+    def test_key_creation_and_finalization(self, keypair):
+        """Test that keys created and collected concurrently stay intact"""
+        sk_bytes = keypair.private_key.to_bytes()
+
+        def worker(i):
+            for _ in range(50):
+                key = PrivateKey(sk_bytes, 'em_128f')
+                assert key.to_bytes() == sk_bytes
+                unpacked = key.unpack()
+                del key, unpacked
+                if i == 0:
+                    gc.collect()
+            assert verify(b"after", sign(b"after", keypair.private_key),
+                          keypair.public_key)
+
+        run_threads(worker)
+        assert keypair.private_key.to_bytes() == sk_bytes
+
+    def test_shared_cache_and_coalescer(self, keypair):
+        """Test SigningCache and Coalescer shared by many threads"""
+        cache = SigningCache(maxsize=4)
+        seen = {}
+        lock = threading.Lock()
+
+        with Coalescer(max_delay=0.001) as coalescer:
+            def worker(i):
+                message = b"shared-%d" % (i % 3)
+                signature = cache.sign(message, keypair.private_key)
+                assert coalescer.verify(message, signature, keypair.public_key)
+                with lock:
+                    seen.setdefault(message, set()).add(signature)
+
+            run_threads(worker)
+
+        assert all(len(sigs) == 1 for sigs in seen.values())
+
+
+def test_native_calls_release_the_gil():
+    """Test that Python threads keep running while a sign call is in libfaest"""
+    private_key = Keypair.generate('128s').private_key
+    state = {'last': None, 'max_gap': 0.0}
+    stop = threading.Event()
+
+    def ticker():
+        while not stop.is_set():
+            now = time.perf_counter()
+            if state['last'] is not None:
+                state['max_gap'] = max(state['max_gap'], now - state['last'])
+            state['last'] = now
+
+    thread = threading.Thread(target=ticker)
+    thread.start()
+    try:
+        while state['last'] is None:
+            time.sleep(0.001)
+        start = time.perf_counter()
+        sign(b"gil", private_key)
+        duration = time.perf_counter() - start
+    finally:
+        stop.set()
+        thread.join()
+    # Holding the GIL would stall the ticker for the whole call
+    assert state['max_gap'] < duration / 2
@@ -0,0 +1,100 @@
+"""
+Tests for the tagged wire format
+
+Run with: pytest tests/
+"""
+
+import pytest
+from faest import Keypair, PublicKey, PrivateKey, sign, verify, PARAMETER_SETS
+from faest import wire
+
+
+@pytest.fixture(scope='module')
+def keypair():
+    return Keypair.generate('128f')
+
+
+class TestWire:
+    """Test encoding and decoding of single records"""
+
+    def test_public_key_roundtrip(self, keypair):
+        """Test that a public key record carries its parameter set"""
+        data = wire.encode(keypair.public_key)
+        assert len(data) == 1 + PARAMETER_SETS['128f']['pk_size']
+        assert data[0] == (wire.PUBLIC_KEY << 4) | PARAMETER_SETS['128f']['param_id']
+        record = wire.decode(data)
+        assert record.kind == wire.PUBLIC_KEY and record.param_set == '128f'
+        pk = record.value()
+        assert isinstance(pk, PublicKey) and pk.to_bytes() == keypair.public_key.to_bytes()
+
+    def test_private_key_and_signature(self, keypair):
+        """Test private key and signature records"""
+        sk = wire.decode(wire.encode(keypair.private_key)).value()
+        assert isinstance(sk, PrivateKey) and sk.to_bytes() == keypair.private_key.to_bytes()
+
+        signature = sign(b"wire", keypair.private_key)
+        record = wire.decode(wire.encode(signature, param_set='128f'))
+        assert record.kind == wire.SIGNATURE
+        assert verify(b"wire", record.value(), keypair.public_key)
+
+    def test_length_prefixed_signature(self):
+        """Test that short signatures carry a varint length"""
+        data = wire.encode(b"\x01" * 200, param_set='256s')
+        assert data[0] & 0x80 and data[1:3] == bytes([0xc8, 0x01])
+        record = wire.decode(data)
+        assert record.param_set == '256s' and bytes(record.payload) == b"\x01" * 200
+
+    def test_errors(self, keypair):
+        """Test invalid input"""
+        with pytest.raises(ValueError):
+            wire.encode(b"sig")
+        with pytest.raises(ValueError):
+            wire.encode(b"\x00" * 10000, param_set='128f')
+        with pytest.raises(TypeError):
+            wire.encode("text", param_set='128f')
+        data = wire.encode(keypair.public_key)
+        with pytest.raises(ValueError):
+            wire.decode(data[:-1])
+        with pytest.raises(ValueError):
+            wire.decode(data + b"\x00")
+        with pytest.raises(ValueError):
+            wire.decode(b"\x0f" + data[1:])
+        with pytest.raises(ValueError):
+            wire.decode(bytes([data[0] | 0x80]) + b"\x01\x00")
+
+
+class TestBatch:
+    """Test buffers of many records"""
+
+    def test_homogeneous_views(self, keypair):
+        """Test that fixed-size records decode to views of the buffer"""
+        signatures = [sign(b"m%d" % i, keypair.private_key) for i in range(3)]
+        blob = wire.encode_many(signatures, param_set='128f')
+        records = wire.decode_many(blob, kind=wire.SIGNATURE)
+        assert [bytes(r.payload) for r in records] == signatures
+        assert records[1].payload.obj is blob
+        with pytest.raises(ValueError):
+            wire.decode_many(blob, kind=wire.PUBLIC_KEY)
+
+    def test_mixed(self, keypair):
+        """Test buffers mixing kinds, parameter sets and lengths"""
+        other = Keypair.generate('em_128s')
+        items = [keypair.public_key, other.public_key, b"\x02" * 5, keypair.public_key]
+        blob = wire.encode_many(items, param_set='192f')
+        records = wire.decode_many(bytearray(blob))
+        assert [(r.kind, r.param_set) for r in records] == [
+            (wire.PUBLIC_KEY, '128f'), (wire.PUBLIC_KEY, 'em_128s'),
+            (wire.SIGNATURE, '192f'), (wire.PUBLIC_KEY, '128f'),
+        ]
+        assert records[2].value() == b"\x02" * 5
+        assert wire.decode_many(b"") == []
+        with pytest.raises(ValueError):
+            wire.decode_many(blob[:-1])
+
+    def test_many_public_keys(self, keypair):
+        """Test a buffer of thousands of records"""
+        blob = wire.encode_many([keypair.public_key] * 5000)
+        records = wire.decode_many(blob)
+        assert len(records) == 5000
+        assert all(r.param_set == '128f' for r in records)
+        assert bytes(records[-1].payload) == keypair.public_key.to_bytes()